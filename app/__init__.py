@@ -1,4 +1,5 @@
 from flask import Flask
+from config import Config
 import secrets
 import os
 
@@ -9,6 +10,7 @@ def create_app():
                 static_folder='../static')
     
     # Конфигурация
+    app.config.from_object(Config)
     app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(16))
     
     # Создание необходимых директорий
@@ -16,6 +18,30 @@ def create_app():
     os.makedirs('database', exist_ok=True)
     os.makedirs('static/data', exist_ok=True)
     
+    # Пул соединений с БД
+    from app import db
+    db.init_app(app)
+    
+    # JSON-провайдер: orjson, если установлен
+    from app import serialization
+    serialization.init_app(app)
+    
+    # Server-Timing, /metrics и профили медленных запросов (по настройке)
+    from app import instrumentation
+    instrumentation.init_app(app)
+    
+    # Пул хеширования паролей
+    from app.auth import hashing
+    hashing.init_app(app)
+    
+    # Статические файлы: хеш в имени, сжатие, кэширование; service worker
+    from app import assets
+    assets.init_app(app)
+    
+    # Сервис курсов валют
+    from app.fx import models as fx
+    fx.init_app(app)
+    
     # Регистрация blueprints
     from app.auth.routes import auth_bp
     app.register_blueprint(auth_bp)
@@ -26,4 +52,16 @@ def create_app():
     from app.accounts.routes import accounts_bp
     app.register_blueprint(accounts_bp)
     
+    from app.fx.routes import fx_bp
+    app.register_blueprint(fx_bp)
+    
+    from app.transactions.routes import transactions_bp
+    app.register_blueprint(transactions_bp)
+    
+    from app.jobs.routes import jobs_bp
+    app.register_blueprint(jobs_bp)
+    
+    from app.reports.routes import reports_bp
+    app.register_blueprint(reports_bp)
+    
     return app
\ No newline at end of file
@@ -0,0 +1,202 @@
+import sqlite3
+from typing import List, Dict, Optional
+
+LEDGER_SCHEMA_PATH = 'database/ledger.sql'
+
+def ensure_ledger_schema(conn: sqlite3.Connection) -> bool:
+    """Создание таблиц и триггеров реестра. Возвращает True, если реестр создан впервые"""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'account_balances'"
+    ).fetchone() is not None
+
+    with open(LEDGER_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    return not existed
+
+def rebuild_ledger(conn: sqlite3.Connection, account_ids: Optional[List[int]] = None) -> int:
+    """Пересчет реестра с нуля по таблице transactions.
+
+    Если account_ids не указан, пересчитываются все счета.
+    Возвращает число счетов с подтвержденными транзакциями после пересчета.
+    """
+    if account_ids is None:
+        where, params = '', []
+    else:
+        if not account_ids:
+            return 0
+        placeholders = ', '.join('?' * len(account_ids))
+        where, params = f'AND account_id IN ({placeholders})', list(account_ids)
+
+    try:
+        conn.execute(f'DELETE FROM account_balances WHERE 1 = 1 {where}', params)
+        conn.execute(f'DELETE FROM account_daily_balances WHERE 1 = 1 {where}', params)
+
+        cursor = conn.execute(
+            f'''INSERT INTO account_balances (account_id, balance, transaction_count, updated_at)
+                SELECT account_id, SUM(amount), COUNT(*), CURRENT_TIMESTAMP
+                FROM transactions
+                WHERE status = 'confirmed' {where}
+                GROUP BY account_id''',
+            params
+        )
+        rebuilt = cursor.rowcount
+
+        conn.execute(
+            f'''INSERT INTO account_daily_balances (account_id, date, net_change, balance)
+                SELECT account_id, date, net_change,
+                       SUM(net_change) OVER (PARTITION BY account_id ORDER BY date)
+                FROM (SELECT account_id, date, SUM(amount) AS net_change
+                      FROM transactions
+                      WHERE status = 'confirmed' {where}
+                      GROUP BY account_id, date)''',
+            params
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return rebuilt
+
+def suspend_ledger(conn: sqlite3.Connection, account_id: int):
+    """Отключение триггеров реестра для счета внутри текущей транзакции.
+
+    Вызывающий обязан в той же транзакции снять отметку resume_ledger и
+    применить изменения через apply_ledger_delta до commit. Отметка
+    отключает и триггеры месячных итогов, поискового индекса и версий
+    данных: их обновляют app/reports/rollups.py:apply_rollup_delta,
+    app/transactions/search.py:index_new_transactions и
+    app/accounts/versions.py:bump_data_version.
+    """
+    conn.execute('INSERT OR IGNORE INTO ledger_bulk_accounts (account_id) VALUES (?)',
+                 (account_id,))
+
+def resume_ledger(conn: sqlite3.Connection, account_id: int):
+    """Возврат триггеров реестра для счета"""
+    conn.execute('DELETE FROM ledger_bulk_accounts WHERE account_id = ?', (account_id,))
+
+def apply_ledger_delta(conn: sqlite3.Connection, account_id: int,
+                       day_totals: Dict[str, List]):
+    """Пакетное обновление реестра по обороту за дни: {date: [сумма, число операций]}.
+
+    Вместо построчной работы триггеров остатки пересчитываются одним
+    проходом по окну начиная с самого раннего затронутого дня. Не делает
+    commit — выполняется в транзакции вызывающего.
+    """
+    if not day_totals:
+        return
+
+    conn.execute(
+        '''INSERT INTO account_balances (account_id, balance, transaction_count, updated_at)
+           VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+           ON CONFLICT(account_id) DO UPDATE SET
+               balance = balance + excluded.balance,
+               transaction_count = transaction_count + excluded.transaction_count,
+               updated_at = excluded.updated_at''',
+        (account_id, sum(total[0] for total in day_totals.values()),
+         sum(total[1] for total in day_totals.values()))
+    )
+
+    conn.executemany(
+        '''INSERT INTO account_daily_balances (account_id, date, net_change, balance)
+           VALUES (?, ?, ?, 0)
+           ON CONFLICT(account_id, date) DO UPDATE SET
+               net_change = net_change + excluded.net_change''',
+        [(account_id, day, total[0]) for day, total in day_totals.items()]
+    )
+
+    first_day = min(day_totals)
+    previous = conn.execute(
+        '''SELECT balance FROM account_daily_balances
+           WHERE account_id = ? AND date < ? ORDER BY date DESC LIMIT 1''',
+        (account_id, first_day)
+    ).fetchone()
+
+    conn.execute(
+        '''WITH running AS (
+               SELECT date, ? + SUM(net_change) OVER (ORDER BY date) AS balance
+               FROM account_daily_balances
+               WHERE account_id = ? AND date >= ?)
+           UPDATE account_daily_balances SET balance = running.balance
+           FROM running
+           WHERE account_daily_balances.account_id = ?
+             AND account_daily_balances.date = running.date''',
+        (previous[0] if previous else 0, account_id, first_day, account_id)
+    )
+
+def check_ledger(conn: sqlite3.Connection) -> List[Dict]:
+    """Сверка реестра с транзакциями.
+
+    Суммы целые (минимальные единицы валюты), поэтому сравниваются точно.
+    Возвращает список расхождений; пустой список означает, что реестр согласован.
+    """
+    problems = []
+
+    rows = conn.execute(
+        '''SELECT a.id AS account_id,
+                  COALESCE(b.balance, 0) AS stored,
+                  COALESCE((SELECT SUM(t.amount) FROM transactions t
+                            WHERE t.account_id = a.id AND t.status = 'confirmed'), 0) AS actual
+           FROM accounts a
+           LEFT JOIN account_balances b ON b.account_id = a.id'''
+    ).fetchall()
+    for row in rows:
+        if row[1] != row[2]:
+            problems.append({
+                'account_id': row[0],
+                'date': None,
+                'stored': row[1],
+                'actual': row[2]
+            })
+
+    # Дневные снимки сравниваются с пересчетом по окну; FULL JOIN
+    # эмулируется объединением двух LEFT JOIN
+    expected = '''SELECT account_id, date,
+                         SUM(net_change) OVER (PARTITION BY account_id ORDER BY date) AS balance
+                  FROM (SELECT account_id, date, SUM(amount) AS net_change
+                        FROM transactions WHERE status = 'confirmed'
+                        GROUP BY account_id, date)'''
+    rows = conn.execute(
+        f'''WITH expected AS ({expected})
+            SELECT e.account_id, e.date, d.balance, e.balance
+            FROM expected e
+            LEFT JOIN account_daily_balances d
+                   ON d.account_id = e.account_id AND d.date = e.date
+            UNION ALL
+            SELECT d.account_id, d.date, d.balance, NULL
+            FROM account_daily_balances d
+            WHERE NOT EXISTS (SELECT 1 FROM expected e
+                              WHERE e.account_id = d.account_id AND e.date = d.date)'''
+    ).fetchall()
+    for account_id, date, stored, actual in rows:
+        if stored is None or actual is None or stored != actual:
+            problems.append({
+                'account_id': account_id,
+                'date': date,
+                'stored': stored,
+                'actual': actual
+            })
+
+    return problems
+
+def get_daily_balances(conn: sqlite3.Connection, account_id: int,
+                       date_from: str = None, date_to: str = None) -> List[Dict]:
+    """Дневные остатки счета (без учета initial_balance) в минимальных единицах"""
+    query = '''SELECT date, net_change, balance FROM account_daily_balances
+               WHERE account_id = ?'''
+    params = [account_id]
+
+    if date_from:
+        query += ' AND date >= ?'
+        params.append(date_from)
+    if date_to:
+        query += ' AND date <= ?'
+        params.append(date_to)
+
+    query += ' ORDER BY date'
+
+    return [
+        {'date': row[0], 'net_change': row[1], 'balance': row[2]}
+        for row in conn.execute(query, params).fetchall()
+    ]
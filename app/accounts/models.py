@@ -1,15 +1,18 @@
 import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
+from app.accounts.ledger import get_daily_balances
+from app.accounts.versions import get_data_version
+from app.db import get_db
+from app.cache import UserCache, invalidate_user, register_cache
+from app.money import from_minor, minor_factor_sql
+from app.records import Record
 
-def get_db():
-    conn = sqlite3.connect('database/finance.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+accounts_cache = register_cache(UserCache('user_accounts'))
 
 def create_account(user_id: int, name: str, account_type: str, currency: str, 
-                  bank_id: str = None, initial_balance: float = 0.0) -> Tuple[bool, str]:
-    """Создание нового счета"""
+                  bank_id: str = None, initial_balance: int = 0) -> Tuple[bool, str]:
+    """Создание нового счета; initial_balance — в минимальных единицах валюты"""
     conn = get_db()
     try:
         cursor = conn.execute(
@@ -19,90 +22,135 @@ def create_account(user_id: int, name: str, account_type: str, currency: str,
             (user_id, name, account_type, currency, bank_id, initial_balance, datetime.now())
         )
         conn.commit()
+        invalidate_user(user_id)
         return True, str(cursor.lastrowid)
     except Exception as e:
+        conn.rollback()
         return False, f"Ошибка создания счета: {str(e)}"
-    finally:
-        conn.close()
 
-def get_user_accounts(user_id: int, include_archived: bool = False) -> List[Dict]:
-    """Получение всех счетов пользователя"""
+class Account(Record):
+    """Счет с текущим балансом; суммы в единицах валюты"""
+
+    __slots__ = ('id', 'name', 'type', 'currency', 'bank_id', 'initial_balance',
+                 'current_balance', 'archived', 'created_at')
+
+    def __init__(self, id: int, name: str, type: str, currency: str, bank_id: Optional[str],
+                 initial_balance: float, current_balance: float, archived: bool, created_at):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.currency = currency
+        self.bank_id = bank_id
+        self.initial_balance = initial_balance
+        self.current_balance = current_balance
+        # archived хранится числом, в API — логическое значение
+        self.archived = bool(archived)
+        self.created_at = created_at
+
+# Баланс берется из материализованного реестра account_balances
+# (см. database/ledger.sql), который триггеры обновляют при каждой записи
+# в transactions, поэтому чтение не зависит от длины истории операций.
+# Суммы переводятся в единицы валюты в самом запросе: целое, деленное на
+# степень десяти в SQLite, дает тот же float, что from_minor в Python
+ACCOUNTS_WITH_BALANCE_QUERY = f'''
+    SELECT a.id, a.name, a.type, a.currency, a.bank_id,
+           a.initial_balance * 1.0 / {minor_factor_sql('a.currency')},
+           (a.initial_balance + COALESCE(b.balance, 0)) * 1.0 / {minor_factor_sql('a.currency')},
+           a.archived, a.created_at
+    FROM accounts a
+    LEFT JOIN account_balances b ON b.account_id = a.id
+    WHERE {{where}}
+    ORDER BY a.created_at DESC
+'''
+
+def query_accounts_with_balance(conn: sqlite3.Connection, where: str,
+                                params: tuple) -> List[Account]:
+    """Выборка счетов вместе с текущим балансом за один проход"""
+    cursor = conn.cursor()
+    cursor.row_factory = Account.row_factory
+    return cursor.execute(ACCOUNTS_WITH_BALANCE_QUERY.format(where=where), params).fetchall()
+
+def get_user_accounts(user_id: int, include_archived: bool = False) -> List[Account]:
+    """Получение всех счетов пользователя.
+
+    Результат кэшируется вместе с версией данных пользователя: запись
+    через модели сбрасывает кэш сразу (invalidate_user), а запись из
+    другого процесса (воркер импорта) меняет версию, и значение
+    пересчитывается при следующем чтении.
+    """
     conn = get_db()
     try:
-        query = '''SELECT id, name, type, currency, bank_id, initial_balance, 
-                   archived, created_at FROM accounts WHERE user_id = ?'''
-        params = [user_id]
-        
+        where = 'a.user_id = ?'
         if not include_archived:
-            query += ' AND archived = 0'
-        
-        query += ' ORDER BY created_at DESC'
-        
-        accounts = conn.execute(query, params).fetchall()
-        
-        result = []
-        for account in accounts:
-            # Вычисляем текущий баланс
-            balance_query = '''SELECT SUM(amount) as total FROM transactions 
-                              WHERE account_id = ? AND status = "confirmed"'''
-            balance_result = conn.execute(balance_query, (account['id'],)).fetchone()
-            current_balance = account['initial_balance'] + (balance_result['total'] or 0)
-            
-            result.append({
-                'id': account['id'],
-                'name': account['name'],
-                'type': account['type'],
-                'currency': account['currency'],
-                'bank_id': account['bank_id'],
-                'initial_balance': account['initial_balance'],
-                'current_balance': current_balance,
-                'archived': bool(account['archived']),
-                'created_at': account['created_at']
-            })
+            where += ' AND a.archived = 0'
         
+        version = get_data_version(conn, user_id)
+        cached = accounts_cache.get(user_id, include_archived)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        result = query_accounts_with_balance(conn, where, (user_id,))
+        accounts_cache.set(user_id, include_archived, (version, result))
         return result
     except Exception as e:
         print(f"Ошибка получения счетов: {e}")
         return []
-    finally:
-        conn.close()
 
-def get_account_by_id(account_id: int, user_id: int) -> Optional[Dict]:
+def get_account_by_id(account_id: int, user_id: int) -> Optional[Account]:
     """Получение конкретного счета пользователя"""
     conn = get_db()
+    try:
+        accounts = query_accounts_with_balance(
+            conn, 'a.id = ? AND a.user_id = ?', (account_id, user_id)
+        )
+        
+        if not accounts:
+            return None
+        
+        return accounts[0]
+    except Exception as e:
+        print(f"Ошибка получения счета: {e}")
+        return None
+
+def get_account_daily_balances(account_id: int, user_id: int, date_from: str = None,
+                               date_to: str = None) -> Optional[List[Dict]]:
+    """Дневные остатки счета пользователя с учетом начального баланса"""
+    conn = get_db()
     try:
         account = conn.execute(
-            '''SELECT id, name, type, currency, bank_id, initial_balance, 
-               archived, created_at FROM accounts 
-               WHERE id = ? AND user_id = ?''',
+            'SELECT initial_balance, currency FROM accounts WHERE id = ? AND user_id = ?',
             (account_id, user_id)
         ).fetchone()
         
         if not account:
             return None
         
-        # Вычисляем текущий баланс
-        balance_query = '''SELECT SUM(amount) as total FROM transactions 
-                          WHERE account_id = ? AND status = "confirmed"'''
-        balance_result = conn.execute(balance_query, (account_id,)).fetchone()
-        current_balance = account['initial_balance'] + (balance_result['total'] or 0)
-        
-        return {
-            'id': account['id'],
-            'name': account['name'],
-            'type': account['type'],
-            'currency': account['currency'],
-            'bank_id': account['bank_id'],
-            'initial_balance': account['initial_balance'],
-            'current_balance': current_balance,
-            'archived': bool(account['archived']),
-            'created_at': account['created_at']
-        }
+        currency = account['currency']
+        days = get_daily_balances(conn, account_id, date_from, date_to)
+        for day in days:
+            day['net_change'] = from_minor(day['net_change'], currency)
+            day['balance'] = from_minor(day['balance'] + account['initial_balance'], currency)
+        return days
     except Exception as e:
-        print(f"Ошибка получения счета: {e}")
+        print(f"Ошибка получения дневных остатков: {e}")
         return None
-    finally:
-        conn.close()
+
+# Суммы счета и его транзакций хранятся в минимальных единицах валюты
+# счета, поэтому сменить валюту можно только счету без сумм: иначе
+# изменилось бы их значение
+CURRENCY_LOCKED_ERROR = "Нельзя сменить валюту счета с балансом или транзакциями"
+
+# Владелец, валюта и наличие сумм у счета (для проверки смены валюты)
+ACCOUNT_CURRENCY_QUERY = '''
+    SELECT a.id, a.currency,
+           a.initial_balance != 0 OR EXISTS (SELECT 1 FROM transactions t WHERE t.account_id = a.id)
+    FROM accounts a
+    WHERE a.user_id = ? AND a.id IN ({placeholders})
+'''
+
+def _currency_change_blocked(account: tuple, currency: Optional[str]) -> bool:
+    """Запрещена ли смена валюты счета (id, валюта, есть суммы) на currency"""
+    return currency is not None and currency != account[1] and bool(account[2])
 
 def update_account(account_id: int, user_id: int, name: str = None, 
                   account_type: str = None, currency: str = None,
@@ -112,12 +160,14 @@ def update_account(account_id: int, user_id: int, name: str = None,
     try:
         # Проверяем что счет принадлежит пользователю
         existing = conn.execute(
-            'SELECT id FROM accounts WHERE id = ? AND user_id = ?',
-            (account_id, user_id)
+            ACCOUNT_CURRENCY_QUERY.format(placeholders='?'),
+            (user_id, account_id)
         ).fetchone()
         
         if not existing:
             return False, "Счет не найден"
+        if _currency_change_blocked(existing, currency):
+            return False, CURRENCY_LOCKED_ERROR
         
         # Формируем запрос обновления
         updates = []
@@ -144,11 +194,11 @@ def update_account(account_id: int, user_id: int, name: str = None,
         
         conn.execute(query, params)
         conn.commit()
+        invalidate_user(user_id)
         return True, "Счет обновлен"
     except Exception as e:
+        conn.rollback()
         return False, f"Ошибка обновления счета: {str(e)}"
-    finally:
-        conn.close()
 
 def archive_account(account_id: int, user_id: int) -> Tuple[bool, str]:
     """Архивирование счета (мягкое удаление)"""
@@ -168,11 +218,11 @@ def archive_account(account_id: int, user_id: int) -> Tuple[bool, str]:
             (account_id, user_id)
         )
         conn.commit()
+        invalidate_user(user_id)
         return True, "Счет архивирован"
     except Exception as e:
+        conn.rollback()
         return False, f"Ошибка архивирования: {str(e)}"
-    finally:
-        conn.close()
 
 def restore_account(account_id: int, user_id: int) -> Tuple[bool, str]:
     """Восстановление архивированного счета"""
@@ -192,8 +242,91 @@ def restore_account(account_id: int, user_id: int) -> Tuple[bool, str]:
             (account_id, user_id)
         )
         conn.commit()
+        invalidate_user(user_id)
         return True, "Счет восстановлен"
     except Exception as e:
+        conn.rollback()
         return False, f"Ошибка восстановления: {str(e)}"
-    finally:
-        conn.close()
\ No newline at end of file
+
+# Операции пакета и значение archived, которое они устанавливают
+ARCHIVE_ACTIONS = {'archive': 1, 'restore': 0}
+
+UPDATE_COLUMNS = (('name', 'name'), ('account_type', 'type'), ('currency', 'currency'), ('bank_id', 'bank_id'))
+
+def apply_account_batch(user_id: int, operations: List[Dict], atomic: bool = False) -> Tuple[bool, List[Dict]]:
+    """Пакет операций со счетами одной транзакцией.
+
+    Операция — {'action': 'create', 'fields': {...}},
+    {'action': 'update', 'id': ..., 'fields': {...}}, {'action': 'archive' | 'restore', 'id': ...}
+    с уже проверенными полями или {'error': ...} для не прошедшей проверку.
+    Принадлежность всех упомянутых счетов пользователю проверяется одним
+    запросом, все изменения фиксируются одним commit. Возвращает (применен
+    ли пакет, результаты по операциям в исходном порядке); при atomic
+    любая ошибка отменяет весь пакет.
+    """
+    conn = get_db()
+    ids = sorted({op['id'] for op in operations if 'error' not in op and op['action'] != 'create'})
+    owned = {}
+    if ids:
+        owned = {row[0]: row for row in conn.execute(
+            ACCOUNT_CURRENCY_QUERY.format(placeholders=', '.join('?' * len(ids))),
+            (user_id, *ids)
+        )}
+
+    results = []
+    for op in operations:
+        if 'error' in op:
+            results.append({'success': False, 'error': op['error']})
+        elif op['action'] != 'create' and op['id'] not in owned:
+            results.append({'success': False, 'error': 'Счет не найден'})
+        elif op['action'] == 'update' and not any(v is not None for v in op['fields'].values()):
+            results.append({'success': False, 'error': 'Нет данных для обновления'})
+        elif op['action'] == 'update' and _currency_change_blocked(owned[op['id']], op['fields'].get('currency')):
+            results.append({'success': False, 'error': CURRENCY_LOCKED_ERROR})
+        else:
+            results.append(None)
+
+    failed = any(result is not None for result in results)
+    if atomic and failed:
+        return False, [result or {'success': False, 'error': 'Пакет отменен'} for result in results]
+
+    applied = 0
+    try:
+        now = datetime.now()
+        for index, op in enumerate(operations):
+            if results[index] is not None:
+                continue
+            action = op['action']
+            if action == 'create':
+                fields = op['fields']
+                cursor = conn.execute(
+                    '''INSERT INTO accounts (user_id, name, type, currency, bank_id,
+                       initial_balance, archived, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, 0, ?)''',
+                    (user_id, fields['name'], fields['account_type'], fields['currency'],
+                     fields['bank_id'], fields['initial_balance'], now)
+                )
+                results[index] = {'success': True, 'account_id': cursor.lastrowid}
+            elif action == 'update':
+                changes = [(column, op['fields'][field]) for field, column in UPDATE_COLUMNS
+                           if op['fields'].get(field) is not None]
+                conn.execute(
+                    f"UPDATE accounts SET {', '.join(f'{column} = ?' for column, _ in changes)} "
+                    "WHERE id = ? AND user_id = ?",
+                    (*(value for _, value in changes), op['id'], user_id)
+                )
+                results[index] = {'success': True, 'account_id': op['id']}
+            else:
+                conn.execute('UPDATE accounts SET archived = ? WHERE id = ? AND user_id = ?',
+                             (ARCHIVE_ACTIONS[action], op['id'], user_id))
+                results[index] = {'success': True, 'account_id': op['id']}
+            applied += 1
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        return False, [{'success': False, 'error': f"Ошибка пакетной операции: {str(e)}"}
+                       for _ in operations]
+
+    if applied:
+        invalidate_user(user_id)
+    return True, results
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+class ReferenceData:
+    """Справочник из JSON-файла, загружаемый один раз и кэшируемый в памяти.
+
+    Файл перечитывается только при изменении mtime или размера (проверка
+    не чаще раза в check_interval секунд). Вместе с данными хранятся
+    индекс кодов для проверки допустимости и готовое JSON-тело ответа с ETag.
+    """
+
+    def __init__(self, path: str, key: str, code_field: str, check_interval: float = 1.0):
+        self.path = path
+        self.key = key
+        self.code_field = code_field
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._set_items([])
+
+    def _set_items(self, items: List[Dict]):
+        by_code = {item[self.code_field]: item for item in items if self.code_field in item}
+        payload = json.dumps({self.key: items}, ensure_ascii=False,
+                             separators=(',', ':')).encode('utf-8')
+        # Состояние заменяется одной ссылкой, чтобы читатели не видели
+        # данные и ETag от разных версий файла
+        self._state = (items, by_code, frozenset(by_code), payload,
+                       hashlib.sha1(payload).hexdigest())
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return
+
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    items = json.load(f).get(self.key, [])
+            except Exception as e:
+                # Битый файл не сбрасывает уже загруженные данные
+                print(f"Ошибка загрузки справочника {self.path}: {e}")
+                return
+
+            self._set_items(items)
+            self._signature = signature
+
+    @property
+    def items(self) -> List[Dict]:
+        """Элементы справочника в порядке файла"""
+        self._refresh()
+        return self._state[0]
+
+    @property
+    def codes(self) -> frozenset:
+        """Множество допустимых кодов"""
+        self._refresh()
+        return self._state[2]
+
+    def get(self, code: str) -> Optional[Dict]:
+        """Элемент справочника по коду"""
+        self._refresh()
+        return self._state[1].get(code)
+
+    def serialized(self) -> Tuple[bytes, str]:
+        """Готовое JSON-тело ответа и его ETag"""
+        self._refresh()
+        return self._state[3], self._state[4]
+
+banks = ReferenceData('static/data/banks.json', 'banks', 'id')
+currencies = ReferenceData('static/data/currencies.json', 'currencies', 'code')
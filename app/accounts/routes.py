@@ -1,28 +1,124 @@
-from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
+from typing import Dict, Optional, Tuple
+from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for, Response
 from app.accounts.models import (
     create_account, get_user_accounts, get_account_by_id,
-    update_account, archive_account, restore_account
+    update_account, archive_account, restore_account,
+    get_account_daily_balances, apply_account_batch, Account
 )
-import json
-import os
+from app.accounts.reference import banks, currencies
+from app.accounts.versions import data_etag
+from app.db import get_db
+from app.money import to_minor
+from app.serialization import columns_payload
 
 accounts_bp = Blueprint('accounts', __name__, url_prefix='/accounts')
 
-def load_banks():
-    """Загрузка справочника банков"""
-    try:
-        with open('static/data/banks.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {"banks": []}
+ACCOUNT_TYPES = frozenset(['checking', 'savings', 'credit', 'deposit', 'investment', 'cash'])
+
+# Операций в одном пакетном запросе
+MAX_BATCH_OPERATIONS = 100
+
+def reference_response(reference):
+    """Ответ со справочником из кэша с поддержкой If-None-Match"""
+    payload, etag = reference.serialized()
+    response = Response(payload, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def versioned_response(user_id: int, build):
+    """JSON-ответ build() с weak ETag версии данных пользователя.
+
+    Если у клиента актуальная версия, отвечает 304 без запросов к данным
+    и сериализации. Версия читается до данных: при записи между ними
+    ответ получит старую версию и следующий запрос просто повторит выборку.
+    """
+    etag = data_etag(get_db(), user_id)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _text(data: Dict, key: str) -> Optional[str]:
+    value = data.get(key)
+    return (value.strip() or None) if isinstance(value, str) else None
 
-def load_currencies():
-    """Загрузка справочника валют"""
+def validate_new_account(data: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """Проверка полей нового счета. Возвращает (аргументы create_account, ошибка)"""
+    name = _text(data, 'name')
+    account_type = _text(data, 'type')
+    currency = _text(data, 'currency')
+    
+    if not name:
+        return None, 'Название счета обязательно'
+    if not account_type:
+        return None, 'Тип счета обязателен'
+    if not currency:
+        return None, 'Валюта обязательна'
+    if currency not in currencies.codes:
+        return None, 'Недопустимая валюта'
+    
+    bank_id = _text(data, 'bank_id')
+    if bank_id and bank_id not in banks.codes:
+        return None, 'Недопустимый банк'
+    
+    # Точный перевод начального баланса в минимальные единицы
     try:
-        with open('static/data/currencies.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {"currencies": []}
+        initial_balance = to_minor(data.get('initial_balance') or 0, currency)
+    except (ValueError, TypeError):
+        return None, 'Неверный формат начального баланса'
+    
+    if account_type not in ACCOUNT_TYPES:
+        return None, 'Недопустимый тип счета'
+    
+    return {
+        'name': name,
+        'account_type': account_type,
+        'currency': currency,
+        'bank_id': bank_id,
+        'initial_balance': initial_balance
+    }, None
+
+def validate_account_changes(data: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """Проверка изменяемых полей счета. Возвращает (аргументы update_account, ошибка)"""
+    fields = {
+        'name': _text(data, 'name'),
+        'account_type': _text(data, 'type'),
+        'currency': _text(data, 'currency'),
+        'bank_id': _text(data, 'bank_id')
+    }
+    if fields['currency'] and fields['currency'] not in currencies.codes:
+        return None, 'Недопустимая валюта'
+    if fields['bank_id'] and fields['bank_id'] not in banks.codes:
+        return None, 'Недопустимый банк'
+    if fields['account_type'] and fields['account_type'] not in ACCOUNT_TYPES:
+        return None, 'Недопустимый тип счета'
+    return fields, None
+
+def parse_batch_operation(item) -> Dict:
+    """Операция пакета для apply_account_batch: проверенные поля или {'error': ...}"""
+    if not isinstance(item, dict):
+        return {'error': 'Операция должна быть объектом'}
+    
+    action = item.get('action')
+    if action == 'create':
+        fields, error = validate_new_account(item)
+        return {'error': error} if error else {'action': action, 'fields': fields}
+    if action not in ('update', 'archive', 'restore'):
+        return {'error': 'Неизвестная операция'}
+    
+    account_id = item.get('id')
+    if not isinstance(account_id, int) or isinstance(account_id, bool):
+        return {'error': 'Не указан счет'}
+    if action == 'update':
+        fields, error = validate_account_changes(item)
+        return {'error': error} if error else {'action': action, 'id': account_id, 'fields': fields}
+    return {'action': action, 'id': account_id}
 
 @accounts_bp.route('/')
 def accounts_list():
@@ -37,24 +133,32 @@ def create_account_page():
     if 'user_id' not in session:
         return redirect(url_for('auth.login_page'))
     
-    banks = load_banks()
-    currencies = load_currencies()
-    
     return render_template('create_account.html', 
-                         banks=banks['banks'], 
-                         currencies=currencies['currencies'])
+                         banks=banks.items, 
+                         currencies=currencies.items)
 
 @accounts_bp.route('/api/accounts', methods=['GET'])
 def api_get_accounts():
-    """API: Получение списка счетов пользователя"""
+    """API: Получение списка счетов пользователя.
+    
+    С format=columns счета отдаются колоночным форматом:
+    {"columns": ["id", ...], "rows": [[1, ...], ...]}.
+    """
     if 'user_id' not in session:
         return jsonify({'success': False, 'error': 'Не авторизован'}), 401
     
     user_id = session['user_id']
     include_archived = request.args.get('include_archived', 'false').lower() == 'true'
     
-    accounts = get_user_accounts(user_id, include_archived)
-    return jsonify({'success': True, 'accounts': accounts})
+    if request.args.get('format') == 'columns':
+        return versioned_response(user_id, lambda: jsonify({
+            'success': True,
+            **columns_payload(Account, get_user_accounts(user_id, include_archived))
+        }))
+    
+    return versioned_response(user_id, lambda: jsonify({
+        'success': True, 'accounts': get_user_accounts(user_id, include_archived)
+    }))
 
 @accounts_bp.route('/api/accounts', methods=['POST'])
 def api_create_account():
@@ -65,52 +169,12 @@ def api_create_account():
     data = request.get_json()
     user_id = session['user_id']
     
-    # Валидация обязательных полей
-    name = data.get('name', '').strip()
-    account_type = data.get('type', '').strip()
-    currency = data.get('currency', '').strip()
-    
-    if not name:
-        return jsonify({'success': False, 'error': 'Название счета обязательно'})
-    if not account_type:
-        return jsonify({'success': False, 'error': 'Тип счета обязателен'})
-    if not currency:
-        return jsonify({'success': False, 'error': 'Валюта обязательна'})
-    
-    # Валидация валюты
-    currencies = load_currencies()
-    valid_currencies = [c['code'] for c in currencies['currencies']]
-    if currency not in valid_currencies:
-        return jsonify({'success': False, 'error': 'Недопустимая валюта'})
-    
-    # Валидация банка (если указан)
-    bank_id = data.get('bank_id', '').strip() or None
-    if bank_id:
-        banks = load_banks()
-        valid_banks = [b['id'] for b in banks['banks']]
-        if bank_id not in valid_banks:
-            return jsonify({'success': False, 'error': 'Недопустимый банк'})
-    
-    # Валидация начального баланса
-    try:
-        initial_balance = float(data.get('initial_balance', 0))
-    except (ValueError, TypeError):
-        return jsonify({'success': False, 'error': 'Неверный формат начального баланса'})
-    
-    # Валидация типа счета
-    valid_types = ['checking', 'savings', 'credit', 'deposit', 'investment', 'cash']
-    if account_type not in valid_types:
-        return jsonify({'success': False, 'error': 'Недопустимый тип счета'})
+    fields, error = validate_new_account(data)
+    if error:
+        return jsonify({'success': False, 'error': error})
     
     # Создание счета
-    success, result = create_account(
-        user_id=user_id,
-        name=name,
-        account_type=account_type,
-        currency=currency,
-        bank_id=bank_id,
-        initial_balance=initial_balance
-    )
+    success, result = create_account(user_id=user_id, **fields)
     
     if success:
         return jsonify({'success': True, 'account_id': result})
@@ -124,12 +188,33 @@ def api_get_account(account_id):
         return jsonify({'success': False, 'error': 'Не авторизован'}), 401
     
     user_id = session['user_id']
-    account = get_account_by_id(account_id, user_id)
     
-    if account:
-        return jsonify({'success': True, 'account': account})
-    else:
+    def build():
+        account = get_account_by_id(account_id, user_id)
+        if account:
+            return jsonify({'success': True, 'account': account})
+        response = jsonify({'success': False, 'error': 'Счет не найден'})
+        response.status_code = 404
+        return response
+    
+    return versioned_response(user_id, build)
+
+@accounts_bp.route('/api/accounts/<int:account_id>/balances', methods=['GET'])
+def api_get_account_balances(account_id):
+    """API: Дневные остатки счета"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+    
+    user_id = session['user_id']
+    days = get_account_daily_balances(
+        account_id, user_id,
+        date_from=request.args.get('from'),
+        date_to=request.args.get('to')
+    )
+    
+    if days is None:
         return jsonify({'success': False, 'error': 'Счет не найден'}), 404
+    return jsonify({'success': True, 'balances': days})
 
 @accounts_bp.route('/api/accounts/<int:account_id>', methods=['PUT'])
 def api_update_account(account_id):
@@ -140,40 +225,11 @@ def api_update_account(account_id):
     data = request.get_json()
     user_id = session['user_id']
     
-    # Валидация данных
-    name = data.get('name', '').strip() if data.get('name') else None
-    account_type = data.get('type', '').strip() if data.get('type') else None
-    currency = data.get('currency', '').strip() if data.get('currency') else None
-    bank_id = data.get('bank_id', '').strip() if data.get('bank_id') else None
-    
-    # Валидация валюты (если указана)
-    if currency:
-        currencies = load_currencies()
-        valid_currencies = [c['code'] for c in currencies['currencies']]
-        if currency not in valid_currencies:
-            return jsonify({'success': False, 'error': 'Недопустимая валюта'})
-    
-    # Валидация банка (если указан)
-    if bank_id:
-        banks = load_banks()
-        valid_banks = [b['id'] for b in banks['banks']]
-        if bank_id not in valid_banks:
-            return jsonify({'success': False, 'error': 'Недопустимый банк'})
-    
-    # Валидация типа счета (если указан)
-    if account_type:
-        valid_types = ['checking', 'savings', 'credit', 'deposit', 'investment', 'cash']
-        if account_type not in valid_types:
-            return jsonify({'success': False, 'error': 'Недопустимый тип счета'})
-    
-    success, result = update_account(
-        account_id=account_id,
-        user_id=user_id,
-        name=name,
-        account_type=account_type,
-        currency=currency,
-        bank_id=bank_id
-    )
+    fields, error = validate_account_changes(data)
+    if error:
+        return jsonify({'success': False, 'error': error})
+    
+    success, result = update_account(account_id=account_id, user_id=user_id, **fields)
     
     if success:
         return jsonify({'success': True, 'message': result})
@@ -208,14 +264,41 @@ def api_restore_account(account_id):
     else:
         return jsonify({'success': False, 'error': result})
 
+@accounts_bp.route('/api/accounts/batch', methods=['POST'])
+def api_account_batch():
+    """API: Пакет операций со счетами (create, update, archive, restore) одной транзакцией.
+    
+    Тело: {"operations": [{"action": "archive", "id": 5}, {"action": "create", "name": ...}],
+    "atomic": false}. Результаты возвращаются по операциям в том же порядке;
+    с atomic ошибка в любой операции отменяет весь пакет.
+    """
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    items = data.get('operations')
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'error': 'Список операций пуст'})
+    if len(items) > MAX_BATCH_OPERATIONS:
+        return jsonify({'success': False, 'error': f'Не больше {MAX_BATCH_OPERATIONS} операций в пакете'})
+    
+    operations = [parse_batch_operation(item) for item in items]
+    success, results = apply_account_batch(session['user_id'], operations, atomic=bool(data.get('atomic')))
+    if not success:
+        return jsonify({'success': False, 'error': 'Пакет не применен', 'results': results})
+    
+    return jsonify({
+        'success': True,
+        'applied': sum(result['success'] for result in results),
+        'results': results
+    })
+
 @accounts_bp.route('/api/data/banks', methods=['GET'])
 def api_get_banks():
     """API: Получение справочника банков"""
-    banks = load_banks()
-    return jsonify(banks)
+    return reference_response(banks)
 
 @accounts_bp.route('/api/data/currencies', methods=['GET'])
 def api_get_currencies():
     """API: Получение справочника валют"""
-    currencies = load_currencies()
-    return jsonify(currencies)
\ No newline at end of file
+    return reference_response(currencies)
\ No newline at end of file
@@ -0,0 +1,26 @@
+import sqlite3
+
+VERSIONS_SCHEMA_PATH = 'database/versions.sql'
+
+def get_data_version(conn: sqlite3.Connection, user_id: int) -> int:
+    """Версия данных пользователя: растет при любой записи в его счета и транзакции"""
+    row = conn.execute('SELECT version FROM user_data_versions WHERE user_id = ?', (user_id,)).fetchone()
+    return row[0] if row else 0
+
+def bump_data_version(conn: sqlite3.Connection, user_id: int):
+    """Увеличение версии после пакетной вставки при отключенных через
+    suspend_ledger триггерах. Не делает commit.
+    """
+    conn.execute(
+        '''INSERT INTO user_data_versions (user_id, version) VALUES (?, 1)
+           ON CONFLICT(user_id) DO UPDATE SET version = version + 1''',
+        (user_id,)
+    )
+
+def data_etag(conn: sqlite3.Connection, user_id: int) -> str:
+    """Значение ETag для ответов по данным пользователя.
+
+    Пользователь входит в значение: после смены пользователя в браузере
+    ответ с той же версией чужих данных не считается актуальным.
+    """
+    return f'u{user_id}-v{get_data_version(conn, user_id)}'
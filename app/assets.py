@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from typing import Dict, List, Optional
+from flask import Response, abort, request
+from werkzeug.security import safe_join
+
+# Brotli необязателен: без него отдаются gzip и несжатые файлы
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Типы файлов, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json',
+                      'application/manifest+json', 'image/svg+xml')
+
+# Исходник service worker; отдается по постоянному адресу из корня сайта,
+# чтобы его область охватывала все страницы
+SERVICE_WORKER_SOURCE = 'js/sw.js'
+SERVICE_WORKER_URL = '/sw.js'
+
+# Каталоги static/, файлы которых service worker кэширует при установке
+PRECACHE_DIRS = ('css/', 'js/')
+
+class Asset:
+    """Файл static/ в памяти: хеш содержимого и варианты по кодировке"""
+
+    __slots__ = ('path', 'hashed_path', 'mimetype', 'digest', 'mtime', 'size', 'variants')
+
+    def __init__(self, path: str, data: bytes, mtime: float = 0.0, min_size: int = 0):
+        self.path = path
+        self.digest = hashlib.blake2b(data, digest_size=6).hexdigest()
+        stem, ext = os.path.splitext(path)
+        self.hashed_path = f'{stem}.{self.digest}{ext}'
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.mtime = mtime
+        self.size = len(data)
+        self.variants = {'identity': data}
+        if len(data) >= min_size and self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(data, 9, mtime=0)
+            if len(compressed) < len(data):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.variants['br'] = compressed
+
+class AssetPipeline:
+    """Статические файлы со сжатием и долгим кэшированием.
+
+    При старте каждый файл static/ читается в память, для него
+    вычисляются хеш содержимого и сжатые варианты (gzip, brotli).
+    url_for('static', ...) возвращает имя с хешем (css/main.1a2b3c4d5e6f.css),
+    такой адрес неизменен и кэшируется браузером на год без проверок.
+    По исходному имени файл отдается с no-cache и ETag: повторный запрос
+    получает 304 без тела. Измененный на диске файл пересобирается при
+    следующем запросе по исходному имени.
+    """
+
+    def __init__(self, root: str, static_url_path: str = '/static',
+                 max_age: int = 31536000, min_size: int = 512):
+        self.root = root
+        self.static_url_path = static_url_path
+        self.max_age = max_age
+        self.min_size = min_size
+        self._assets: Dict[str, Asset] = {}
+        self._hashed: Dict[str, Asset] = {}
+        self._service_worker: Optional[Asset] = None
+        self._lock = threading.Lock()
+        self.build()
+
+    def _load(self, path: str) -> Optional[Asset]:
+        full = safe_join(self.root, path)
+        if full is None or not os.path.isfile(full):
+            return None
+        mtime = os.path.getmtime(full)
+        with open(full, 'rb') as f:
+            return Asset(path, f.read(), mtime, self.min_size)
+
+    def _add(self, asset: Asset):
+        # Прежний адрес с хешем остается рабочим для уже загруженных страниц
+        self._assets[asset.path] = asset
+        self._hashed[asset.hashed_path] = asset
+        if asset.path == SERVICE_WORKER_SOURCE or asset.path.startswith(PRECACHE_DIRS):
+            self._service_worker = None
+
+    def build(self):
+        """Чтение и сжатие всех файлов static/"""
+        with self._lock:
+            self._assets.clear()
+            self._hashed.clear()
+            self._service_worker = None
+            for directory, subdirectories, files in os.walk(self.root):
+                subdirectories[:] = sorted(name for name in subdirectories if not name.startswith('.'))
+                for name in sorted(files):
+                    if name.startswith('.'):
+                        continue
+                    path = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+                    asset = self._load(path)
+                    if asset is not None:
+                        self._add(asset)
+
+    def url_path(self, filename: str) -> str:
+        """Имя файла с хешем для url_for; неизвестный файл — без изменений"""
+        asset = self._assets.get(filename)
+        return asset.hashed_path if asset is not None else filename
+
+    def lookup(self, filename: str):
+        """(файл, неизменен ли адрес) по имени из URL; (None, False), если файла нет"""
+        asset = self._hashed.get(filename)
+        if asset is not None:
+            return asset, True
+
+        full = safe_join(self.root, filename)
+        if full is None or not os.path.isfile(full):
+            return None, False
+        asset = self._assets.get(filename)
+        if asset is None or os.path.getmtime(full) != asset.mtime:
+            with self._lock:
+                asset = self._load(filename)
+                if asset is None:
+                    return None, False
+                self._add(asset)
+        return asset, False
+
+    def precache_urls(self) -> List[str]:
+        """Адреса с хешем оболочки приложения для service worker"""
+        return sorted(
+            f'{self.static_url_path}/{asset.hashed_path}'
+            for asset in self._assets.values()
+            if asset.path.startswith(PRECACHE_DIRS) and asset.path != SERVICE_WORKER_SOURCE and asset.size
+        )
+
+    def service_worker(self) -> Optional[Asset]:
+        """Service worker с подставленными версией и списком предзагрузки"""
+        worker = self._service_worker
+        if worker is not None:
+            return worker
+        source = self._assets.get(SERVICE_WORKER_SOURCE)
+        if source is None:
+            return None
+        urls = self.precache_urls()
+        version = hashlib.blake2b('\n'.join(urls).encode('utf-8'), digest_size=6).hexdigest()
+        prelude = f'self.__ASSETS = {json.dumps({"version": version, "urls": urls})};\n'
+        worker = Asset(SERVICE_WORKER_SOURCE, prelude.encode('utf-8') + source.variants['identity'],
+                       source.mtime, self.min_size)
+        self._service_worker = worker
+        return worker
+
+    def response(self, asset: Asset, immutable: bool) -> Response:
+        """Ответ с лучшей из принимаемых клиентом кодировок, ETag и Cache-Control"""
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.variants) > 1:
+            response.vary.add('Accept-Encoding')
+        # У каждого варианта свой ETag: сжатое и несжатое тело различаются
+        response.set_etag(asset.digest if encoding == 'identity' else f'{asset.digest}-{encoding}')
+        if immutable:
+            response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+def init_app(app):
+    """Отдача static/ через AssetPipeline и service worker по адресу /sw.js"""
+    pipeline = AssetPipeline(
+        app.static_folder,
+        app.static_url_path,
+        app.config.get('ASSETS_MAX_AGE', 31536000),
+        app.config.get('ASSETS_COMPRESS_MIN_SIZE', 512)
+    )
+    app.extensions['assets'] = pipeline
+
+    def send_static(filename):
+        asset, immutable = pipeline.lookup(filename)
+        if asset is None:
+            abort(404)
+        return pipeline.response(asset, immutable)
+
+    def send_service_worker():
+        worker = pipeline.service_worker()
+        if worker is None:
+            abort(404)
+        return pipeline.response(worker, False)
+
+    app.view_functions['static'] = send_static
+    app.add_url_rule(SERVICE_WORKER_URL, 'service_worker', send_service_worker)
+
+    @app.url_defaults
+    def hashed_static_filename(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = pipeline.url_path(values['filename'])
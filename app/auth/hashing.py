@@ -0,0 +1,99 @@
+import threading
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app, has_app_context
+from app.instrumentation import timed
+from config import Config
+
+class HashingBusy(Exception):
+    """Очередь хеширования паролей переполнена"""
+
+class PasswordHasher:
+    """Хеширование паролей bcrypt в отдельном ограниченном пуле потоков.
+
+    Одновременно выполняется не больше workers вычислений bcrypt, еще
+    max_pending ждут в очереди; сверх этого вызов сразу завершается
+    HashingBusy, чтобы всплеск логинов не занимал все потоки сервера.
+    Вызов, не получивший результат за timeout секунд, тоже завершается
+    HashingBusy (маршруты auth отвечают 503 с Retry-After).
+    При workers = 0 хеширование выполняется в вызывающем потоке.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 16,
+                 timeout: float = 10.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix='bcrypt')
+            self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def _run(self, func, *args):
+        if self._executor is None:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy("Сервер перегружен, попробуйте позже")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Пул не успел за timeout: это перегрузка, а не неверный пароль.
+            # Еще не начатое вычисление снимается с очереди
+            future.cancel()
+            raise HashingBusy("Сервер перегружен, попробуйте позже")
+
+    def hash(self, password: str) -> bytes:
+        """Хеш пароля с текущей стоимостью"""
+        with timed('bcrypt'):
+            return self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+
+    def verify(self, password: str, password_hash: bytes) -> bool:
+        """Проверка пароля по хешу"""
+        with timed('bcrypt'):
+            return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash)
+
+    def needs_rehash(self, password_hash: bytes) -> bool:
+        """Хеш создан с другой стоимостью и должен быть пересчитан"""
+        # Формат bcrypt: $2b$<cost>$<salt+hash>
+        try:
+            return int(password_hash.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+def _create_hasher(config) -> PasswordHasher:
+    return PasswordHasher(
+        rounds=config.get('BCRYPT_ROUNDS', Config.BCRYPT_ROUNDS),
+        workers=config.get('PASSWORD_HASH_WORKERS', Config.PASSWORD_HASH_WORKERS),
+        max_pending=config.get('PASSWORD_HASH_QUEUE_DEPTH', Config.PASSWORD_HASH_QUEUE_DEPTH),
+        timeout=config.get('PASSWORD_HASH_TIMEOUT', Config.PASSWORD_HASH_TIMEOUT)
+    )
+
+_default_hasher = None
+_default_lock = threading.Lock()
+
+def get_hasher() -> PasswordHasher:
+    """Хешер текущего приложения; вне контекста — общий по настройкам Config"""
+    global _default_hasher
+    if has_app_context() and 'password_hasher' in current_app.extensions:
+        return current_app.extensions['password_hasher']
+
+    with _default_lock:
+        if _default_hasher is None:
+            _default_hasher = _create_hasher(vars(Config))
+        return _default_hasher
+
+def init_app(app):
+    """Создание пула хеширования для приложения"""
+    app.extensions['password_hasher'] = _create_hasher(app.config)
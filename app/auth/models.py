@@ -1,11 +1,6 @@
-import sqlite3
-import bcrypt
 from datetime import datetime
-
-def get_db():
-    conn = sqlite3.connect('database/finance.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+from app.db import get_db, release_db
+from app.auth.hashing import get_hasher, HashingBusy
 
 def create_user(email, password):
     conn = get_db()
@@ -15,8 +10,10 @@ def create_user(email, password):
         if existing:
             return False, "Email уже зарегистрирован"
         
-        # Хеширование пароля
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        # Хеширование пароля; соединение на это время возвращаем в пул
+        release_db()
+        password_hash = get_hasher().hash(password)
+        conn = get_db()
         
         # Создание пользователя
         cursor = conn.execute(
@@ -25,10 +22,12 @@ def create_user(email, password):
         )
         conn.commit()
         return True, cursor.lastrowid
+    except HashingBusy:
+        raise
     except Exception as e:
+        # Соединение могло быть возвращено в пул, откатываем текущее
+        get_db().rollback()
         return False, f"Ошибка создания пользователя: {str(e)}"
-    finally:
-        conn.close()
 
 def verify_user(email, password):
     conn = get_db()
@@ -37,11 +36,29 @@ def verify_user(email, password):
         if not user:
             return False, "Неверный email или пароль"
         
-        if bcrypt.checkpw(password.encode('utf-8'), user['password_hash']):
-            return True, user['id']
-        else:
+        # Проверка пароля без удержания соединения с БД
+        release_db()
+        hasher = get_hasher()
+        if not hasher.verify(password, user['password_hash']):
             return False, "Неверный email или пароль"
+        
+        # Стоимость хеширования изменилась в настройках — пересчитываем хеш,
+        # пока пароль известен. Ошибка пересчета не мешает входу
+        if hasher.needs_rehash(user['password_hash']):
+            try:
+                password_hash = hasher.hash(password)
+                conn = get_db()
+                conn.execute(
+                    'UPDATE users SET password_hash = ? WHERE id = ?',
+                    (password_hash, user['id'])
+                )
+                conn.commit()
+            except Exception as e:
+                get_db().rollback()
+                print(f"Ошибка обновления хеша пароля: {e}")
+        
+        return True, user['id']
+    except HashingBusy:
+        raise
     except Exception as e:
-        return False, f"Ошибка входа: {str(e)}"
-    finally:
-        conn.close()
\ No newline at end of file
+        return False, f"Ошибка входа: {str(e)}"
\ No newline at end of file
@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
 from app.auth.models import create_user, verify_user
+from app.auth.hashing import HashingBusy
 from app.auth.validators import is_valid_email, is_valid_password
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+@auth_bp.errorhandler(HashingBusy)
+def handle_hashing_busy(error):
+    response = jsonify({'success': False, 'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/login')
 def login_page():
     return render_template('login.html')
@@ -0,0 +1,299 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from flask import current_app, has_app_context
+from config import Config
+from app.records import Record
+
+# Записей одного кэша на пользователя в среднем: ограничение хранилища SQLite
+SQLITE_ENTRIES_PER_USER = 8
+# Время последнего чтения в SQLite обновляется не чаще раза за столько секунд
+SQLITE_TOUCH_INTERVAL = 60.0
+
+_MISSING = object()
+
+def encode_value(value):
+    """Значение кэша в JSON-совместимую структуру.
+
+    Типы, которых нет в JSON (кортежи, даты, записи моделей, словари с
+    нестроковыми ключами), оборачиваются в объект с ключом '$тип', поэтому
+    decode_value восстанавливает значение без потерь. Исполняемого кода в
+    хранилище нет, в отличие от pickle.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Record):
+        return {'$record': type(value).__name__, 'values': [encode_value(item) for item in value.to_tuple()]}
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {'$tuple': [encode_value(item) for item in value]}
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith('$') for key in value):
+            return {key: encode_value(item) for key, item in value.items()}
+        return {'$dict': [[encode_value(key), encode_value(item)] for key, item in value.items()]}
+    raise TypeError(f"Значение типа {type(value).__name__} не сохраняется в кэше")
+
+def _decode_object(obj: Dict):
+    if '$record' in obj:
+        return Record.types[obj['$record']](*obj['values'])
+    if '$tuple' in obj:
+        return tuple(obj['$tuple'])
+    if '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    if '$date' in obj:
+        return date.fromisoformat(obj['$date'])
+    if '$dict' in obj:
+        return {key: item for key, item in obj['$dict']}
+    return obj
+
+def decode_value(text: str):
+    """Значение кэша из JSON, записанного encode_value"""
+    return json.loads(text, object_hook=_decode_object)
+
+class MemoryBackend:
+    """LRU в памяти процесса.
+
+    Число пользователей ограничено, вытесняются давно не читавшиеся.
+    """
+
+    kind = 'memory'
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key):
+        with self._lock:
+            entries = self._data.get(user_id)
+            if entries is None:
+                return _MISSING
+            self._data.move_to_end(user_id)
+            return entries.get(key, _MISSING)
+
+    def set(self, user_id: int, key, value) -> int:
+        """Запись значения; возвращает число вытесненных пользователей"""
+        with self._lock:
+            entries = self._data.get(user_id)
+            if entries is not None:
+                self._data.move_to_end(user_id)
+                entries[key] = value
+                return 0
+            self._data[user_id] = {key: value}
+            if len(self._data) > self.max_users:
+                self._data.popitem(last=False)
+                return 1
+            return 0
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+class SQLiteBackend:
+    """Хранилище в файле SQLite, общее для процессов на одной машине.
+
+    Для нескольких процессов веб-сервера и воркеров run_workers.py: сброс
+    кэша пользователя в одном процессе виден всем остальным. Значения
+    хранятся в JSON (encode_value), поэтому каждое чтение возвращает копию,
+    а запись в файл кэша не может выполнить код в процессах. Число
+    записей кэша ограничено, вытесняются давно не читавшиеся.
+    """
+
+    kind = 'sqlite'
+
+    def __init__(self, path: str, name: str, max_entries: int = 8192):
+        self.path = path
+        self.name = name
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Соединение на поток и процесс: после fork соединение родителя не используется
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute(
+            '''CREATE TABLE IF NOT EXISTS cache_entries (
+                   cache TEXT NOT NULL,
+                   user_id INTEGER NOT NULL,
+                   key TEXT NOT NULL,
+                   value TEXT NOT NULL,
+                   accessed REAL NOT NULL,
+                   PRIMARY KEY (cache, user_id, key)
+               ) WITHOUT ROWID'''
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(cache, accessed)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, user_id: int, key):
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, accessed FROM cache_entries WHERE cache = ? AND user_id = ? AND key = ?',
+            (self.name, user_id, repr(key))
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        now = time.time()
+        if now - row[1] > SQLITE_TOUCH_INTERVAL:
+            conn.execute(
+                'UPDATE cache_entries SET accessed = ? WHERE cache = ? AND user_id = ? AND key = ?',
+                (now, self.name, user_id, repr(key))
+            )
+        try:
+            return decode_value(row[0])
+        except (ValueError, TypeError, KeyError):
+            # Запись в прежнем формате (pickle) или неизвестного типа — промах
+            return _MISSING
+
+    def set(self, user_id: int, key, value) -> int:
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (cache, user_id, key, value, accessed) VALUES (?, ?, ?, ?, ?)',
+            (self.name, user_id, repr(key), json.dumps(encode_value(value), ensure_ascii=False), time.time())
+        )
+        # Размер проверяется не на каждой записи: COUNT(*) дороже самой записи
+        self._writes += 1
+        if self._writes % 64:
+            return 0
+        excess = self.size() - self.max_entries
+        if excess <= 0:
+            return 0
+        return conn.execute(
+            '''DELETE FROM cache_entries WHERE cache = ? AND (user_id, key) IN (
+                   SELECT user_id, key FROM cache_entries WHERE cache = ? ORDER BY accessed LIMIT ?)''',
+            (self.name, self.name, excess)
+        ).rowcount
+
+    def invalidate(self, user_id: int):
+        self._connect().execute('DELETE FROM cache_entries WHERE cache = ? AND user_id = ?',
+                                (self.name, user_id))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache_entries WHERE cache = ?', (self.name,))
+
+    def size(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entries WHERE cache = ?',
+                                       (self.name,)).fetchone()[0]
+
+def create_backend(name: str, max_users: int, config=None):
+    """Хранилище кэша по настройке CACHE_BACKEND: 'memory' или 'sqlite'"""
+    if config is None:
+        config = current_app.config if has_app_context() else vars(Config)
+    kind = config.get('CACHE_BACKEND', Config.CACHE_BACKEND)
+    if kind == 'memory':
+        return MemoryBackend(max_users)
+    if kind == 'sqlite':
+        return SQLiteBackend(config.get('CACHE_PATH', Config.CACHE_PATH), name,
+                             max_users * SQLITE_ENTRIES_PER_USER)
+    raise ValueError(f"Неизвестное хранилище кэша '{kind}'")
+
+class UserCache:
+    """Кэш вычисленных данных по пользователям.
+
+    Значения хранятся по паре (user_id, key). Любая запись данных
+    пользователя сбрасывает все его значения через invalidate_user().
+    Хранилище выбирается настройкой CACHE_BACKEND при первом обращении
+    (в памяти процесса или общее SQLite), число пользователей ограничено.
+    Попадания, промахи, сбросы и вытеснения считаются для stats().
+    """
+
+    def __init__(self, name: str, max_users: int = None, backend=None):
+        self.name = name
+        self.max_users = max_users or Config.CACHE_MAX_USERS
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend(self.name, self.max_users)
+        return self._backend
+
+    def use_backend(self, backend):
+        """Замена хранилища (например, общее SQLite для нескольких процессов)"""
+        with self._lock:
+            self._backend = backend
+
+    def get(self, user_id: int, key):
+        value = self.backend.get(user_id, key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return value
+
+    def set(self, user_id: int, key, value):
+        evicted = self.backend.set(user_id, key, value)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def invalidate(self, user_id: int):
+        self.backend.invalidate(user_id)
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        backend = self.backend
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'backend': backend.kind,
+                'size': backend.size(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions
+            }
+
+_caches: List[UserCache] = []
+
+def register_cache(cache: UserCache) -> UserCache:
+    """Регистрация кэша для сброса при изменении данных пользователя"""
+    _caches.append(cache)
+    return cache
+
+def invalidate_user(user_id: int):
+    """Сброс всех кэшей пользователя после записи его счетов или транзакций"""
+    for cache in _caches:
+        cache.invalidate(user_id)
+
+def cache_stats(name: Optional[str] = None) -> List[Dict]:
+    """Метрики зарегистрированных кэшей"""
+    return [cache.stats() for cache in _caches if name is None or cache.name == name]
@@ -0,0 +1,181 @@
+import os
+import queue
+import sqlite3
+import threading
+from flask import g, has_app_context, current_app
+from app.instrumentation import InstrumentedConnection
+from config import Config
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Все соединения пула заняты дольше допустимого времени ожидания"""
+
+class ConnectionPool:
+    """Ограниченный пул SQLite-соединений.
+
+    Соединение выдается одному потоку на время запроса и возвращается в пул
+    в teardown, поэтому потоки threaded-сервера не платят за connect и
+    PRAGMA на каждый вызов модели.
+    """
+
+    def __init__(self, path: str, max_size: int = 8, timeout: float = 10.0,
+                 busy_timeout_ms: int = 5000, cached_statements: int = 256,
+                 cache_size_kb: int = 16384, factory: type = sqlite3.Connection):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.cache_size_kb = cache_size_kb
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        """Открытие и настройка нового соединения"""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=self.factory
+        )
+        conn.row_factory = sqlite3.Row
+        # WAL позволяет читателям не блокировать писателя и наоборот,
+        # а synchronous=NORMAL в режиме WAL безопасен и избавляет от fsync на каждый коммит
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        # Страничный кэш больше стандартных 2 МБ: индексы transactions
+        # при пакетной вставке не вытесняются на диск
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Получение соединения из пула; блокируется, если пул исчерпан"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self.connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"Нет свободных соединений с БД ({self.max_size} заняты)")
+
+    def release(self, conn: sqlite3.Connection):
+        """Возврат соединения в пул; незавершенная транзакция откатывается"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Сломанное соединение не возвращаем, освобождаем место в пуле
+            with self._lock:
+                self._created -= 1
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Закрытие всех свободных соединений"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+_local = threading.local()
+
+def _reset_after_fork():
+    # Соединения SQLite нельзя использовать в дочернем процессе после fork
+    # (воркеры очереди задач): ребенок откроет собственные
+    global _pools, _pools_lock
+    _pools = {}
+    _pools_lock = threading.Lock()
+    _local.__dict__.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_pool(path: str = None) -> ConnectionPool:
+    """Пул соединений для БД по указанному пути (по умолчанию из конфигурации)"""
+    config = current_app.config if has_app_context() else vars(Config)
+    path = path or config.get('DATABASE_PATH', Config.DATABASE_PATH)
+    # Учет времени выражений для Server-Timing и /metrics (app/instrumentation.py).
+    # Фабрика входит в ключ: приложение с другим INSTRUMENTATION_ENABLED над тем
+    # же файлом получает свой пул, а не соединения без учета
+    factory = InstrumentedConnection if config.get('INSTRUMENTATION_ENABLED') else sqlite3.Connection
+
+    with _pools_lock:
+        pool = _pools.get((path, factory))
+        if pool is None:
+            pool = ConnectionPool(
+                path,
+                max_size=config.get('DB_POOL_SIZE', Config.DB_POOL_SIZE),
+                timeout=config.get('DB_POOL_TIMEOUT', Config.DB_POOL_TIMEOUT),
+                busy_timeout_ms=config.get('DB_BUSY_TIMEOUT_MS', Config.DB_BUSY_TIMEOUT_MS),
+                cached_statements=config.get('DB_CACHED_STATEMENTS', Config.DB_CACHED_STATEMENTS),
+                cache_size_kb=config.get('DB_CACHE_SIZE_KB', Config.DB_CACHE_SIZE_KB),
+                factory=factory
+            )
+            _pools[(path, factory)] = pool
+        return pool
+
+def get_db() -> sqlite3.Connection:
+    """Соединение с БД для текущего запроса.
+
+    Внутри контекста приложения соединение берется из пула один раз на
+    запрос и возвращается в teardown. Вне контекста (скрипты, тесты)
+    каждый поток переиспользует собственное соединение.
+    """
+    if has_app_context():
+        if 'db' not in g:
+            g.db = get_pool().acquire()
+        return g.db
+
+    pool = get_pool()
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get((pool.path, pool.factory))
+    if conn is None:
+        conn = conns[(pool.path, pool.factory)] = pool.connect()
+    return conn
+
+def release_db():
+    """Досрочный возврат соединения запроса в пул.
+
+    Используется перед долгими операциями без БД (например, bcrypt), чтобы
+    не держать соединение; следующий get_db() возьмет его из пула снова.
+    """
+    if has_app_context():
+        close_db()
+
+def close_db(exc=None):
+    """Возврат соединения запроса в пул"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def init_app(app):
+    """Регистрация обработчиков пула в приложении"""
+    app.teardown_appcontext(close_db)
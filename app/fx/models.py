@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from flask import current_app, has_app_context
+from config import Config
+from app.accounts.models import Account
+from app.db import get_db
+from app.fx.providers import create_provider, RateProviderError
+
+class RateSnapshot:
+    """Курсы валют относительно базовой на момент загрузки"""
+
+    __slots__ = ('base', 'rates', 'provider', 'fetched_at')
+
+    def __init__(self, base: str, rates: Dict[str, float], provider: str, fetched_at: datetime):
+        self.base = base
+        self.rates = dict(rates)
+        self.rates[base] = 1.0
+        self.provider = provider
+        self.fetched_at = fetched_at
+
+    def age(self) -> float:
+        """Возраст снимка в секундах"""
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+    def convert(self, amount: float, from_code: str, to_code: str) -> Optional[float]:
+        """Пересчет суммы; None, если курс одной из валют неизвестен"""
+        if from_code == to_code:
+            return amount
+        from_rate = self.rates.get(from_code)
+        to_rate = self.rates.get(to_code)
+        if not from_rate or not to_rate:
+            return None
+        return amount / from_rate * to_rate
+
+def save_snapshot(conn, snapshot: RateSnapshot):
+    conn.execute(
+        '''INSERT INTO exchange_rate_snapshots (base, provider, rates, fetched_at)
+           VALUES (?, ?, ?, ?)''',
+        (snapshot.base, snapshot.provider, json.dumps(snapshot.rates), snapshot.fetched_at)
+    )
+    conn.commit()
+
+def load_latest_snapshot(conn) -> Optional[RateSnapshot]:
+    row = conn.execute(
+        '''SELECT base, provider, rates, fetched_at FROM exchange_rate_snapshots
+           ORDER BY fetched_at DESC LIMIT 1'''
+    ).fetchone()
+    if not row:
+        return None
+    return RateSnapshot(row['base'], json.loads(row['rates']), row['provider'],
+                        datetime.fromisoformat(row['fetched_at']))
+
+class RateService:
+    """Курсы валют с кэшем в памяти.
+
+    Снимок живет в памяти ttl секунд. После этого сначала проверяется
+    последний снимок в БД (его мог загрузить другой процесс), и только затем
+    выполняется запрос к поставщику. Если поставщик недоступен, используется
+    последний известный снимок, даже устаревший, а следующая попытка
+    делается не раньше чем через retry_interval секунд. Пока курсы
+    обновляет другой поток, устаревший снимок отдается без ожидания.
+    """
+
+    def __init__(self, provider, ttl: float = 3600, retry_interval: float = 60):
+        self.provider = provider
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._snapshot = None
+        self._retry_at = 0.0  # time.monotonic() следующей попытки после ошибки поставщика
+        self._lock = threading.Lock()
+
+    def _usable(self, snapshot: Optional[RateSnapshot]) -> bool:
+        return snapshot is not None and (snapshot.age() < self.ttl or time.monotonic() < self._retry_at)
+
+    def get_rates(self) -> RateSnapshot:
+        snapshot = self._snapshot
+        if self._usable(snapshot):
+            return snapshot
+        if snapshot is None and time.monotonic() < self._retry_at:
+            raise RateProviderError("Курсы валют недоступны")
+
+        # Устаревший снимок отдается сразу, если обновление уже идет в другом потоке
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if self._usable(snapshot):
+                return snapshot
+
+            conn = get_db()
+            latest = load_latest_snapshot(conn)
+            if latest is not None and latest.age() < self.ttl:
+                self._snapshot = latest
+                return latest
+
+            try:
+                base, rates = self.provider.fetch()
+            except RateProviderError as e:
+                print(f"Ошибка обновления курсов: {e}")
+                self._retry_at = time.monotonic() + self.retry_interval
+                fallback = latest or snapshot
+                if fallback is None:
+                    raise
+                self._snapshot = fallback
+                return fallback
+
+            fresh = RateSnapshot(base, rates, self.provider.name, datetime.now())
+            save_snapshot(conn, fresh)
+            self._snapshot = fresh
+            self._retry_at = 0.0
+            return fresh
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Сброс кэша в памяти"""
+        with self._lock:
+            self._snapshot = None
+            self._retry_at = 0.0
+
+def _create_service(config) -> RateService:
+    return RateService(create_provider(config), config.get('FX_CACHE_TTL', Config.FX_CACHE_TTL),
+                       config.get('FX_RETRY_INTERVAL', Config.FX_RETRY_INTERVAL))
+
+_default_service = None
+_default_lock = threading.Lock()
+
+def get_rate_service() -> RateService:
+    """Сервис курсов текущего приложения; вне контекста — по настройкам Config"""
+    global _default_service
+    if has_app_context() and 'fx' in current_app.extensions:
+        return current_app.extensions['fx']
+
+    with _default_lock:
+        if _default_service is None:
+            _default_service = _create_service(vars(Config))
+        return _default_service
+
+def init_app(app):
+    """Создание сервиса курсов для приложения"""
+    app.extensions['fx'] = _create_service(app.config)
+
+def convert_balances(accounts: List[Account], target: str, snapshot: RateSnapshot) -> Dict:
+    """Пересчет балансов счетов в целевую валюту одним проходом"""
+    total = 0.0
+    converted_accounts = []
+    missing = set()
+
+    for account in accounts:
+        converted = snapshot.convert(account.current_balance, account.currency, target)
+        if converted is None:
+            missing.add(account.currency)
+        else:
+            total += converted
+        converted_accounts.append({
+            'id': account.id,
+            'currency': account.currency,
+            'balance': account.current_balance,
+            'converted': converted
+        })
+
+    return {
+        'currency': target,
+        'total': total,
+        'accounts': converted_accounts,
+        'missing_rates': sorted(missing),
+        'rates_base': snapshot.base,
+        'rates_fetched_at': snapshot.fetched_at.isoformat()
+    }
@@ -0,0 +1,51 @@
+import json
+import urllib.request
+from typing import Dict, Tuple
+
+class RateProviderError(Exception):
+    """Не удалось получить курсы у поставщика"""
+
+class FileRateProvider:
+    """Курсы из локального JSON-файла (офлайн-режим и тесты).
+
+    Формат файла: {"base": "USD", "rates": {"KZT": 475, ...}}
+    """
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> Tuple[str, Dict[str, float]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data['base'], {code: float(rate) for code, rate in data['rates'].items()}
+        except Exception as e:
+            raise RateProviderError(f"Ошибка чтения курсов из {self.path}: {e}")
+
+class HttpRateProvider:
+    """Курсы из HTTP API в формате exchangerate-api.com"""
+
+    name = 'http'
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> Tuple[str, Dict[str, float]]:
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                data = json.load(response)
+            return data['base'], {code: float(rate) for code, rate in data['rates'].items()}
+        except Exception as e:
+            raise RateProviderError(f"Ошибка загрузки курсов с {self.url}: {e}")
+
+def create_provider(config):
+    """Поставщик курсов по настройке FX_PROVIDER"""
+    name = config.get('FX_PROVIDER', 'file')
+    if name == 'file':
+        return FileRateProvider(config.get('FX_RATES_FILE', 'static/data/rates.json'))
+    if name == 'http':
+        return HttpRateProvider(config.get('FX_API_URL'), config.get('FX_API_TIMEOUT', 5.0))
+    raise ValueError(f"Неизвестный поставщик курсов: {name}")
@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify, session
+from app.accounts.models import get_user_accounts
+from app.accounts.reference import currencies
+from app.fx.models import get_rate_service, convert_balances
+from app.fx.providers import RateProviderError
+
+fx_bp = Blueprint('fx', __name__, url_prefix='/fx')
+
+@fx_bp.route('/api/rates', methods=['GET'])
+def api_get_rates():
+    """API: Текущие курсы валют относительно базовой"""
+    try:
+        snapshot = get_rate_service().get_rates()
+    except RateProviderError:
+        return jsonify({'success': False, 'error': 'Курсы валют недоступны'}), 503
+    
+    return jsonify({
+        'success': True,
+        'base': snapshot.base,
+        'rates': snapshot.rates,
+        'fetched_at': snapshot.fetched_at.isoformat()
+    })
+
+@fx_bp.route('/api/balances', methods=['GET'])
+def api_convert_balances():
+    """API: Балансы всех счетов пользователя в выбранной валюте"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+    
+    target = request.args.get('currency', 'USD').strip().upper()
+    if target not in currencies.codes:
+        return jsonify({'success': False, 'error': 'Недопустимая валюта'})
+    
+    try:
+        snapshot = get_rate_service().get_rates()
+    except RateProviderError:
+        return jsonify({'success': False, 'error': 'Курсы валют недоступны'}), 503
+    
+    accounts = get_user_accounts(session['user_id'])
+    result = convert_balances(accounts, target, snapshot)
+    return jsonify({'success': True, **result})
@@ -0,0 +1,307 @@
+import cProfile
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+from flask import Response, g, has_request_context, request
+from app.cache import cache_stats
+
+# Границы гистограммы времени ответа, секунд
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Учитываемые операции: имя в Server-Timing и метриках → описание
+OPERATIONS = {
+    'sql': 'SQLite statements (execute and row fetching)',
+    'bcrypt': 'Password hashing and verification, including queue wait',
+    'json': 'JSON serialization of responses'
+}
+
+def _current_timings() -> Optional[Dict]:
+    if has_request_context():
+        return g.get('timings')
+    return None
+
+def record(name: str, seconds: float, count: int = 1):
+    """Добавление времени операции к метрикам текущего запроса.
+
+    Вне запроса и при выключенном инструментировании ничего не делает.
+    """
+    timings = _current_timings()
+    if timings is not None:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += count
+
+@contextmanager
+def timed(name: str):
+    """Учет времени блока как одной операции name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Курсор, учитывающий выполнение выражений и выборку строк.
+
+    SQLite выполняет запрос по мере чтения строк, поэтому время fetch*
+    и итерации тоже относится к SQL. Словарь метрик берется при создании
+    курсора: в цикле по строкам нет обращений к контексту запроса.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._timings = _current_timings()
+
+    def _add(self, started: float, count: int):
+        if self._timings is not None:
+            entry = self._timings.setdefault('sql', [0.0, 0])
+            entry[0] += time.perf_counter() - started
+            entry[1] += count
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._add(started, 1)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._add(started, 1)
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._add(started, 1)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._add(started, 0)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._add(started, 0)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._add(started, 0)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            self._add(started, 0)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Соединение, все выражения которого проходят через InstrumentedCursor.
+
+    Подключается фабрикой пула (app/db.py) при INSTRUMENTATION_ENABLED.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            record('sql', time.perf_counter() - started)
+
+def _label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metrics:
+    """Счетчики запросов процесса для /metrics.
+
+    Метрики хранятся в памяти процесса: при нескольких процессах сервера
+    Prometheus опрашивает каждый отдельно.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (endpoint, method, status) → число
+        self.durations = {}  # endpoint → [счетчики корзин..., сумма, число]
+        self.operations = {}  # (endpoint, операция) → [секунды, число]
+        self.profiles = 0
+
+    def observe(self, endpoint: str, method: str, status: int, elapsed: float, timings: Dict):
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.durations.get(endpoint)
+            if histogram is None:
+                histogram = self.durations[endpoint] = [0] * len(DURATION_BUCKETS) + [0.0, 0]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if elapsed <= bound:
+                    histogram[index] += 1
+            histogram[-2] += elapsed
+            histogram[-1] += 1
+
+            for name, (seconds, count) in timings.items():
+                entry = self.operations.setdefault((endpoint, name), [0.0, 0])
+                entry[0] += seconds
+                entry[1] += count
+
+    def add_profile(self):
+        with self._lock:
+            self.profiles += 1
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            family('moneyapp_http_requests_total', 'counter', 'HTTP requests by endpoint, method and status')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'moneyapp_http_requests_total{{endpoint="{_label(endpoint)}",'
+                             f'method="{method}",status="{status}"}} {count}')
+
+            family('moneyapp_http_request_duration_seconds', 'histogram', 'Request handling time')
+            for endpoint, histogram in sorted(self.durations.items()):
+                label = f'endpoint="{_label(endpoint)}"'
+                # Корзины уже накопительные: запрос учтен во всех границах не меньше его времени
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'moneyapp_http_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'moneyapp_http_request_duration_seconds_bucket{{{label},le="+Inf"}} {histogram[-1]}')
+                lines.append(f'moneyapp_http_request_duration_seconds_sum{{{label}}} {histogram[-2]:.6f}')
+                lines.append(f'moneyapp_http_request_duration_seconds_count{{{label}}} {histogram[-1]}')
+
+            for name, help_text in OPERATIONS.items():
+                family(f'moneyapp_{name}_duration_seconds_total', 'counter', f'{help_text}: time')
+                for (endpoint, operation), (seconds, _) in sorted(self.operations.items()):
+                    if operation == name:
+                        lines.append(f'moneyapp_{name}_duration_seconds_total'
+                                     f'{{endpoint="{_label(endpoint)}"}} {seconds:.6f}')
+                family(f'moneyapp_{name}_operations_total', 'counter', f'{help_text}: count')
+                for (endpoint, operation), (_, count) in sorted(self.operations.items()):
+                    if operation == name:
+                        lines.append(f'moneyapp_{name}_operations_total{{endpoint="{_label(endpoint)}"}} {count}')
+
+            family('moneyapp_profiles_saved_total', 'counter', 'cProfile dumps of slow requests')
+            lines.append(f'moneyapp_profiles_saved_total {self.profiles}')
+
+        caches = cache_stats()
+        for field, kind in (('hits', 'counter'), ('misses', 'counter'), ('invalidations', 'counter'),
+                            ('evictions', 'counter'), ('size', 'gauge')):
+            name = f'moneyapp_cache_{field}' + ('_total' if kind == 'counter' else '')
+            family(name, kind, f'User data cache {field}')
+            for stats in caches:
+                lines.append(f'{name}{{cache="{_label(stats["name"])}",backend="{stats["backend"]}"}} {stats[field]}')
+
+        return '\n'.join(lines) + '\n'
+
+# Одновременно профилируется один запрос: cProfile учитывает только свой
+# поток, а в Python 3.12+ второй активный профилировщик вызывает ошибку
+_profile_lock = threading.Lock()
+
+def _profile_path(directory: str, endpoint: str, elapsed_ms: float) -> str:
+    name = re.sub(r'[^\w.-]', '_', endpoint)
+    return os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{name}-{elapsed_ms:.0f}ms.prof")
+
+def init_app(app):
+    """Инструментирование запросов при INSTRUMENTATION_ENABLED.
+
+    Для каждого запроса учитываются общее время, выражения SQLite (через
+    InstrumentedConnection из пула), bcrypt и сериализация JSON. Они
+    отдаются заголовком Server-Timing и накапливаются для /metrics в
+    формате Prometheus. Доля PROFILE_SAMPLE_RATE запросов выполняется под
+    cProfile; профиль сохраняется в PROFILE_DIR, если запрос длился
+    дольше PROFILE_SLOW_MS (открывается pstats или snakeviz).
+    """
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+
+    metrics = app.extensions['metrics'] = Metrics()
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+    slow_seconds = app.config.get('PROFILE_SLOW_MS', 500) / 1000
+    profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+
+    # Сериализация считается в response провайдера (app/serialization.py):
+    # через него проходит jsonify, а orjson кодирует в обход dumps
+    provider = app.json
+    build_response = provider.response
+
+    def timed_response(*args, **kwargs):
+        with timed('json'):
+            return build_response(*args, **kwargs)
+
+    provider.response = timed_response
+
+    @app.before_request
+    def start_request():
+        g.timings = {}
+        g.request_started = time.perf_counter()
+        if sample_rate and random.random() < sample_rate and _profile_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        timings = g.timings
+
+        parts = [f'app;dur={elapsed * 1000:.2f}']
+        for name, (seconds, count) in timings.items():
+            description = f';desc="{count} statements"' if name == 'sql' else ''
+            parts.append(f'{name};dur={seconds * 1000:.2f}{description}')
+        response.headers['Server-Timing'] = ', '.join(parts)
+
+        metrics.observe(request.endpoint or 'unmatched', request.method, response.status_code, elapsed, timings)
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        _profile_lock.release()
+        elapsed = time.perf_counter() - g.request_started
+        if elapsed >= slow_seconds:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(_profile_path(profile_dir, request.endpoint or 'unmatched', elapsed * 1000))
+            metrics.add_profile()
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
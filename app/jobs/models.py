@@ -0,0 +1,162 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.db import get_db
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+def _now() -> str:
+    # Единый формат времени: строки сравниваются в SQL лексикографически
+    return datetime.now().isoformat(' ', 'microseconds')
+
+def job_row_to_dict(row) -> Dict:
+    return {
+        'id': row['id'],
+        'kind': row['kind'],
+        'status': row['status'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': row['error'],
+        'attempts': row['attempts'],
+        'max_attempts': row['max_attempts'],
+        'created_at': row['created_at'],
+        'finished_at': row['finished_at']
+    }
+
+def enqueue_job(user_id: int, kind: str, payload: Dict, max_attempts: int = 3) -> int:
+    """Постановка задачи в очередь, возвращает ID задачи"""
+    conn = get_db()
+    now = _now()
+    try:
+        cursor = conn.execute(
+            '''INSERT INTO jobs (user_id, kind, payload, max_attempts, run_after, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (user_id, kind, json.dumps(payload, ensure_ascii=False), max_attempts, now, now)
+        )
+        conn.commit()
+        return cursor.lastrowid
+    except Exception:
+        conn.rollback()
+        raise
+
+def claim_job(conn) -> Optional[Dict]:
+    """Захват следующей готовой задачи; None, если очередь пуста"""
+    now = _now()
+    try:
+        row = conn.execute(
+            '''UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_at = ?,
+                              committed_rows = 0
+               WHERE id = (SELECT id FROM jobs
+                           WHERE status = 'queued' AND run_after <= ?
+                           ORDER BY run_after, id LIMIT 1)
+               RETURNING id, user_id, kind, payload, attempts, max_attempts''',
+            (now, now)
+        ).fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if row is None:
+        return None
+    return {
+        'id': row['id'],
+        'user_id': row['user_id'],
+        'kind': row['kind'],
+        'payload': json.loads(row['payload']),
+        'attempts': row['attempts'],
+        'max_attempts': row['max_attempts']
+    }
+
+def heartbeat_job(conn, job_id: int, attempts: int, committed_rows: int = 0) -> bool:
+    """Сигнал воркера: задача еще выполняется, зафиксировано committed_rows строк.
+
+    Возвращает False, если задача больше не принадлежит этой попытке
+    (возвращена в очередь как зависшая), и продолжать ее нельзя.
+    """
+    cursor = conn.execute(
+        '''UPDATE jobs SET locked_at = ?, committed_rows = ?
+           WHERE id = ? AND status = 'running' AND attempts = ?''',
+        (_now(), committed_rows, job_id, attempts)
+    )
+    conn.commit()
+    return cursor.rowcount == 1
+
+def complete_job(conn, job_id: int, attempts: int, result: Dict) -> bool:
+    """Успешное завершение; False, если задача уже не принадлежит попытке attempts"""
+    cursor = conn.execute(
+        '''UPDATE jobs SET status = 'done', result = ?, error = NULL,
+                  locked_at = NULL, finished_at = ?
+           WHERE id = ? AND status = 'running' AND attempts = ?''',
+        (json.dumps(result, ensure_ascii=False), _now(), job_id, attempts)
+    )
+    conn.commit()
+    return cursor.rowcount == 1
+
+def fail_job(conn, job_id: int, attempts: int, error: str, retry_in: Optional[float] = None) -> bool:
+    """Ошибка задачи: повтор через retry_in секунд или окончательный отказ.
+
+    Как и complete_job, меняет только задачу, захваченную попыткой attempts.
+    """
+    if retry_in is None:
+        cursor = conn.execute(
+            '''UPDATE jobs SET status = 'failed', error = ?, locked_at = NULL, finished_at = ?
+               WHERE id = ? AND status = 'running' AND attempts = ?''',
+            (error, _now(), job_id, attempts)
+        )
+    else:
+        run_after = (datetime.now() + timedelta(seconds=retry_in)).isoformat(' ', 'microseconds')
+        cursor = conn.execute(
+            '''UPDATE jobs SET status = 'queued', error = ?, locked_at = NULL, run_after = ?
+               WHERE id = ? AND status = 'running' AND attempts = ?''',
+            (error, run_after, job_id, attempts)
+        )
+    conn.commit()
+    return cursor.rowcount == 1
+
+def remove_upload(payload: Dict):
+    """Удаление загруженного файла задачи"""
+    path = payload.get('path')
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def requeue_stale_jobs(conn, lock_timeout: float) -> int:
+    """Возврат в очередь задач, воркер которых завис или был убит.
+
+    Задача, успевшая зафиксировать строки, не повторяется: повтор импорта
+    задвоил бы их. Она, как и исчерпавшая попытки, завершается отказом,
+    и ее загруженный файл удаляется. Возвращает число обработанных задач.
+    """
+    stale_before = (datetime.now() - timedelta(seconds=lock_timeout)).isoformat(' ', 'microseconds')
+    retry = 'attempts < max_attempts AND committed_rows = 0'
+    rows = conn.execute(
+        f'''UPDATE jobs SET
+               status = CASE WHEN {retry} THEN 'queued' ELSE 'failed' END,
+               error = CASE WHEN committed_rows = 0 THEN 'Воркер не завершил задачу'
+                            ELSE 'Воркер прерван после ' || committed_rows || ' зафиксированных строк' END,
+               finished_at = CASE WHEN {retry} THEN NULL ELSE ? END,
+               locked_at = NULL
+           WHERE status = 'running' AND locked_at < ?
+           RETURNING status, payload''',
+        (_now(), stale_before)
+    ).fetchall()
+    conn.commit()
+
+    for row in rows:
+        if row['status'] == 'failed':
+            remove_upload(json.loads(row['payload']))
+    return len(rows)
+
+def get_job(job_id: int, user_id: int) -> Optional[Dict]:
+    """Задача пользователя по ID"""
+    row = get_db().execute(
+        'SELECT * FROM jobs WHERE id = ? AND user_id = ?', (job_id, user_id)
+    ).fetchone()
+    return job_row_to_dict(row) if row else None
+
+def get_user_jobs(user_id: int, limit: int = 20) -> List[Dict]:
+    """Последние задачи пользователя"""
+    rows = get_db().execute(
+        'SELECT * FROM jobs WHERE user_id = ? ORDER BY id DESC LIMIT ?', (user_id, limit)
+    ).fetchall()
+    return [job_row_to_dict(row) for row in rows]
@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify, session
+from app.jobs.models import get_job, get_user_jobs
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def api_get_jobs():
+    """API: Последние фоновые задачи пользователя"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    return jsonify({'success': True, 'jobs': get_user_jobs(session['user_id'])})
+
+@jobs_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """API: Статус фоновой задачи"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    job = get_job(job_id, session['user_id'])
+    if not job:
+        return jsonify({'success': False, 'error': 'Задача не найдена'}), 404
+
+    return jsonify({'success': True, 'job': job})
@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import Callable, Dict
+from config import Config
+from app.db import get_db
+from app.jobs.models import (claim_job, complete_job, fail_job, heartbeat_job, remove_upload,
+                             requeue_stale_jobs)
+
+class PermanentJobError(Exception):
+    """Ошибка, которую повтор задачи не исправит"""
+
+class JobLost(Exception):
+    """Задача возвращена в очередь как зависшая и больше не принадлежит воркеру"""
+
+def job_heartbeat(job: Dict) -> Callable[[int], None]:
+    """Сигнал жизни задачи с числом зафиксированных строк; JobLost, если ее забрали"""
+    conn = get_db()
+
+    def beat(committed_rows: int = 0):
+        if not heartbeat_job(conn, job['id'], job['attempts'], committed_rows):
+            raise JobLost(f"Задача {job['id']} больше не принадлежит воркеру")
+    return beat
+
+def handle_import_statement(job: Dict) -> Dict:
+    """Импорт загруженной выписки в счет"""
+    from app.transactions.importer import StatementImporter, StatementError
+
+    payload = job['payload']
+    beat = job_heartbeat(job)
+    # После каждой пачки: свежий locked_at и число строк, которые нельзя
+    # импортировать повторно, если воркер будет убит (requeue_stale_jobs)
+    importer = StatementImporter(payload['account_id'], job['user_id'],
+                                 progress=lambda imported, done, total: beat(imported),
+                                 dedupe=payload.get('dedupe', 'strict'))
+    try:
+        summary = importer.import_file(payload['path'], payload.get('format'))
+    except StatementError as e:
+        raise PermanentJobError(str(e))
+    except JobLost:
+        raise
+    except Exception as e:
+        # Зафиксированные пачки уже в базе: повтор задвоил бы транзакции
+        if importer.summary and importer.summary['imported']:
+            raise PermanentJobError(
+                f"Импорт прерван после {importer.summary['imported']} строк: {e}"
+            )
+        raise
+
+    summary['file'] = payload.get('filename', summary['file'])
+    return summary
+
+def handle_ocr_receipt(job: Dict) -> Dict:
+    """Распознавание загруженного чека"""
+    from app.ocr_processor import process_receipt, OcrUnavailable
+
+    try:
+        return process_receipt(job['payload']['path'])
+    except OcrUnavailable as e:
+        raise PermanentJobError(str(e))
+
+JOB_HANDLERS: Dict[str, Callable[[Dict], Dict]] = {
+    'import_statement': handle_import_statement,
+    'ocr_receipt': handle_ocr_receipt,
+}
+
+def run_job(conn, job: Dict, retry_delay: float = Config.JOB_RETRY_DELAY) -> str:
+    """Выполнение захваченной задачи, возвращает ее новый статус.
+
+    'lost' означает, что задачу забрал другой воркер: ее статус и
+    загруженный файл этот воркер больше не трогает.
+    """
+    handler = JOB_HANDLERS.get(job['kind'])
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Неизвестный тип задачи '{job['kind']}'")
+        result = handler(job)
+    except JobLost:
+        return 'lost'
+    except PermanentJobError as e:
+        return _fail(conn, job, str(e))
+    except Exception as e:
+        traceback.print_exc()
+        if job['attempts'] < job['max_attempts']:
+            retry_in = retry_delay * 2 ** (job['attempts'] - 1)
+            if not fail_job(conn, job['id'], job['attempts'], str(e), retry_in=retry_in):
+                return 'lost'
+            return 'queued'
+        return _fail(conn, job, str(e))
+
+    if not complete_job(conn, job['id'], job['attempts'], result):
+        return 'lost'
+    remove_upload(job['payload'])
+    return 'done'
+
+def _fail(conn, job: Dict, error: str) -> str:
+    if not fail_job(conn, job['id'], job['attempts'], error):
+        return 'lost'
+    remove_upload(job['payload'])
+    return 'failed'
+
+def work_until_empty(retry_delay: float = Config.JOB_RETRY_DELAY) -> int:
+    """Выполнение всех готовых задач в текущем процессе; возвращает их число"""
+    conn = get_db()
+    processed = 0
+    while True:
+        job = claim_job(conn)
+        if job is None:
+            return processed
+        run_job(conn, job, retry_delay)
+        processed += 1
+
+def worker_loop(stop_event, poll_interval: float = Config.JOB_POLL_INTERVAL,
+                retry_delay: float = Config.JOB_RETRY_DELAY):
+    """Основной цикл процесса-воркера"""
+    # Остановкой управляет родительский процесс через stop_event. Ctrl+C и
+    # SIGTERM (systemd, timeout) приходят всей группе процессов: воркер,
+    # убитый внутри stop_event.wait(), оставил бы событие заблокированным
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    conn = get_db()
+    while not stop_event.is_set():
+        job = claim_job(conn)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        run_job(conn, job, retry_delay)
+
+class WorkerPool:
+    """Пул процессов-воркеров очереди задач.
+
+    Каждый процесс сам забирает задачи из таблицы jobs, поэтому разбор
+    выписок и распознавание идут параллельно на всех ядрах. Родитель
+    периодически возвращает в очередь задачи упавших воркеров.
+    """
+
+    def __init__(self, workers: int = Config.JOB_WORKERS,
+                 poll_interval: float = Config.JOB_POLL_INTERVAL,
+                 retry_delay: float = Config.JOB_RETRY_DELAY,
+                 lock_timeout: float = Config.JOB_LOCK_TIMEOUT):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.lock_timeout = lock_timeout
+        self._stop = multiprocessing.Event()
+        self._processes = []
+
+    def start(self):
+        for number in range(self.workers):
+            process = multiprocessing.Process(
+                target=worker_loop,
+                args=(self._stop, self.poll_interval, self.retry_delay),
+                name=f'job-worker-{number + 1}',
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def supervise(self):
+        """Надзор до остановки: перезапуск упавших процессов и зависших задач"""
+        conn = get_db()
+        while not self._stop.is_set():
+            requeue_stale_jobs(conn, self.lock_timeout)
+            for index, process in enumerate(self._processes):
+                if not process.is_alive() and not self._stop.is_set():
+                    replacement = multiprocessing.Process(
+                        target=worker_loop,
+                        args=(self._stop, self.poll_interval, self.retry_delay),
+                        name=process.name,
+                        daemon=True
+                    )
+                    replacement.start()
+                    self._processes[index] = replacement
+            # Не _stop.wait(): прерывание Ctrl+C внутри ожидания
+            # multiprocessing.Event может оставить его в заблокированном состоянии
+            time.sleep(max(self.poll_interval, 1.0))
+
+    def request_stop(self):
+        """Сигнал воркерам и supervise() завершиться; безопасен в обработчике сигнала"""
+        self._stop.set()
+
+    def stop(self, timeout: float = 30.0):
+        """Остановка после завершения текущих задач"""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
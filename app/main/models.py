@@ -0,0 +1,121 @@
+from typing import Dict
+from app.db import get_db
+from app.cache import UserCache, register_cache
+from app.accounts.reference import banks, currencies
+from app.accounts.versions import get_data_version
+from app.fx.models import get_rate_service
+from app.money import from_minor
+
+summary_cache = register_cache(UserCache('dashboard_summary'))
+
+# Балансы группируются по валюте и банку за один проход по счетам
+# пользователя; из этих групп собираются и итоги по валютам, и по банкам
+SUMMARY_GROUPS_QUERY = '''
+    SELECT a.currency, a.bank_id, COUNT(*) AS account_count,
+           SUM(a.initial_balance + COALESCE(b.balance, 0)) AS balance
+    FROM accounts a
+    LEFT JOIN account_balances b ON b.account_id = a.id
+    WHERE a.user_id = ? AND a.archived = 0
+    GROUP BY a.currency, a.bank_id
+'''
+
+SUMMARY_ACCOUNTS_LIMIT = 3
+
+def build_dashboard_summary(user_id: int, target: str, snapshot) -> Dict:
+    """Сводка для дашборда: общая стоимость, итоги по валютам и банкам"""
+    conn = get_db()
+
+    total = 0.0
+    account_count = 0
+    missing = set()
+    by_currency = {}
+    by_bank = {}
+
+    for row in conn.execute(SUMMARY_GROUPS_QUERY, (user_id,)):
+        balance = from_minor(row['balance'], row['currency'])
+        converted = snapshot.convert(balance, row['currency'], target)
+        account_count += row['account_count']
+        if converted is None:
+            missing.add(row['currency'])
+        else:
+            total += converted
+
+        currency_group = by_currency.setdefault(row['currency'], {
+            'currency': row['currency'],
+            'balance': 0,
+            'converted': 0.0 if converted is not None else None,
+            'account_count': 0
+        })
+        # Баланс валюты копится в минимальных единицах и переводится в конце
+        currency_group['balance'] += row['balance']
+        currency_group['account_count'] += row['account_count']
+        if converted is not None:
+            currency_group['converted'] += converted
+
+        bank = banks.get(row['bank_id']) if row['bank_id'] else None
+        bank_group = by_bank.setdefault(row['bank_id'], {
+            'bank_id': row['bank_id'],
+            'name': bank['name'] if bank else None,
+            'color': bank['color'] if bank else None,
+            'converted': 0.0,
+            'account_count': 0
+        })
+        bank_group['account_count'] += row['account_count']
+        if converted is not None:
+            bank_group['converted'] += converted
+
+    accounts = []
+    rows = conn.execute(
+        '''SELECT a.id, a.name, a.currency, a.bank_id,
+                  a.initial_balance + COALESCE(b.balance, 0) AS current_balance
+           FROM accounts a
+           LEFT JOIN account_balances b ON b.account_id = a.id
+           WHERE a.user_id = ? AND a.archived = 0
+           ORDER BY a.created_at DESC LIMIT ?''',
+        (user_id, SUMMARY_ACCOUNTS_LIMIT)
+    )
+    for row in rows:
+        bank = banks.get(row['bank_id']) if row['bank_id'] else None
+        currency = currencies.get(row['currency'])
+        accounts.append({
+            'id': row['id'],
+            'name': row['name'],
+            'currency': row['currency'],
+            'currency_symbol': currency['symbol'] if currency else row['currency'],
+            'bank_color': bank['color'] if bank else None,
+            'current_balance': from_minor(row['current_balance'], row['currency'])
+        })
+
+    for group in by_currency.values():
+        group['balance'] = from_minor(group['balance'], group['currency'])
+
+    target_currency = currencies.get(target)
+    return {
+        'currency': target,
+        'currency_symbol': target_currency['symbol'] if target_currency else target,
+        'total': total,
+        'missing_rates': sorted(missing),
+        'by_currency': sorted(by_currency.values(), key=lambda g: g['currency']),
+        'by_bank': sorted(by_bank.values(), key=lambda g: -abs(g['converted'])),
+        'accounts': accounts,
+        'account_count': account_count,
+        'rates_fetched_at': snapshot.fetched_at.isoformat()
+    }
+
+def get_dashboard_summary(user_id: int, target: str) -> Dict:
+    """Сводка из кэша; пересчитывается после записи данных пользователя или смены курсов.
+
+    Вместе со сводкой хранится версия данных пользователя: запись из
+    другого процесса (воркер импорта, второй процесс сервера) меняет
+    версию, и сводка пересчитывается при следующем чтении.
+    """
+    snapshot = get_rate_service().get_rates()
+    key = (snapshot.fetched_at, get_data_version(get_db(), user_id))
+
+    cached = summary_cache.get(user_id, target)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    summary = build_dashboard_summary(user_id, target, snapshot)
+    summary_cache.set(user_id, target, (key, summary))
+    return summary
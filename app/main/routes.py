@@ -1,4 +1,8 @@
-from flask import Blueprint, session, render_template, redirect, url_for
+from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
+from app.main.models import get_dashboard_summary
+from app.reports.analytics import get_cash_flow, AnalyticsUnavailable, DEFAULT_MONTHS, MAX_MONTHS
+from app.accounts.reference import currencies
+from app.fx.providers import RateProviderError
 
 main_bp = Blueprint('main', __name__)
 
@@ -12,4 +16,43 @@ def index():
 def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('auth.login_page'))
-    return render_template('dashboard.html')
\ No newline at end of file
+    return render_template('dashboard.html')
+
+@main_bp.route('/api/dashboard/summary')
+def api_dashboard_summary():
+    """API: Сводка для первой отрисовки дашборда"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+    
+    target = request.args.get('currency', 'USD').strip().upper()
+    if target not in currencies.codes:
+        return jsonify({'success': False, 'error': 'Недопустимая валюта'})
+    
+    try:
+        summary = get_dashboard_summary(session['user_id'], target)
+    except RateProviderError:
+        return jsonify({'success': False, 'error': 'Курсы валют недоступны'}), 503
+    
+    return jsonify({'success': True, **summary})
+
+@main_bp.route('/api/dashboard/analytics')
+def api_dashboard_analytics():
+    """API: Денежный поток, тренды расходов и прогноз для дашборда"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+    
+    target = request.args.get('currency', 'USD').strip().upper()
+    if target not in currencies.codes:
+        return jsonify({'success': False, 'error': 'Недопустимая валюта'})
+    
+    months = request.args.get('months', DEFAULT_MONTHS, type=int)
+    months = max(1, min(months, MAX_MONTHS))
+    
+    try:
+        analytics = get_cash_flow(session['user_id'], target, months)
+    except RateProviderError:
+        return jsonify({'success': False, 'error': 'Курсы валют недоступны'}), 503
+    except AnalyticsUnavailable as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    
+    return jsonify({'success': True, **analytics})
@@ -0,0 +1,353 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+from app.money import MINOR_UNITS_VERSION, minor_factor_sql
+from app.accounts.ledger import LEDGER_SCHEMA_PATH, rebuild_ledger
+from app.accounts.versions import VERSIONS_SCHEMA_PATH
+from app.reports.rollups import ROLLUPS_SCHEMA_PATH, rebuild_rollups
+from app.transactions.dedupe import transaction_fingerprint
+from app.transactions.search import SEARCH_SCHEMA_PATH
+
+SCHEMA_PATH = 'database/schema.sql'
+MIGRATIONS_SCHEMA_PATH = 'database/migrations.sql'
+
+DEFAULT_BATCH_SIZE = 10000
+# Счетов в одном пересчете реестра или итогов
+REBUILD_ACCOUNTS_BATCH = 100
+
+class MigrationError(Exception):
+    """Миграции объявлены неверно"""
+
+class Migration:
+    """Шаг схемы: версия, название и функция apply(ctx: MigrationContext)"""
+
+    def __init__(self, version: int, name: str, apply: Callable):
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+# Миграции в порядке применения; новые добавляются в конец модуля
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, name: str):
+    """Регистрация миграции. Версии возрастают в порядке объявления"""
+    def register(apply):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise MigrationError(f"Версия {version} должна быть больше {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, name, apply))
+        return apply
+    return register
+
+def split_statements(script: str) -> List[str]:
+    """SQL-скрипт по отдельным выражениям (тела триггеров не разрываются)"""
+    statements = []
+    buffer = ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer)
+            buffer = ''
+    return statements
+
+class MigrationContext:
+    """Операции миграции с учетом dry-run.
+
+    Скрипты и шаги run выполняются атомарно в одной пишущей транзакции.
+    Заполнение данных (backfill) идет пачками по batch_size строк с
+    commit после каждой, поэтому писатели приложения ждут не дольше
+    одной пачки; позиция фиксируется в schema_backfills вместе с пачкой.
+    В режиме dry_run ничего не записывается, операции только описываются.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, version: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dry_run: bool = False, pause: float = 0.0, log: Callable[[str], None] = print):
+        self.conn = conn
+        self.version = version
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.pause = pause
+        self.log = log
+
+    def table_exists(self, name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def column_exists(self, table: str, column: str) -> bool:
+        return column in {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+
+    @contextmanager
+    def transaction(self):
+        """Пишущая транзакция; вложенный вызов выполняется в уже открытой"""
+        if self.dry_run or self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except Exception:
+            self.conn.rollback()
+            raise
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+    def script(self, path: str):
+        """Выполнение SQL-скрипта одной транзакцией"""
+        self.log(f"   скрипт {path}")
+        if self.dry_run:
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        with self.transaction():
+            for statement in statements:
+                self.conn.execute(statement)
+
+    def run(self, description: str, step: Callable[[], None]):
+        """Произвольный шаг одной транзакцией"""
+        self.log(f"   {description}")
+        if self.dry_run:
+            return
+        with self.transaction():
+            step()
+
+    def backfill(self, description: str, table: str, columns: str, where: str,
+                 apply: Callable[[sqlite3.Connection, List[tuple]], None], params: tuple = ()) -> int:
+        """Обработка строк table, подходящих под where, пачками по id.
+
+        columns начинается с id; apply(conn, rows) получает пачку,
+        упорядоченную по id. Прерванное заполнение продолжается после
+        последней зафиксированной пачки. Возвращает число обработанных строк.
+        """
+        if self.dry_run:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', params).fetchone()[0]
+            self.log(f"   {description}: {total} строк пачками по {self.batch_size}")
+            return total
+
+        stored = self.conn.execute(
+            'SELECT last_id FROM schema_backfills WHERE version = ? AND name = ?',
+            (self.version, description)
+        ).fetchone()
+        last_id = stored[0] if stored else 0
+        if last_id:
+            self.log(f"   {description}: продолжение после id {last_id}")
+
+        query = f'SELECT {columns} FROM {table} WHERE id > ? AND ({where}) ORDER BY id LIMIT ?'
+        processed = 0
+        while True:
+            with self.transaction():
+                rows = self.conn.execute(query, (last_id, *params, self.batch_size)).fetchall()
+                if rows:
+                    apply(self.conn, rows)
+                    last_id = rows[-1][0]
+                    self.conn.execute(
+                        '''INSERT INTO schema_backfills (version, name, last_id) VALUES (?, ?, ?)
+                           ON CONFLICT(version, name) DO UPDATE SET last_id = excluded.last_id''',
+                        (self.version, description, last_id)
+                    )
+            if not rows:
+                break
+            processed += len(rows)
+            if self.pause:
+                time.sleep(self.pause)
+
+        self.log(f"   {description}: {processed} строк")
+        return processed
+
+    def rebuild_accounts(self, description: str,
+                         rebuild: Callable[[sqlite3.Connection, List[int]], int]):
+        """Пересчет по счетам пачками по REBUILD_ACCOUNTS_BATCH (rebuild_ledger, rebuild_rollups)"""
+        account_ids = [row[0] for row in self.conn.execute('SELECT id FROM accounts ORDER BY id')]
+        self.log(f"   {description}: счетов {len(account_ids)}")
+        if self.dry_run:
+            return
+        for start in range(0, len(account_ids), REBUILD_ACCOUNTS_BATCH):
+            rebuild(self.conn, account_ids[start:start + REBUILD_ACCOUNTS_BATCH])
+            if self.pause:
+                time.sleep(self.pause)
+
+def applied_migrations(conn: sqlite3.Connection) -> dict:
+    """Примененные миграции: {version: applied_at}"""
+    if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").fetchone() is None:
+        return {}
+    return {row[0]: row[1] for row in conn.execute('SELECT version, applied_at FROM schema_version')}
+
+def pending_migrations(conn: sqlite3.Connection,
+                       migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """Еще не примененные миграции в порядке применения"""
+    applied = applied_migrations(conn)
+    return [m for m in (MIGRATIONS if migrations is None else migrations) if m.version not in applied]
+
+def migrate(conn: sqlite3.Connection, dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+            pause: float = 0.0, migrations: Optional[List[Migration]] = None,
+            log: Callable[[str], None] = print) -> List[Migration]:
+    """Приведение БД к последней версии схемы.
+
+    Новая БД создается из database/schema.sql, затем по порядку
+    применяются все миграции, которых нет в schema_version. Каждая
+    миграция отмечается примененной только после успешного завершения;
+    упавшая миграция при следующем запуске повторяется, а ее заполнение
+    данных продолжается с сохраненной позиции. Возвращает список
+    примененных (при dry_run — ожидающих) миграций.
+    """
+    new_database = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+    ).fetchone() is None
+    if new_database:
+        log(f"🆕 Новая база данных: схема из {SCHEMA_PATH}")
+        if not dry_run:
+            with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+                conn.executescript(f.read())
+
+    if not dry_run:
+        with open(MIGRATIONS_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+
+    pending = pending_migrations(conn, migrations)
+    for item in pending:
+        log(f"{'🔍' if dry_run else '⏳'} Миграция {item.version}: {item.name}")
+        if dry_run and new_database:
+            # Таблиц еще нет: описывать шаги не по чему
+            continue
+
+        context = MigrationContext(conn, item.version, batch_size, dry_run, pause, log)
+        started = time.perf_counter()
+        item.apply(context)
+        if dry_run:
+            continue
+
+        with context.transaction():
+            conn.execute('DELETE FROM schema_backfills WHERE version = ?', (item.version,))
+            conn.execute(
+                'INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)',
+                (item.version, item.name, datetime.now().isoformat(' ', 'seconds'),
+                 int((time.perf_counter() - started) * 1000))
+            )
+
+    return pending
+
+# Миграции. Шаги идемпотентны: БД, созданные до появления schema_version,
+# проходят все миграции, и уже выполненные изменения в них не повторяются.
+# Изменение скрипта из database/ применяется к существующим БД только
+# новой миграцией, которая выполняет его еще раз.
+
+@migration(1, 'Суммы в минимальных единицах валюты')
+def _minor_units(ctx: MigrationContext):
+    # БД из schema.sql с самого начала хранит целые суммы
+    if ctx.conn.execute('PRAGMA user_version').fetchone()[0] >= MINOR_UNITS_VERSION:
+        return
+
+    factor = minor_factor_sql('currency')
+    bulk = ctx.table_exists('ledger_bulk_accounts')
+    # Отпечаток берет сумму в минимальных единицах: для валют с двумя знаками
+    # он совпадает с прежним (сумма в копейках), остальные заполняются заново
+    fingerprint = (f', fingerprint = CASE WHEN {factor} = 100 THEN fingerprint END'
+                   if ctx.column_exists('transactions', 'fingerprint') else '')
+
+    def convert_accounts(conn, rows):
+        conn.execute(
+            f'''UPDATE accounts SET initial_balance = CAST(ROUND(COALESCE(initial_balance, 0) * {factor}) AS INTEGER)
+                WHERE id BETWEEN ? AND ?''',
+            (rows[0][0], rows[-1][0])
+        )
+
+    def convert_transactions(conn, rows):
+        # Триггеры реестра и итогов отключены: после перевода они пересчитываются
+        if bulk:
+            conn.execute(
+                '''INSERT OR IGNORE INTO ledger_bulk_accounts (account_id)
+                   SELECT DISTINCT account_id FROM transactions WHERE id BETWEEN ? AND ?''',
+                (rows[0][0], rows[-1][0])
+            )
+        conn.execute(
+            f'''UPDATE transactions SET amount = CAST(ROUND(amount * {factor}) AS INTEGER){fingerprint}
+                WHERE id BETWEEN ? AND ?''',
+            (rows[0][0], rows[-1][0])
+        )
+        if bulk:
+            conn.execute('DELETE FROM ledger_bulk_accounts')
+
+    ctx.backfill('начальные балансы счетов', 'accounts', 'id', '1 = 1', convert_accounts)
+    ctx.backfill('суммы транзакций', 'transactions', 'id', '1 = 1', convert_transactions)
+    if ctx.table_exists('account_balances'):
+        ctx.rebuild_accounts('пересчет реестра балансов', rebuild_ledger)
+    if ctx.table_exists('monthly_rollups'):
+        ctx.rebuild_accounts('пересчет месячных итогов', rebuild_rollups)
+    ctx.run('отметка PRAGMA user_version',
+            lambda: ctx.conn.execute(f'PRAGMA user_version = {MINOR_UNITS_VERSION}'))
+
+@migration(2, 'Отпечатки транзакций для поиска дублей')
+def _fingerprints(ctx: MigrationContext):
+    exists = ctx.column_exists('transactions', 'fingerprint')
+    if not exists:
+        ctx.run('колонка transactions.fingerprint',
+                lambda: ctx.conn.execute('ALTER TABLE transactions ADD COLUMN fingerprint INTEGER'))
+
+    def fill(conn, rows):
+        conn.executemany(
+            'UPDATE transactions SET fingerprint = ? WHERE id = ?',
+            [(transaction_fingerprint(row[1], row[2], row[3]), row[0]) for row in rows]
+        )
+
+    ctx.backfill('отпечатки транзакций', 'transactions', 'id, date, amount, description',
+                 'fingerprint IS NULL' if exists or not ctx.dry_run else '1 = 1', fill)
+
+@migration(3, 'Составные индексы транзакций')
+def _transaction_indexes(ctx: MigrationContext):
+    # Построение индекса — одно выражение SQLite и пачками не делится
+    ctx.script('database/transactions.sql')
+
+@migration(4, 'Реестр балансов')
+def _ledger(ctx: MigrationContext):
+    created = not ctx.table_exists('account_balances')
+    ctx.script(LEDGER_SCHEMA_PATH)
+    if created:
+        ctx.rebuild_accounts('заполнение реестра по истории', rebuild_ledger)
+
+@migration(5, 'Месячные итоги для отчетов')
+def _rollups(ctx: MigrationContext):
+    created = not ctx.table_exists('monthly_rollups')
+    ctx.script(ROLLUPS_SCHEMA_PATH)
+    if created:
+        ctx.rebuild_accounts('заполнение итогов по истории', rebuild_rollups)
+
+@migration(6, 'Полнотекстовый поиск по описаниям')
+def _search(ctx: MigrationContext):
+    created = not ctx.table_exists('transactions_fts')
+    # Граница читается в транзакции, создающей триггеры: строки после нее
+    # индексируют триггеры, до нее — заполнение пачками
+    with ctx.transaction():
+        last_id = ctx.conn.execute('SELECT COALESCE(MAX(id), 0) FROM transactions').fetchone()[0]
+        ctx.script(SEARCH_SCHEMA_PATH)
+    if not created:
+        return
+
+    def index(conn, rows):
+        conn.execute(
+            '''INSERT INTO transactions_fts (rowid, description)
+               SELECT id, description FROM transactions WHERE id BETWEEN ? AND ?''',
+            (rows[0][0], rows[-1][0])
+        )
+
+    ctx.backfill('индекс описаний', 'transactions', 'id', 'id <= ?', index, (last_id,))
+
+@migration(7, 'Снимки курсов валют')
+def _fx(ctx: MigrationContext):
+    ctx.script('database/fx.sql')
+
+@migration(8, 'Очередь фоновых задач')
+def _jobs(ctx: MigrationContext):
+    ctx.script('database/jobs.sql')
+
+@migration(9, 'Версии данных пользователей для условных запросов')
+def _data_versions(ctx: MigrationContext):
+    ctx.script(VERSIONS_SCHEMA_PATH)
+
+@migration(10, 'Прогресс фоновых задач')
+def _job_progress(ctx: MigrationContext):
+    if not ctx.column_exists('jobs', 'committed_rows'):
+        ctx.run('колонка jobs.committed_rows',
+                lambda: ctx.conn.execute(
+                    'ALTER TABLE jobs ADD COLUMN committed_rows INTEGER NOT NULL DEFAULT 0'))
@@ -0,0 +1,70 @@
+from decimal import Decimal, DecimalException, ROUND_HALF_UP
+from typing import Union
+from app.accounts.reference import currencies
+
+# Денежные суммы хранятся целыми числами в минимальных единицах валюты
+# (тиын, центы): SUM в SQLite и sum() в Python над INTEGER точны и не
+# накапливают ошибку округления, как REAL. Число знаков после запятой
+# берется из поля minor_units справочника static/data/currencies.json,
+# в мажорные единицы суммы переводятся только на границе API.
+
+# Для кодов вне справочника (например, валюта строки OFX-выписки)
+DEFAULT_MINOR_UNITS = 2
+
+# PRAGMA user_version базы, в которой суммы уже хранятся в минимальных единицах
+MINOR_UNITS_VERSION = 1
+
+# Диапазон INTEGER в SQLite (знаковое 64-битное целое)
+MIN_MINOR = -2 ** 63
+MAX_MINOR = 2 ** 63 - 1
+
+Amount = Union[int, float, str, Decimal]
+
+def minor_units(currency: str) -> int:
+    """Число знаков после запятой у валюты"""
+    item = currencies.get(currency)
+    if item is None:
+        return DEFAULT_MINOR_UNITS
+    return item.get('minor_units', DEFAULT_MINOR_UNITS)
+
+def to_minor(value: Amount, currency: str) -> int:
+    """Сумма в минимальных единицах валюты: to_minor('12.34', 'USD') == 1234.
+
+    Строки и Decimal переводятся точно, float — через его десятичную
+    запись; лишние знаки округляются половиной вверх. Для неверного
+    значения и суммы вне диапазона INTEGER SQLite выбрасывает ValueError.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"неверная сумма '{value}'")
+    if isinstance(value, int):
+        minor = value * 10 ** minor_units(currency)
+    else:
+        try:
+            amount = Decimal(value if isinstance(value, (str, Decimal)) else repr(value))
+            # Overflow для огромного показателя ('1e999999') — тоже DecimalException
+            minor = amount.scaleb(minor_units(currency)).to_integral_value(ROUND_HALF_UP)
+        except DecimalException:
+            raise ValueError(f"неверная сумма '{value}'")
+        if not minor.is_finite():
+            raise ValueError(f"неверная сумма '{value}'")
+    if not MIN_MINOR <= minor <= MAX_MINOR:
+        raise ValueError(f"слишком большая сумма '{value}'")
+    return int(minor)
+
+def from_minor(amount: int, currency: str) -> float:
+    """Сумма в мажорных единицах для JSON: from_minor(1234, 'USD') == 12.34.
+
+    Деление целых в Python округляется корректно, поэтому результат —
+    ближайший к точному значению float, и его запись совпадает с десятичной.
+    """
+    return amount / 10 ** minor_units(currency)
+
+def minor_factor_sql(column: str) -> str:
+    """CASE по коду валюты: множитель перевода мажорных единиц в минимальные"""
+    exceptions = ' '.join(
+        f"WHEN '{item['code']}' THEN {10 ** item['minor_units']}"
+        for item in currencies.items
+        if item.get('minor_units', DEFAULT_MINOR_UNITS) != DEFAULT_MINOR_UNITS
+    )
+    default = 10 ** DEFAULT_MINOR_UNITS
+    return f'CASE {column} {exceptions} ELSE {default} END' if exceptions else str(default)
@@ -0,0 +1,56 @@
+import re
+from datetime import datetime
+from typing import Dict, Optional
+
+# Распознавание требует Pillow, pytesseract и установленного tesseract;
+# без них задачи распознавания завершаются ошибкой OcrUnavailable
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+    Image = None
+
+OCR_LANGUAGES = 'rus+eng'
+
+class OcrUnavailable(Exception):
+    """Распознавание недоступно в этом окружении"""
+
+_TOTAL_LINE = re.compile(r'(итого|итог|всего|к оплате|total)\D*([\d\s]+[.,]\d{2})', re.IGNORECASE)
+_DATE = re.compile(r'\b(\d{2})[./](\d{2})[./](\d{2,4})\b')
+
+def recognize_text(path: str) -> str:
+    """Текст изображения чека"""
+    if pytesseract is None:
+        raise OcrUnavailable("Распознавание недоступно: установите Pillow и pytesseract")
+    try:
+        with Image.open(path) as image:
+            return pytesseract.image_to_string(image, lang=OCR_LANGUAGES)
+    except pytesseract.TesseractNotFoundError:
+        raise OcrUnavailable("Распознавание недоступно: tesseract не установлен")
+
+def _parse_date(text: str) -> Optional[str]:
+    for day, month, year in _DATE.findall(text):
+        date_format = '%d.%m.%Y' if len(year) == 4 else '%d.%m.%y'
+        try:
+            return datetime.strptime(f"{day}.{month}.{year}", date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def parse_receipt(text: str) -> Dict:
+    """Итоговая сумма и дата из распознанного текста чека"""
+    total = None
+    for match in _TOTAL_LINE.finditer(text):
+        # Последняя строка "Итого" обычно итог с учетом скидок
+        total = float(re.sub(r'\s', '', match.group(2)).replace(',', '.'))
+
+    return {
+        'total': total,
+        'date': _parse_date(text),
+        'text': text.strip()
+    }
+
+def process_receipt(path: str) -> Dict:
+    """Распознавание чека: текст, итоговая сумма и дата"""
+    return parse_receipt(recognize_text(path))
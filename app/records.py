@@ -0,0 +1,57 @@
+from operator import attrgetter
+from typing import Dict, Tuple
+
+class Record:
+    """Запись модели: строка выборки в объекте со __slots__.
+
+    Поля подкласса перечисляются в __slots__ в порядке колонок его
+    запроса, поэтому row_factory строит запись прямо из кортежа строки
+    курсора, без sqlite3.Row и словаря на каждую строку. Запись без
+    __dict__ занимает в несколько раз меньше памяти, чем словарь с теми
+    же ключами (benchmarks/bench_records.py). В JSON запись отдается
+    объектом через to_dict (app/serialization.py), в колоночном формате —
+    кортежем to_tuple.
+    """
+
+    __slots__ = ()
+
+    # Типы записей по имени класса: восстановление из JSON кэша (app/cache.py)
+    types: Dict[str, type] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._values = attrgetter(*cls.__slots__)
+        Record.types[cls.__name__] = cls
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        """Имена полей в порядке колонок"""
+        return cls.__slots__
+
+    @classmethod
+    def row_factory(cls, cursor, row: tuple):
+        """row_factory курсора SQLite: запись из кортежа строки"""
+        return cls(*row)
+
+    def to_tuple(self) -> tuple:
+        """Значения полей в порядке fields()"""
+        return self._values(self)
+
+    def to_dict(self) -> Dict:
+        """Словарь поле → значение для API"""
+        return dict(zip(self.__slots__, self._values(self)))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Для pickle: кортеж значений вместо словаря слотов
+        return type(self), self.to_tuple()
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={value!r}' for name, value in zip(self.__slots__, self.to_tuple()))
+        return f'{type(self).__name__}({values})'
@@ -0,0 +1,210 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from app.accounts.versions import get_data_version
+from app.db import get_db
+from app.cache import UserCache, register_cache
+from app.fx.models import get_rate_service
+from app.money import minor_units, from_minor
+
+# Аналитика требует NumPy; без него эндпоинт отвечает ошибкой AnalyticsUnavailable
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+analytics_cache = register_cache(UserCache('cash_flow_analytics'))
+
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 60
+# Окна скользящих средних и расчета темпа расходов
+EXPENSE_MA_MONTHS = 3
+EXPENSE_MA_DAYS = 30
+BURN_RATE_DAYS = 90
+
+class AnalyticsUnavailable(Exception):
+    """NumPy не установлен"""
+
+# Транзакции пользователя колонками: день от эпохи, сумма, счет и номер
+# валюты в списке {currencies}. Дата и валюта кодируются числами в SQL,
+# чтобы в Python не создавались строки на каждую строку выборки
+TRANSACTIONS_QUERY = '''
+    SELECT unixepoch(t.date) / 86400, t.amount, t.account_id,
+           CASE t.currency {currencies} ELSE -1 END
+    FROM transactions t
+    WHERE t.account_id IN ({accounts}) AND t.status = 'confirmed'
+      AND t.date >= ? AND t.date <= ?
+'''
+
+def _months_between(first: date, last: date) -> int:
+    return (last.year - first.year) * 12 + last.month - first.month + 1
+
+def _month_start(day: date, months_back: int) -> date:
+    index = day.year * 12 + day.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+def load_transactions(conn, user_id: int, first: date, last: date, currencies: List[str]):
+    """Подтвержденные транзакции пользователя за период одним запросом.
+
+    Возвращает (дни, суммы в минимальных единицах, счета, номера валют)
+    как массивы NumPy.
+    """
+    accounts = [row[0] for row in conn.execute('SELECT id FROM accounts WHERE user_id = ?', (user_id,))]
+    dtype = np.dtype([('day', 'i8'), ('amount', 'i8'), ('account', 'i8'), ('currency', 'i4')])
+    if not accounts or not currencies:
+        data = np.empty(0, dtype=dtype)
+    else:
+        query = TRANSACTIONS_QUERY.format(
+            currencies=' '.join(f'WHEN ? THEN {index}' for index in range(len(currencies))),
+            accounts=', '.join('?' * len(accounts))
+        )
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        data = np.fromiter(
+            cursor.execute(query, (*currencies, *accounts, first.isoformat(), last.isoformat())),
+            dtype=dtype
+        )
+    return data['day'], data['amount'], data['account'], data['currency']
+
+def _rounded(values) -> List[Optional[float]]:
+    """Массив в список для JSON: NaN заменяется на None"""
+    return [None if value != value else value for value in np.round(values, 2).tolist()]
+
+def build_cash_flow(user_id: int, target: str, snapshot, months: int = DEFAULT_MONTHS,
+                    today: date = None) -> Dict:
+    """Аналитика денежного потока в целевой валюте.
+
+    Транзакции за период загружаются колонками одним запросом, все
+    показатели считаются векторно: доходы и расходы по месяцам, скользящее
+    среднее и изменение расходов к прошлому месяцу, дневные расходы со
+    скользящим средним, доли расходов по счетам и темп расходов с
+    прогнозом на конец месяца и запасом по времени. Расход — транзакция с
+    отрицательной суммой, доход — с положительной.
+    """
+    if np is None:
+        raise AnalyticsUnavailable("Аналитика недоступна: установите numpy")
+
+    conn = get_db()
+    today = today or date.today()
+    first_month = _month_start(today, months - 1)
+    # Темп расходов считается по последним BURN_RATE_DAYS дням даже для короткого периода
+    first = min(first_month, today - timedelta(days=BURN_RATE_DAYS - 1))
+    epoch = np.datetime64(first, 'D').astype('i8')
+    day_count = (today - first).days + 1
+
+    # Валюты транзакций пользователя берутся из месячных итогов, а не из transactions
+    currencies = [row[0] for row in conn.execute(
+        '''SELECT DISTINCT r.currency FROM monthly_rollups r
+           JOIN accounts a ON a.id = r.account_id WHERE a.user_id = ?''', (user_id,))]
+    days, amounts, account_ids, currency_index = load_transactions(conn, user_id, first, today, currencies)
+
+    # Множитель переводит минимальные единицы валюты в целевую валюту. Последний
+    # элемент — для номера -1 (валюты нет в итогах): такие суммы не учитываются
+    factors = np.array([(snapshot.convert(1.0, code, target) or np.nan) / 10 ** minor_units(code)
+                        for code in currencies] + [np.nan])
+    missing = sorted(code for code, factor in zip(currencies, factors) if factor != factor)
+    converted = amounts * factors[currency_index]
+    known = ~np.isnan(converted)
+    converted = np.where(known, converted, 0.0)
+
+    expenses = np.where(converted < 0, -converted, 0.0)
+    income = np.where(converted > 0, converted, 0.0)
+    offsets = days - epoch
+
+    # Дневные ряды
+    daily_expense = np.bincount(offsets, weights=expenses, minlength=day_count)
+    cumulative = np.concatenate(([0.0], np.cumsum(daily_expense)))
+    window = np.minimum(np.arange(1, day_count + 1), EXPENSE_MA_DAYS)
+    daily_ma = (cumulative[1:] - cumulative[np.arange(day_count) + 1 - window]) / window
+
+    # Месячные ряды: номер месяца от начала периода
+    month_numbers = (days.astype('datetime64[D]').astype('datetime64[M]').astype('i8')
+                     - np.datetime64(first_month, 'M').astype('i8'))
+    in_period = month_numbers >= 0
+    month_count = _months_between(first_month, today)
+    monthly_expense = np.bincount(month_numbers[in_period], weights=expenses[in_period], minlength=month_count)
+    monthly_income = np.bincount(month_numbers[in_period], weights=income[in_period], minlength=month_count)
+    monthly_count = np.bincount(month_numbers[in_period], minlength=month_count)
+
+    expense_ma = np.full(month_count, np.nan)
+    if month_count >= EXPENSE_MA_MONTHS:
+        expense_ma[EXPENSE_MA_MONTHS - 1:] = np.convolve(
+            monthly_expense, np.ones(EXPENSE_MA_MONTHS) / EXPENSE_MA_MONTHS, mode='valid')
+
+    change = np.full(month_count, np.nan)
+    previous = monthly_expense[:-1]
+    np.divide(monthly_expense[1:] - previous, previous, out=change[1:], where=previous != 0)
+
+    month_labels = np.arange(np.datetime64(first_month, 'M'), np.datetime64(first_month, 'M') + month_count)
+    month_rows = [
+        {'month': label, 'income': inc, 'expense': exp, 'net': net, 'transaction_count': count,
+         'expense_ma': ma, 'expense_change_pct': ch}
+        for label, inc, exp, net, count, ma, ch in zip(
+            month_labels.astype(str).tolist(), _rounded(monthly_income), _rounded(monthly_expense),
+            _rounded(monthly_income - monthly_expense), monthly_count.tolist(),
+            _rounded(expense_ma), _rounded(np.round(change, 4) * 100))
+    ]
+
+    # Доли расходов по счетам за период
+    accounts, account_positions = np.unique(account_ids[in_period], return_inverse=True)
+    account_expense = np.bincount(account_positions, weights=expenses[in_period], minlength=len(accounts))
+    total_expense = account_expense.sum()
+    shares = account_expense / total_expense if total_expense else np.zeros(len(accounts))
+    order = np.argsort(-account_expense)
+    by_account = [
+        {'account_id': account_id, 'expense': expense, 'share': share}
+        for account_id, expense, share in zip(accounts[order].tolist(), _rounded(account_expense[order]),
+                                               np.round(shares[order], 4).tolist())
+    ]
+
+    # Темп расходов и прогноз
+    burn_rate = daily_expense[-BURN_RATE_DAYS:].sum() / BURN_RATE_DAYS
+    month_to_date = daily_expense[day_count - today.day:].sum()
+    month_end = _month_start(today, -1) - timedelta(days=1)
+    balance = 0.0
+    for row in conn.execute(
+            '''SELECT a.currency, SUM(a.initial_balance + COALESCE(b.balance, 0))
+               FROM accounts a LEFT JOIN account_balances b ON b.account_id = a.id
+               WHERE a.user_id = ? AND a.archived = 0 GROUP BY a.currency''', (user_id,)):
+        value = snapshot.convert(from_minor(row[1], row[0]), row[0], target)
+        if value is None:
+            missing = sorted(set(missing) | {row[0]})
+        else:
+            balance += value
+
+    return {
+        'currency': target,
+        'months': month_rows,
+        'daily': {
+            'start': first.isoformat(),
+            'expense': _rounded(daily_expense),
+            'expense_ma': _rounded(daily_ma)
+        },
+        'by_account': by_account,
+        'burn_rate': {
+            'daily': round(float(burn_rate), 2),
+            'month_to_date': round(float(month_to_date), 2),
+            'projected_month': round(float(month_to_date + burn_rate * (month_end - today).days), 2),
+            'balance': round(balance, 2),
+            'runway_days': int(balance // burn_rate) if burn_rate > 0 and balance > 0 else None
+        },
+        'missing_rates': missing,
+        'rates_fetched_at': snapshot.fetched_at.isoformat()
+    }
+
+def get_cash_flow(user_id: int, target: str, months: int = DEFAULT_MONTHS) -> Dict:
+    """Аналитика из кэша; пересчитывается после записи данных пользователя, смены курсов или дня.
+
+    Версия данных пользователя в ключе учитывает и запись из других
+    процессов (воркер импорта, второй процесс сервера).
+    """
+    snapshot = get_rate_service().get_rates()
+    today = date.today()
+    key = (snapshot.fetched_at, today, get_data_version(get_db(), user_id))
+
+    cached = analytics_cache.get(user_id, (target, months))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    analytics = build_cash_flow(user_id, target, snapshot, months, today)
+    analytics_cache.set(user_id, (target, months), (key, analytics))
+    return analytics
@@ -0,0 +1,85 @@
+from typing import Dict
+from app.db import get_db
+from app.money import from_minor
+
+# Группировки отчетов: колонка месячных итогов, по которой строятся строки
+REPORT_GROUPS = {
+    'month': 'r.month',
+    'account': 'r.account_id',
+    'type': 'r.type'
+}
+
+REPORT_QUERY = '''
+    SELECT {column} AS key, r.type, r.currency,
+           SUM(r.total) AS total, SUM(r.transaction_count) AS transaction_count
+    FROM monthly_rollups r
+    JOIN accounts a ON a.id = r.account_id
+    WHERE {where}
+    GROUP BY key, r.type, r.currency
+    ORDER BY key
+'''
+
+def build_report(user_id: int, group: str, target: str, snapshot, month_from: str = None,
+                 month_to: str = None, account_id: int = None) -> Dict:
+    """Отчет по месячным итогам в целевой валюте.
+
+    Читаются только строки monthly_rollups счетов пользователя за период,
+    поэтому время не зависит от числа транзакций. Для группировок по
+    месяцу и счету строка содержит доходы, расходы, сальдо и число
+    операций, для группировки по типу — сумму и число операций.
+    """
+    where = 'a.user_id = ?'
+    params = [user_id]
+    if account_id is not None:
+        where += ' AND r.account_id = ?'
+        params.append(account_id)
+    if month_from:
+        where += ' AND r.month >= ?'
+        params.append(month_from)
+    if month_to:
+        where += ' AND r.month <= ?'
+        params.append(month_to)
+
+    conn = get_db()
+    rows = {}
+    missing = set()
+    query = REPORT_QUERY.format(column=REPORT_GROUPS[group], where=where)
+
+    for row in conn.execute(query, params):
+        if group == 'type':
+            item = rows.setdefault(row['key'], {'type': row['key'], 'total': 0.0,
+                                                'transaction_count': 0})
+        else:
+            item = rows.setdefault(row['key'], {
+                'month' if group == 'month' else 'account_id': row['key'],
+                'income': 0.0, 'expense': 0.0, 'net': 0.0, 'transaction_count': 0
+            })
+
+        item['transaction_count'] += row['transaction_count']
+        # Итоги суммируются в SQL точно, в единицы валюты переводится одна сумма на группу
+        converted = snapshot.convert(from_minor(row['total'], row['currency']), row['currency'], target)
+        if converted is None:
+            missing.add(row['currency'])
+            continue
+
+        if group == 'type':
+            item['total'] += converted
+        else:
+            item['net'] += converted
+            if row['type'] in ('income', 'expense'):
+                item[row['type']] += converted
+
+    if group == 'account' and rows:
+        placeholders = ', '.join('?' * len(rows))
+        for account in conn.execute(
+                f'SELECT id, name, currency FROM accounts WHERE id IN ({placeholders})',
+                list(rows)):
+            rows[account['id']].update(name=account['name'], account_currency=account['currency'])
+
+    return {
+        'currency': target,
+        'group': group,
+        'rows': list(rows.values()),
+        'missing_rates': sorted(missing),
+        'rates_fetched_at': snapshot.fetched_at.isoformat()
+    }
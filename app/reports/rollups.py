@@ -0,0 +1,106 @@
+import sqlite3
+from typing import List, Dict, Optional, Tuple
+
+ROLLUPS_SCHEMA_PATH = 'database/rollups.sql'
+
+# Итоги транзакций, из которых строятся месячные строки
+ROLLUP_SOURCE_QUERY = '''
+    SELECT account_id, substr(date, 1, 7) AS month, type, currency,
+           SUM(amount) AS total, COUNT(*) AS transaction_count
+    FROM transactions
+    WHERE status = 'confirmed' {where}
+    GROUP BY account_id, month, type, currency
+'''
+
+def ensure_rollup_schema(conn: sqlite3.Connection) -> bool:
+    """Создание таблицы и триггеров итогов. Возвращает True, если итоги созданы впервые"""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_rollups'"
+    ).fetchone() is not None
+
+    with open(ROLLUPS_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    return not existed
+
+def rebuild_rollups(conn: sqlite3.Connection, account_ids: Optional[List[int]] = None) -> int:
+    """Пересчет месячных итогов с нуля по таблице transactions.
+
+    Если account_ids не указан, пересчитываются все счета.
+    Возвращает число строк итогов после пересчета.
+    """
+    if account_ids is None:
+        where, params = '', []
+    else:
+        if not account_ids:
+            return 0
+        placeholders = ', '.join('?' * len(account_ids))
+        where, params = f'AND account_id IN ({placeholders})', list(account_ids)
+
+    try:
+        conn.execute(f'DELETE FROM monthly_rollups WHERE 1 = 1 {where}', params)
+        cursor = conn.execute(
+            f'''INSERT INTO monthly_rollups (account_id, month, type, currency, total, transaction_count)
+                {ROLLUP_SOURCE_QUERY.format(where=where)}''',
+            params
+        )
+        rebuilt = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return rebuilt
+
+def apply_rollup_delta(conn: sqlite3.Connection, account_id: int,
+                       month_totals: Dict[Tuple[str, str, str], List]):
+    """Пакетное обновление итогов: {(month, type, currency): [сумма, число операций]}.
+
+    Парный к apply_ledger_delta для вставки при отключенных через
+    suspend_ledger триггерах. Не делает commit.
+    """
+    conn.executemany(
+        '''INSERT INTO monthly_rollups (account_id, month, type, currency, total, transaction_count)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(account_id, month, type, currency) DO UPDATE SET
+               total = total + excluded.total,
+               transaction_count = transaction_count + excluded.transaction_count''',
+        [(account_id, month, transaction_type, currency, total[0], total[1])
+         for (month, transaction_type, currency), total in month_totals.items()]
+    )
+
+def check_rollups(conn: sqlite3.Connection) -> List[Dict]:
+    """Сверка итогов с транзакциями.
+
+    Возвращает список расхождений; пустой список означает, что итоги согласованы.
+    """
+    expected = ROLLUP_SOURCE_QUERY.format(where='')
+    key = 'account_id, month, type, currency'
+    rows = conn.execute(
+        f'''WITH expected AS ({expected})
+            SELECT e.account_id, e.month, e.type, e.currency,
+                   r.total, e.total, r.transaction_count, e.transaction_count
+            FROM expected e
+            LEFT JOIN monthly_rollups r USING ({key})
+            UNION ALL
+            SELECT r.account_id, r.month, r.type, r.currency,
+                   r.total, NULL, r.transaction_count, NULL
+            FROM monthly_rollups r
+            WHERE NOT EXISTS (SELECT 1 FROM expected e
+                              WHERE e.account_id = r.account_id AND e.month = r.month
+                                AND e.type = r.type AND e.currency = r.currency)'''
+    ).fetchall()
+
+    problems = []
+    for account_id, month, transaction_type, currency, stored, actual, stored_count, actual_count in rows:
+        if (stored is None or actual is None or stored_count != actual_count
+                or stored != actual):
+            problems.append({
+                'account_id': account_id,
+                'month': month,
+                'type': transaction_type,
+                'currency': currency,
+                'stored': stored,
+                'actual': actual
+            })
+    return problems
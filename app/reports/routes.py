@@ -0,0 +1,55 @@
+import re
+from flask import Blueprint, request, jsonify, session
+from app.accounts.models import get_account_by_id
+from app.accounts.reference import currencies
+from app.fx.models import get_rate_service
+from app.fx.providers import RateProviderError
+from app.reports.models import build_report
+
+reports_bp = Blueprint('reports', __name__, url_prefix='/reports')
+
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+def report_response(group: str):
+    """Общая проверка параметров отчета: from/to (YYYY-MM), account_id, currency"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    user_id = session['user_id']
+    month_from = request.args.get('from') or None
+    month_to = request.args.get('to') or None
+    for month in (month_from, month_to):
+        if month and not MONTH_PATTERN.match(month):
+            return jsonify({'success': False, 'error': 'Месяц указывается в формате ГГГГ-ММ'}), 400
+
+    account_id = request.args.get('account_id', type=int)
+    if account_id is not None and not get_account_by_id(account_id, user_id):
+        return jsonify({'success': False, 'error': 'Счет не найден'}), 404
+
+    target = request.args.get('currency', 'USD').strip().upper()
+    if target not in currencies.codes:
+        return jsonify({'success': False, 'error': 'Недопустимая валюта'})
+
+    try:
+        snapshot = get_rate_service().get_rates()
+    except RateProviderError:
+        return jsonify({'success': False, 'error': 'Курсы валют недоступны'}), 503
+
+    report = build_report(user_id, group, target, snapshot, month_from=month_from,
+                          month_to=month_to, account_id=account_id)
+    return jsonify({'success': True, **report})
+
+@reports_bp.route('/api/monthly', methods=['GET'])
+def api_monthly_report():
+    """API: Доходы и расходы по месяцам"""
+    return report_response('month')
+
+@reports_bp.route('/api/accounts', methods=['GET'])
+def api_accounts_report():
+    """API: Доходы и расходы по счетам за период"""
+    return report_response('account')
+
+@reports_bp.route('/api/types', methods=['GET'])
+def api_types_report():
+    """API: Суммы по типам транзакций за период"""
+    return report_response('type')
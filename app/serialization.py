@@ -0,0 +1,84 @@
+from typing import Dict, List, Type
+from flask.json.provider import DefaultJSONProvider
+from app.records import Record
+
+# orjson необязателен: без него ответы сериализует стандартный json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(o):
+    # Записи моделей (app/records.py) отдаются объектами
+    if isinstance(o, Record):
+        return o.to_dict()
+    return DefaultJSONProvider.default(o)
+
+class JSONProvider(DefaultJSONProvider):
+    """Стандартный провайдер Flask, умеющий сериализовать записи моделей"""
+
+    default = staticmethod(_default)
+
+class OrjsonProvider(JSONProvider):
+    """JSON-провайдер Flask на orjson.
+
+    Кодирует в несколько раз быстрее стандартного json, а кортежи и
+    списки строк (колоночный формат, см. columns_payload) сериализует без
+    промежуточных объектов. Порядок ключей, отступы в режиме отладки и
+    обработка date, Decimal и UUID совпадают с DefaultJSONProvider;
+    отличие — не-ASCII символы пишутся в UTF-8, а не \\u-последовательностями.
+    """
+
+    def _options(self) -> int:
+        # Даты отдаются через default Flask (формат HTTP), как у стандартного провайдера
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def encode(self, obj) -> bytes:
+        """JSON в байтах UTF-8"""
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Параметры json.dumps orjson не поддерживает: с ними — стандартный путь
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj) + b'\n', mimetype=self.mimetype)
+
+def columns_payload(record_type: Type[Record], records: List[Record]) -> Dict:
+    """Колоночный формат списка записей: {'columns': [...], 'rows': [[...], ...]}.
+
+    Строки передаются кортежами, без словаря на каждую запись и
+    повторения имен полей в теле ответа.
+    """
+    return {'columns': list(record_type.fields()), 'rows': [record.to_tuple() for record in records]}
+
+def init_app(app):
+    """Выбор JSON-провайдера по настройке JSON_PROVIDER.
+
+    'auto' — orjson, если установлен, иначе стандартный json;
+    'orjson' — только orjson; 'stdlib' — стандартный json.
+    """
+    kind = app.config.get('JSON_PROVIDER', 'auto')
+    if kind == 'auto':
+        kind = 'orjson' if orjson is not None else 'stdlib'
+    if kind == 'orjson':
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER = 'orjson', но пакет orjson не установлен")
+        app.json = OrjsonProvider(app)
+    elif kind == 'stdlib':
+        app.json = JSONProvider(app)
+    else:
+        raise ValueError(f"Неизвестный JSON-провайдер '{kind}'")
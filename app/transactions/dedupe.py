@@ -0,0 +1,103 @@
+import hashlib
+import sqlite3
+from collections import Counter
+from functools import lru_cache
+from typing import List, Tuple
+
+DEDUPE_MODES = ('strict', 'fuzzy', 'off')
+
+def normalize_description(description: str) -> str:
+    """Описание без различий в регистре и пробелах"""
+    return ' '.join((description or '').split()).casefold()
+
+@lru_cache(maxsize=65536)
+def description_hash(description: str) -> int:
+    """64-битный хеш нормализованного описания"""
+    # В выписке описания сильно повторяются (магазины, переводы), поэтому
+    # хеш нормализованного описания кэшируется
+    digest = hashlib.blake2b(normalize_description(description).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+def combine_fingerprint(description_digest: int, amount: int, day: int) -> int:
+    """Отпечаток из хеша описания (description_hash), суммы и даты числом ГГГГММДД.
+
+    Для массовой генерации, где хеши описаний и дат считаются заранее.
+    """
+    value = (description_digest
+             ^ (amount * 0x9E3779B97F4A7C15)
+             ^ (day * 0xC2B2AE3D27D4EB4F)) & 0xFFFFFFFFFFFFFFFF
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def transaction_fingerprint(date: str, amount: int, description: str) -> int:
+    """Отпечаток транзакции: 64-битный хеш (дата, сумма в минимальных единицах,
+    нормализованное описание).
+
+    Хеш стабилен между процессами (в отличие от hash()) и помещается в INTEGER SQLite.
+    """
+    return combine_fingerprint(description_hash(description or ''), amount, int(date.replace('-', '')))
+
+class DuplicateFilter:
+    """Отсев уже импортированных строк без SELECT на каждую строку.
+
+    Для каждой пачки одним проходом по индексу читаются отпечатки
+    транзакций счета, существовавших до начала импорта, за диапазон дат
+    пачки. Одинаковые строки внутри выписки (две одинаковые покупки за
+    день) легальны, поэтому дублем считается только n-е повторение
+    строки, если в базе до импорта таких строк было не меньше n —
+    уникальный индекс отбросил бы их.
+
+    Режим strict сравнивает описания точно, fuzzy — без учета регистра и
+    пробелов, off — не отсеивает ничего.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, account_id: int, mode: str = 'strict'):
+        if mode not in DEDUPE_MODES:
+            raise ValueError(f"Неизвестный режим поиска дублей '{mode}'")
+        self.conn = conn
+        self.account_id = account_id
+        self.mode = mode
+        # Строки этого импорта получают id больше, до импорта — не больше
+        self._last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM transactions').fetchone()[0]
+        self._seen = {}
+
+    def _stored(self, date_from: str, date_to: str) -> Counter:
+        if self.mode == 'fuzzy':
+            rows = self.conn.execute(
+                '''SELECT fingerprint FROM transactions
+                   WHERE account_id = ? AND date BETWEEN ? AND ? AND id <= ?''',
+                (self.account_id, date_from, date_to, self._last_id)
+            )
+            return Counter(row[0] for row in rows)
+        rows = self.conn.execute(
+            '''SELECT fingerprint, description FROM transactions
+               WHERE account_id = ? AND date BETWEEN ? AND ? AND id <= ?''',
+            (self.account_id, date_from, date_to, self._last_id)
+        )
+        return Counter((row[0], row[1]) for row in rows)
+
+    def filter(self, batch: List[tuple]) -> Tuple[List[tuple], int]:
+        """Строки пачки без дублей и число отсеянных.
+
+        Строка пачки: (account_id, date, amount, currency, description, type,
+        created_at, fingerprint).
+        """
+        if self.mode == 'off' or not batch:
+            return batch, 0
+
+        stored = self._stored(min(row[1] for row in batch), max(row[1] for row in batch))
+        if not stored:
+            return batch, 0
+
+        fuzzy = self.mode == 'fuzzy'
+        seen = self._seen
+        unique = []
+        for row in batch:
+            key = row[7] if fuzzy else (row[7], row[4])
+            limit = stored.get(key)
+            if limit:
+                occurrence = seen.get(key, 0)
+                seen[key] = occurrence + 1
+                if occurrence < limit:
+                    continue
+            unique.append(row)
+        return unique, len(batch) - len(unique)
@@ -0,0 +1,354 @@
+import csv
+import io
+import os
+import re
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.db import get_db
+from app.cache import invalidate_user
+from app.money import to_minor, from_minor
+from app.accounts.ledger import apply_ledger_delta, resume_ledger, suspend_ledger
+from app.accounts.versions import bump_data_version
+from app.transactions.dedupe import DuplicateFilter, transaction_fingerprint
+from app.transactions.search import index_new_transactions
+from app.reports.rollups import apply_rollup_delta
+
+class StatementError(Exception):
+    """Файл выписки не может быть импортирован"""
+
+BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 20
+
+# Форматы CSV-выписок. Формат определяется по заголовку: все колонки
+# из columns должны присутствовать в первой строке файла
+CSV_FORMATS = {
+    'kaspi': {
+        'columns': {'date': 'Дата', 'amount': 'Сумма', 'operation': 'Операция',
+                    'description': 'Детали'},
+        'date_formats': ('%d.%m.%y', '%d.%m.%Y'),
+    },
+    'halyk': {
+        'columns': {'date': 'Дата операции', 'amount': 'Сумма', 'currency': 'Валюта',
+                    'description': 'Описание'},
+        'date_formats': ('%d.%m.%Y', '%Y-%m-%d'),
+    },
+    'generic': {
+        'columns': {'date': 'date', 'amount': 'amount', 'description': 'description'},
+        'date_formats': ('%Y-%m-%d', '%d.%m.%Y'),
+    },
+}
+
+# Допустимые значения явно указанного формата (CLI, API импорта)
+STATEMENT_FORMATS = tuple(sorted(CSV_FORMATS)) + ('ofx',)
+
+INSERT_QUERY = '''INSERT INTO transactions (account_id, date, amount, currency,
+                  description, type, status, created_at, fingerprint)
+                  VALUES (?, ?, ?, ?, ?, ?, 'confirmed', ?, ?)'''
+
+_AMOUNT_JUNK = re.compile(r'[\s₸$€₽A-Za-zА-Яа-я]')
+_OFX_TOKEN = re.compile(r'<(/?STMTTRN|DTPOSTED|TRNAMT|NAME|MEMO|CURSYM|CURDEF)>([^<\r\n]*)')
+OFX_CHUNK_SIZE = 1024 * 1024
+
+def parse_amount(value: str) -> Decimal:
+    """Точная сумма из строки выписки: '- 5 000,50 ₸', '+1234.5', '-1,234.56'"""
+    cleaned = _AMOUNT_JUNK.sub('', value)
+    if ',' in cleaned and '.' in cleaned:
+        # Запятая — разделитель тысяч
+        cleaned = cleaned.replace(',', '')
+    else:
+        cleaned = cleaned.replace(',', '.')
+    if not cleaned or cleaned in ('+', '-'):
+        raise ValueError(f"пустая сумма '{value}'")
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"неверная сумма '{value}'")
+    if not amount.is_finite():
+        raise ValueError(f"неверная сумма '{value}'")
+    return amount
+
+# В выписке десятки операций на дату, поэтому strptime кэшируется
+@lru_cache(maxsize=4096)
+def parse_date(value: str, formats: Tuple[str, ...]) -> str:
+    """Дата выписки в формате ISO (YYYY-MM-DD)"""
+    value = value.strip()
+    for date_format in formats:
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"неверная дата '{value}'")
+
+def detect_encoding(path: str) -> str:
+    """UTF-8 (с BOM или без) либо cp1251 для выгрузок из банковских клиентов"""
+    with open(path, 'rb') as f:
+        head = f.read(64 * 1024)
+    try:
+        head.decode('utf-8')
+        return 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Обрезанный на границе блока многобайтовый символ не считается ошибкой
+        if e.start >= len(head) - 3:
+            return 'utf-8-sig'
+        return 'cp1251'
+
+def detect_format(path: str) -> str:
+    """Формат файла по расширению и заголовку"""
+    if path.lower().endswith(('.ofx', '.qfx')):
+        return 'ofx'
+
+    encoding = detect_encoding(path)
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        header_line = f.readline()
+    delimiter = ';' if header_line.count(';') > header_line.count(',') else ','
+    header = {column.strip() for column in next(csv.reader([header_line], delimiter=delimiter), [])}
+
+    for name, spec in CSV_FORMATS.items():
+        if set(spec['columns'].values()) <= header:
+            return name
+    raise StatementError("Неизвестный формат выписки")
+
+def iter_csv_rows(stream, format_name: str, default_currency: str) -> Iterator[Tuple[int, Optional[tuple], Optional[str]]]:
+    """Построчный разбор CSV: (номер строки, (date, amount, currency, description), ошибка)"""
+    spec = CSV_FORMATS[format_name]
+    columns = spec['columns']
+    date_formats = spec['date_formats']
+
+    header_line = stream.readline()
+    delimiter = ';' if header_line.count(';') > header_line.count(',') else ','
+    header = [column.strip() for column in next(csv.reader([header_line], delimiter=delimiter))]
+    missing = [name for name in columns.values() if name not in header]
+    if missing:
+        # Формат задан явно (--format, задача импорта) и не подходит к файлу
+        raise StatementError(f"Выписка не соответствует формату {format_name}: "
+                             f"нет колонок {', '.join(missing)}")
+    index = {field: header.index(name) for field, name in columns.items()}
+    date_index = index['date']
+    amount_index = index['amount']
+    description_index = index['description']
+    operation_index = index.get('operation')
+    currency_index = index.get('currency')
+
+    for line_number, row in enumerate(csv.reader(stream, delimiter=delimiter), start=2):
+        if not row or not any(row):
+            continue
+        try:
+            date = parse_date(row[date_index], date_formats)
+            amount = parse_amount(row[amount_index])
+            description = row[description_index].strip()
+            if operation_index is not None:
+                operation = row[operation_index].strip()
+                if operation:
+                    description = f"{operation}: {description}" if description else operation
+            currency = default_currency
+            if currency_index is not None and row[currency_index].strip():
+                currency = row[currency_index].strip().upper()
+        except (ValueError, IndexError) as e:
+            yield line_number, None, str(e)
+            continue
+        yield line_number, (date, amount, currency, description), None
+
+def iter_ofx_rows(stream, default_currency: str) -> Iterator[Tuple[int, Optional[tuple], Optional[str]]]:
+    """Потоковый разбор OFX 1.x (SGML) и 2.x (XML).
+
+    Файл читается блоками по OFX_CHUNK_SIZE; в каждом блоке одним проходом
+    регулярного выражения выбираются только нужные теги завершенных STMTTRN,
+    незавершенный хвост переносится в следующий блок.
+    """
+    currency = default_currency
+    number = 0
+    current = None
+    buffer = ''
+
+    while True:
+        chunk = stream.read(OFX_CHUNK_SIZE)
+        buffer += chunk
+        if chunk:
+            cut = buffer.rfind('</STMTTRN>')
+            # Без завершенной транзакции режем по последнему тегу: значения
+            # до него гарантированно прочитаны целиком
+            cut = max(buffer.rfind('<'), 0) if cut == -1 else cut + len('</STMTTRN>')
+        else:
+            cut = len(buffer)
+
+        for tag, value in _OFX_TOKEN.findall(buffer, 0, cut):
+            if tag == 'STMTTRN':
+                current = {}
+                number += 1
+            elif tag == '/STMTTRN':
+                if current is None:
+                    continue
+                try:
+                    date = parse_date(current.get('DTPOSTED', '')[:8], ('%Y%m%d',))
+                    amount = parse_amount(current.get('TRNAMT', ''))
+                except ValueError as e:
+                    yield number, None, str(e)
+                else:
+                    name = current.get('NAME', '').strip()
+                    memo = current.get('MEMO', '').strip()
+                    description = f"{name}: {memo}" if name and memo else name or memo
+                    yield number, (date, amount, current.get('CURSYM', currency).strip().upper(), description), None
+                current = None
+            elif tag == 'CURDEF':
+                if value.strip():
+                    currency = value.strip().upper()
+            elif current is not None:
+                current[tag] = value
+
+        if not chunk:
+            break
+        buffer = buffer[cut:]
+
+class StatementImporter:
+    """Импорт выписок в транзакции счета.
+
+    Файл читается построчно, строки вставляются executemany пачками по
+    batch_size в отдельных транзакциях. Уже импортированные ранее строки
+    отсеиваются по отпечаткам (режим dedupe: 'strict', 'fuzzy' или 'off').
+    Триггеры реестра на время вставки пачки отключаются, а остатки
+    обновляются одним проходом по дням пачки. progress вызывается после каждой пачки с (импортировано строк,
+    прочитано байт, размер файла).
+    """
+
+    def __init__(self, account_id: int, user_id: int, batch_size: int = BATCH_SIZE,
+                 progress: Callable[[int, int, int], None] = None, dedupe: str = 'strict'):
+        self.account_id = account_id
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.progress = progress
+        self.dedupe = dedupe
+        # Сводка последнего импорта; доступна и после исключения
+        self.summary = None
+
+    def _account_currency(self, conn) -> str:
+        account = conn.execute(
+            'SELECT currency FROM accounts WHERE id = ? AND user_id = ?',
+            (self.account_id, self.user_id)
+        ).fetchone()
+        if not account:
+            raise StatementError("Счет не найден")
+        return account['currency']
+
+    def import_file(self, path: str, format_name: str = None) -> Dict:
+        """Импорт одного файла, возвращает сводку"""
+        started = time.perf_counter()
+        conn = get_db()
+        default_currency = self._account_currency(conn)
+        format_name = format_name or detect_format(path)
+        total_bytes = os.path.getsize(path)
+
+        summary = {
+            'file': os.path.basename(path),
+            'format': format_name,
+            'rows_read': 0,
+            'imported': 0,
+            'skipped': 0,
+            'duplicates': 0,
+            'errors': [],
+            'date_from': None,
+            'date_to': None,
+            'total_amount': 0,
+        }
+        self.summary = summary
+
+        with open(path, 'rb') as raw:
+            stream = io.TextIOWrapper(raw, encoding=detect_encoding(path), newline='')
+            if format_name == 'ofx':
+                rows = iter_ofx_rows(stream, default_currency)
+            else:
+                rows = iter_csv_rows(stream, format_name, default_currency)
+
+            created_at = datetime.now().isoformat(' ')
+            duplicates = DuplicateFilter(conn, self.account_id, self.dedupe)
+            batch = []
+            try:
+                for line_number, parsed, error in rows:
+                    summary['rows_read'] += 1
+                    if error:
+                        summary['skipped'] += 1
+                        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                            summary['errors'].append(f"Строка {line_number}: {error}")
+                        continue
+
+                    date, amount, currency, description = parsed
+                    # Суммы счета хранятся в минимальных единицах его валюты, а курса
+                    # на дату операции нет: строки в другой валюте не импортируются
+                    if currency != default_currency:
+                        summary['skipped'] += 1
+                        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                            summary['errors'].append(
+                                f"Строка {line_number}: валюта {currency} не совпадает с валютой счета "
+                                f"{default_currency}")
+                        continue
+                    try:
+                        amount = to_minor(amount, default_currency)
+                    except ValueError as e:
+                        summary['skipped'] += 1
+                        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                            summary['errors'].append(f"Строка {line_number}: {e}")
+                        continue
+                    batch.append((self.account_id, date, amount, currency, description,
+                                  'income' if amount > 0 else 'expense', created_at,
+                                  transaction_fingerprint(date, amount, description)))
+                    if len(batch) >= self.batch_size:
+                        self._flush(conn, batch, duplicates, summary)
+                        batch = []
+                        if self.progress:
+                            self.progress(summary['imported'], raw.tell(), total_bytes)
+
+                if batch:
+                    self._flush(conn, batch, duplicates, summary)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                # Зафиксированные пачки уже изменили балансы
+                if summary['imported']:
+                    invalidate_user(self.user_id)
+
+        if self.progress:
+            self.progress(summary['imported'], total_bytes, total_bytes)
+
+        summary['total_amount'] = from_minor(summary['total_amount'], default_currency)
+        summary['seconds'] = round(time.perf_counter() - started, 3)
+        summary['rows_per_second'] = int(summary['imported'] / summary['seconds']) if summary['seconds'] else 0
+        return summary
+
+    def _flush(self, conn, batch: List[tuple], duplicates: DuplicateFilter, summary: Dict):
+        batch, skipped = duplicates.filter(batch)
+        summary['duplicates'] += skipped
+        if not batch:
+            return
+
+        day_totals = {}
+        month_totals = {}
+        for row in batch:
+            total = day_totals.setdefault(row[1], [0, 0])
+            total[0] += row[2]
+            total[1] += 1
+            total = month_totals.setdefault((row[1][:7], row[5], row[3]), [0, 0])
+            total[0] += row[2]
+            total[1] += 1
+
+        batch.sort(key=lambda row: row[1])
+        # Первая запись открывает пишущую транзакцию: id после last_id — только эта пачка
+        suspend_ledger(conn, self.account_id)
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM transactions').fetchone()[0]
+        conn.executemany(INSERT_QUERY, batch)
+        resume_ledger(conn, self.account_id)
+        apply_ledger_delta(conn, self.account_id, day_totals)
+        apply_rollup_delta(conn, self.account_id, month_totals)
+        index_new_transactions(conn, last_id)
+        bump_data_version(conn, self.user_id)
+        conn.commit()
+
+        summary['imported'] += len(batch)
+        summary['total_amount'] += sum(total[0] for total in day_totals.values())
+        first, last = min(day_totals), max(day_totals)
+        if summary['date_from'] is None or first < summary['date_from']:
+            summary['date_from'] = first
+        if summary['date_to'] is None or last > summary['date_to']:
+            summary['date_to'] = last
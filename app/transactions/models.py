@@ -0,0 +1,117 @@
+import base64
+import heapq
+from itertools import islice
+from operator import attrgetter
+from typing import List, Optional, Tuple
+from app.db import get_db
+from app.money import minor_factor_sql
+from app.records import Record
+
+TRANSACTION_TYPES = frozenset(['income', 'expense'])
+TRANSACTION_STATUSES = frozenset(['confirmed', 'pending'])
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    """Курсор страницы поврежден или получен не от этого API"""
+
+def encode_cursor(date: str, transaction_id: int) -> str:
+    """Непрозрачный курсор следующей страницы: позиция (date, id) последней строки"""
+    return base64.urlsafe_b64encode(f'{date}|{transaction_id}'.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Позиция (date, id) из курсора"""
+    try:
+        date, transaction_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return date, int(transaction_id)
+    except (ValueError, UnicodeError):
+        raise InvalidCursor('Неверный курсор страницы')
+
+class Transaction(Record):
+    """Транзакция; сумма в единицах валюты"""
+
+    __slots__ = ('id', 'account_id', 'date', 'amount', 'currency', 'description', 'type',
+                 'status', 'created_at')
+
+    def __init__(self, id: int, account_id: int, date: str, amount: float, currency: str,
+                 description: Optional[str], type: str, status: str, created_at):
+        self.id = id
+        self.account_id = account_id
+        self.date = date
+        self.amount = amount
+        self.currency = currency
+        self.description = description
+        self.type = type
+        self.status = status
+        self.created_at = created_at
+
+def transaction_columns(table: str) -> str:
+    """Колонки Transaction для SELECT по таблице (или псевдониму) table.
+
+    Сумма переводится в единицы валюты в самом запросе: целое, деленное
+    на степень десяти в SQLite, дает тот же float, что from_minor.
+    """
+    return (f'{table}.id, {table}.account_id, {table}.date, '
+            f"{table}.amount * 1.0 / {minor_factor_sql(f'{table}.currency')}, "
+            f'{table}.currency, {table}.description, {table}.type, {table}.status, {table}.created_at')
+
+def list_transactions(user_id: int, account_id: int = None, date_from: str = None,
+                      date_to: str = None, transaction_type: str = None, status: str = None,
+                      cursor: str = None, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Transaction], Optional[str]]:
+    """Страница транзакций пользователя по всем счетам, от новых к старым.
+
+    Пагинация курсором по (date, id): каждый счет читается диапазоном
+    составного индекса (account_id, [type | status,] date, id) не дальше
+    limit + 1 строк после курсора, и страницы счетов сливаются по порядку.
+    Одним запросом с account_id IN (...) SQLite пришлось бы сортировать
+    все подходящие строки, а так стоимость страницы зависит только от
+    limit и числа счетов, но не от номера страницы. Возвращает
+    (транзакции, курсор следующей страницы или None).
+    """
+    conn = get_db()
+
+    if account_id is None:
+        accounts = conn.execute('SELECT id FROM accounts WHERE user_id = ?', (user_id,))
+    else:
+        accounts = conn.execute('SELECT id FROM accounts WHERE id = ? AND user_id = ?',
+                                (account_id, user_id))
+    account_ids = [row[0] for row in accounts]
+
+    where = ['account_id = ?']
+    params = []
+    if transaction_type:
+        where.append('type = ?')
+        params.append(transaction_type)
+    if status:
+        where.append('status = ?')
+        params.append(status)
+    if date_from:
+        where.append('date >= ?')
+        params.append(date_from)
+    if date_to:
+        where.append('date <= ?')
+        params.append(date_to)
+    if cursor:
+        where.append('(date, id) < (?, ?)')
+        params.extend(decode_cursor(cursor))
+
+    query = f'''SELECT {transaction_columns('transactions')}
+                FROM transactions
+                WHERE {' AND '.join(where)}
+                ORDER BY date DESC, id DESC
+                LIMIT ?'''
+
+    reader = conn.cursor()
+    reader.row_factory = Transaction.row_factory
+    pages = [reader.execute(query, (account, *params, limit + 1)).fetchall()
+             for account in account_ids]
+    transactions = list(islice(heapq.merge(*pages, key=attrgetter('date', 'id'), reverse=True),
+                               limit + 1))
+
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = encode_cursor(transactions[-1].date, transactions[-1].id)
+
+    return transactions, next_cursor
@@ -0,0 +1,150 @@
+import os
+import uuid
+from flask import Blueprint, request, jsonify, session, current_app
+from werkzeug.utils import secure_filename
+from app.accounts.models import get_account_by_id
+from app.jobs.models import enqueue_job
+from app.serialization import columns_payload
+from app.transactions.dedupe import DEDUPE_MODES
+from app.transactions.importer import STATEMENT_FORMATS
+from app.transactions.models import (
+    list_transactions, InvalidCursor, Transaction, TRANSACTION_TYPES, TRANSACTION_STATUSES,
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from app.transactions.search import search_transactions
+
+transactions_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
+
+STATEMENT_EXTENSIONS = frozenset(['.csv', '.ofx', '.qfx'])
+RECEIPT_EXTENSIONS = frozenset(['.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff'])
+
+def save_upload(upload, allowed_extensions):
+    """Сохранение файла во временную папку: (путь, исходное имя) или (None, ошибка)"""
+    if not upload or not upload.filename:
+        return None, 'Файл не выбран'
+
+    filename = secure_filename(upload.filename) or 'upload'
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in allowed_extensions:
+        return None, 'Недопустимый тип файла'
+
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}{extension}")
+    upload.save(path)
+    return path, filename
+
+@transactions_bp.route('/api/transactions', methods=['GET'])
+def api_get_transactions():
+    """API: Страница транзакций пользователя (курсор в next_cursor).
+
+    С format=columns транзакции отдаются колоночным форматом
+    {"columns": [...], "rows": [[...], ...]} вместо списка объектов.
+    """
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    user_id = session['user_id']
+    account_id = request.args.get('account_id', type=int)
+    if account_id is not None and not get_account_by_id(account_id, user_id):
+        return jsonify({'success': False, 'error': 'Счет не найден'}), 404
+
+    transaction_type = request.args.get('type') or None
+    if transaction_type and transaction_type not in TRANSACTION_TYPES:
+        return jsonify({'success': False, 'error': 'Недопустимый тип транзакции'}), 400
+
+    status = request.args.get('status') or None
+    if status and status not in TRANSACTION_STATUSES:
+        return jsonify({'success': False, 'error': 'Недопустимый статус транзакции'}), 400
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    try:
+        transactions, next_cursor = list_transactions(
+            user_id,
+            account_id=account_id,
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            transaction_type=transaction_type,
+            status=status,
+            cursor=request.args.get('cursor') or None,
+            limit=limit
+        )
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    if request.args.get('format') == 'columns':
+        return jsonify({'success': True, **columns_payload(Transaction, transactions),
+                        'next_cursor': next_cursor})
+    return jsonify({'success': True, 'transactions': transactions, 'next_cursor': next_cursor})
+
+@transactions_bp.route('/api/search', methods=['GET'])
+def api_search_transactions():
+    """API: Поиск транзакций по словам описания (по началу слова)"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    user_id = session['user_id']
+    account_id = request.args.get('account_id', type=int)
+    if account_id is not None and not get_account_by_id(account_id, user_id):
+        return jsonify({'success': False, 'error': 'Счет не найден'}), 404
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    transactions = search_transactions(
+        user_id,
+        request.args.get('q', ''),
+        account_id=account_id,
+        limit=max(1, min(limit, MAX_PAGE_SIZE))
+    )
+    return jsonify({'success': True, 'transactions': transactions})
+
+@transactions_bp.route('/api/import', methods=['POST'])
+def api_import_statement():
+    """API: Постановка выписки (CSV/OFX) в очередь импорта"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    user_id = session['user_id']
+    account_id = request.form.get('account_id', type=int)
+    if not account_id or not get_account_by_id(account_id, user_id):
+        return jsonify({'success': False, 'error': 'Счет не найден'}), 404
+
+    dedupe = request.form.get('dedupe') or 'strict'
+    if dedupe not in DEDUPE_MODES:
+        return jsonify({'success': False, 'error': 'Недопустимый режим поиска дублей'})
+
+    statement_format = request.form.get('format') or None
+    if statement_format is not None and statement_format not in STATEMENT_FORMATS:
+        # Воркер не должен повторять задачу, которая не выполнится никогда
+        return jsonify({'success': False, 'error': 'Неизвестный формат выписки'}), 400
+
+    path, filename = save_upload(request.files.get('file'), STATEMENT_EXTENSIONS)
+    if path is None:
+        return jsonify({'success': False, 'error': filename})
+
+    # Разбор выполняет воркер (run_workers.py); клиент опрашивает статус задачи
+    job_id = enqueue_job(user_id, 'import_statement', {
+        'path': path,
+        'filename': filename,
+        'account_id': account_id,
+        'format': statement_format,
+        'dedupe': dedupe
+    }, max_attempts=current_app.config['JOB_MAX_ATTEMPTS'])
+
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+@transactions_bp.route('/api/receipts', methods=['POST'])
+def api_upload_receipt():
+    """API: Постановка фото чека в очередь распознавания"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Не авторизован'}), 401
+
+    path, filename = save_upload(request.files.get('file'), RECEIPT_EXTENSIONS)
+    if path is None:
+        return jsonify({'success': False, 'error': filename})
+
+    job_id = enqueue_job(session['user_id'], 'ocr_receipt', {
+        'path': path,
+        'filename': filename
+    }, max_attempts=current_app.config['JOB_MAX_ATTEMPTS'])
+
+    return jsonify({'success': True, 'job_id': job_id}), 202
@@ -0,0 +1,84 @@
+import re
+import sqlite3
+from typing import List, Optional
+from app.db import get_db
+from app.transactions.models import Transaction, transaction_columns
+
+SEARCH_SCHEMA_PATH = 'database/search.sql'
+
+# Не больше стольких слов из запроса: каждое слово — отдельный проход по индексу
+MAX_QUERY_TERMS = 8
+
+_TERM = re.compile(r'\w+')
+
+def ensure_search_index(conn: sqlite3.Connection) -> bool:
+    """Создание поискового индекса и триггеров. Возвращает True, если индекс создан впервые.
+
+    Для существующей БД индекс сразу заполняется по таблице transactions.
+    """
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'"
+    ).fetchone() is not None
+
+    with open(SEARCH_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    if not existed:
+        conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+        conn.commit()
+
+    return not existed
+
+def index_new_transactions(conn: sqlite3.Connection, after_id: int):
+    """Индексирование транзакций с id больше after_id одним запросом.
+
+    Для пакетной вставки при отключенных через suspend_ledger триггерах:
+    after_id читается уже внутри пишущей транзакции, поэтому все строки
+    после него вставлены ею. Не делает commit.
+    """
+    # Диапазон по rowid: читаются только строки пачки
+    conn.execute(
+        '''INSERT INTO transactions_fts (rowid, description)
+           SELECT id, description FROM transactions WHERE id > ?''',
+        (after_id,)
+    )
+
+def build_match_query(text: str) -> Optional[str]:
+    """Запрос FTS5 из строки пользователя: все слова, каждое как префикс.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 (OR, NEAR, *, ^) во
+    вводе пользователя не интерпретируются. None — если слов нет.
+    """
+    terms = _TERM.findall(text or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_transactions(user_id: int, text: str, account_id: int = None,
+                        limit: int = 20) -> List[Transaction]:
+    """Транзакции пользователя, описание которых содержит слова запроса.
+
+    Сортировка по релевантности (bm25), при равной — от новых к старым.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    where = 'transactions_fts MATCH ? AND a.user_id = ?'
+    params = [match, user_id]
+    if account_id is not None:
+        where += ' AND t.account_id = ?'
+        params.append(account_id)
+
+    cursor = get_db().cursor()
+    cursor.row_factory = Transaction.row_factory
+    return cursor.execute(
+        f'''SELECT {transaction_columns('t')}
+            FROM transactions_fts
+            JOIN transactions t ON t.id = transactions_fts.rowid
+            JOIN accounts a ON a.id = t.account_id
+            WHERE {where}
+            ORDER BY transactions_fts.rank, t.date DESC, t.id DESC
+            LIMIT ?''',
+        (*params, limit)
+    ).fetchall()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк получения списка счетов с балансами
+
+Сравнивает прежний подход (отдельный SUM по транзакциям на каждый счет)
+с чтением из реестра балансов одним запросом из app.accounts.models. Для каждого размера
+выводит число SQL-запросов и время одного вызова get_user_accounts.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.accounts import models
+
+ACCOUNT_COUNTS = [10, 100, 1000]
+TRANSACTIONS_PER_ACCOUNT = 200
+REPEATS = 5
+
+
+def seed_database(path, account_count):
+    """Создает БД с одним пользователем и заданным числом счетов"""
+    conn = sqlite3.connect(path)
+    with open(os.path.join(ROOT, 'database', 'schema.sql'), 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    for script in ('ledger.sql', 'versions.sql'):
+        with open(os.path.join(ROOT, 'database', script), 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+
+    now = datetime.now()
+    conn.execute(
+        'INSERT INTO users (email, password_hash, created_at) VALUES (?, ?, ?)',
+        ('bench@example.com', b'x', now)
+    )
+    user_id = conn.execute('SELECT id FROM users').fetchone()[0]
+
+    rng = random.Random(42)
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, bank_id,
+           initial_balance, archived, created_at) VALUES (?, ?, ?, ?, ?, ?, 0, ?)''',
+        [(user_id, f'Счет {i}', 'checking', 'KZT', 'kaspi', 100000, now)
+         for i in range(account_count)]
+    )
+    account_ids = [row[0] for row in conn.execute('SELECT id FROM accounts')]
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency,
+           description, type, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        ((account_id, '2024-01-01', rng.randint(-50000, 50000), 'KZT',
+          'bench', 'expense', 'confirmed', now)
+         for account_id in account_ids
+         for _ in range(TRANSACTIONS_PER_ACCOUNT))
+    )
+    conn.commit()
+    conn.close()
+    return user_id
+
+
+def legacy_get_user_accounts(conn, user_id):
+    """Прежняя реализация: SUM по транзакциям в цикле по счетам"""
+    accounts = conn.execute(
+        '''SELECT id, name, type, currency, bank_id, initial_balance,
+           archived, created_at FROM accounts
+           WHERE user_id = ? AND archived = 0 ORDER BY created_at DESC''',
+        (user_id,)
+    ).fetchall()
+    result = []
+    for account in accounts:
+        balance_result = conn.execute(
+            "SELECT SUM(amount) as total FROM transactions "
+            "WHERE account_id = ? AND status = 'confirmed'",
+            (account['id'],)
+        ).fetchone()
+        current_balance = account['initial_balance'] + (balance_result['total'] or 0)
+        result.append({
+            'id': account['id'],
+            'name': account['name'],
+            'type': account['type'],
+            'currency': account['currency'],
+            'bank_id': account['bank_id'],
+            'initial_balance': account['initial_balance'],
+            'current_balance': current_balance,
+            'archived': bool(account['archived']),
+            'created_at': account['created_at']
+        })
+    return result
+
+
+def measure(path, call):
+    """Возвращает (число запросов, среднее время в мс) для вызова call(connect)"""
+    statements = []
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.set_trace_callback(statements.append)
+
+    def connect():
+        return conn
+
+    original_get_db = models.get_db
+    models.get_db = connect
+    try:
+        call(connect)
+        statements.clear()
+        call(connect)
+        query_count = len(statements)
+
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            call(connect)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / REPEATS
+    finally:
+        models.get_db = original_get_db
+        conn.close()
+    return query_count, elapsed_ms
+
+
+def main():
+    print("🚀 Бенчмарк балансов счетов")
+    print(f"   Транзакций на счет: {TRANSACTIONS_PER_ACCOUNT}")
+    print("=" * 70)
+    print(f"{'Счетов':>8} | {'Было: запросов':>15} {'мс':>9} | {'Стало: запросов':>16} {'мс':>9}")
+    print("-" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for account_count in ACCOUNT_COUNTS:
+            path = os.path.join(tmp, f'bench_{account_count}.db')
+            user_id = seed_database(path, account_count)
+
+            def legacy(connect):
+                return legacy_get_user_accounts(connect(), user_id)
+
+            def current(connect):
+                # Измеряется запрос, а не попадание в кэш счетов
+                models.accounts_cache.clear()
+                accounts = models.get_user_accounts(user_id)
+                assert len(accounts) == account_count
+                return accounts
+
+            legacy_queries, legacy_ms = measure(path, legacy)
+            current_queries, current_ms = measure(path, current)
+            print(f"{account_count:>8} | {legacy_queries:>15} {legacy_ms:>9.2f} | "
+                  f"{current_queries:>16} {current_ms:>9.2f}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пакетных операций со счетами
+
+Сравнивает архивирование и восстановление N счетов по одному
+(archive_account / restore_account: проверка владельца, UPDATE и commit
+на каждый счет) с одним вызовом apply_account_batch (одна проверка
+владельца и один commit). Для каждого размера выводит число SQL-запросов,
+commit и время на весь набор операций.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.accounts import models
+from app.migrations import migrate
+
+ACCOUNT_COUNTS = [10, 50, 100]
+REPEATS = 5
+
+
+def seed_database(path, account_count):
+    """Создает БД с одним пользователем и заданным числом счетов"""
+    conn = sqlite3.connect(path)
+    migrate(conn, log=lambda message: None)
+    now = datetime.now()
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('bench@example.com', 'x', ?)",
+                 (now,))
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, archived, created_at)
+           VALUES (1, ?, 'checking', 'KZT', 0, 0, ?)''',
+        [(f'Счет {i}', now) for i in range(account_count)]
+    )
+    conn.commit()
+    account_ids = [row[0] for row in conn.execute('SELECT id FROM accounts ORDER BY id')]
+    conn.close()
+    return account_ids
+
+
+def measure(path, call):
+    """Возвращает (запросов, commit, среднее время в мс) для call()"""
+    statements = []
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Настройки соединения как в пуле приложения (app/db.py)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.set_trace_callback(statements.append)
+
+    original_get_db = models.get_db
+    models.get_db = lambda: conn
+    try:
+        call()
+        statements.clear()
+        call()
+        query_count = sum(not s.startswith(('BEGIN', 'COMMIT')) for s in statements)
+        commit_count = sum(s.startswith('COMMIT') for s in statements)
+
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            call()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / REPEATS
+    finally:
+        models.get_db = original_get_db
+        conn.close()
+    return query_count, commit_count, elapsed_ms
+
+
+def main():
+    print("🚀 Бенчмарк пакетных операций со счетами (архивирование + восстановление)")
+    print("=" * 78)
+    print(f"{'Счетов':>7} | {'По одному: запросов':>20} {'commit':>7} {'мс':>8} | "
+          f"{'Пакет: запросов':>16} {'commit':>7} {'мс':>7}")
+    print("-" * 78)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for account_count in ACCOUNT_COUNTS:
+            path = os.path.join(tmp, f'bench_{account_count}.db')
+            account_ids = seed_database(path, account_count)
+
+            def one_by_one():
+                for account_id in account_ids:
+                    assert models.archive_account(account_id, 1)[0]
+                for account_id in account_ids:
+                    assert models.restore_account(account_id, 1)[0]
+
+            def batch():
+                operations = ([{'action': 'archive', 'id': account_id} for account_id in account_ids]
+                              + [{'action': 'restore', 'id': account_id} for account_id in account_ids])
+                applied, results = models.apply_account_batch(1, operations)
+                assert applied and all(result['success'] for result in results)
+
+            single = measure(path, one_by_one)
+            batched = measure(path, batch)
+            print(f"{account_count:>7} | {single[0]:>20} {single[1]:>7} {single[2]:>8.2f} | "
+                  f"{batched[0]:>16} {batched[1]:>7} {batched[2]:>7.2f}")
+
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк аналитики денежного потока
+
+Сравнивает векторный расчет (app.reports.analytics.build_cash_flow) с
+построчным Python-расчетом тех же показателей по sqlite3.Row: месячные
+доходы и расходы, скользящее среднее, изменение к прошлому месяцу, доли
+по счетам и темп расходов. Все транзакции лежат внутри 12-месячного окна.
+Отдельно выводится время загрузки колонок (load_transactions): большая
+часть времени обоих вариантов уходит на чтение строк из SQLite.
+
+    python benchmarks/bench_analytics.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.fx.models import RateSnapshot
+from app.money import minor_units
+from app.reports import analytics
+from app.reports.rollups import ensure_rollup_schema, rebuild_rollups
+from app.accounts.ledger import ensure_ledger_schema
+
+TRANSACTION_COUNTS = [100000, 1000000]
+ACCOUNTS = [('KZT', 1), ('USD', 2), ('EUR', 3)]
+MONTHS = 12
+TODAY = date(2024, 12, 31)
+REPEATS = 3
+
+ROWS_QUERY = '''
+    SELECT t.date, t.amount, t.account_id, t.currency
+    FROM transactions t
+    JOIN accounts a ON a.id = t.account_id
+    WHERE a.user_id = ? AND t.status = 'confirmed' AND t.date >= ? AND t.date <= ?
+'''
+
+
+def seed_database(path, count):
+    """БД с одним пользователем и count транзакциями за последние MONTHS месяцев"""
+    conn = sqlite3.connect(path)
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    ensure_ledger_schema(conn)
+
+    now = datetime.now()
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('b@example.com', 'x', ?)", (now,))
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+           VALUES (1, ?, 'checking', ?, 0, ?)''',
+        [(f'Счет {currency}', currency, now) for currency, _ in ACCOUNTS]
+    )
+
+    rng = random.Random(42)
+    start = date(TODAY.year, 1, 1)
+    span = (TODAY - start).days + 1
+
+    def generate():
+        for _ in range(count):
+            currency, account_id = rng.choice(ACCOUNTS)
+            amount = rng.randint(-50000, 30000)
+            yield (account_id, (start + timedelta(days=rng.randrange(span))).isoformat(),
+                   amount, currency, 'income' if amount > 0 else 'expense', now)
+
+    # Триггеры реестра не нужны для заполнения: итоги считаются пересчетом
+    conn.execute("DROP TRIGGER trg_ledger_insert")
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency, type, status, created_at)
+           VALUES (?, ?, ?, ?, ?, 'confirmed', ?)''', generate()
+    )
+    conn.commit()
+    ensure_rollup_schema(conn)
+    rebuild_rollups(conn)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def python_cash_flow(conn, snapshot, target):
+    """Те же показатели циклом по строкам"""
+    first_month = analytics._month_start(TODAY, MONTHS - 1)
+    first = min(first_month, TODAY - timedelta(days=analytics.BURN_RATE_DAYS - 1))
+    burn_from = TODAY - timedelta(days=analytics.BURN_RATE_DAYS - 1)
+
+    factors = {}
+    monthly_expense = defaultdict(float)
+    monthly_income = defaultdict(float)
+    account_expense = defaultdict(float)
+    burn_total = 0.0
+    for row in conn.execute(ROWS_QUERY, (1, first.isoformat(), TODAY.isoformat())):
+        currency = row['currency']
+        if currency not in factors:
+            factors[currency] = snapshot.convert(1.0, currency, target) / 10 ** minor_units(currency)
+        amount = row['amount'] * factors[currency]
+        day = date.fromisoformat(row['date'])
+        if amount < 0 and day >= burn_from:
+            burn_total -= amount
+        if day < first_month:
+            continue
+        month = row['date'][:7]
+        if amount < 0:
+            monthly_expense[month] -= amount
+            account_expense[row['account_id']] -= amount
+        else:
+            monthly_income[month] += amount
+
+    months = sorted(set(monthly_expense) | set(monthly_income))
+    expenses = [monthly_expense[month] for month in months]
+    moving = [sum(expenses[i - 2:i + 1]) / 3 if i >= 2 else None for i in range(len(expenses))]
+    change = [None] + [(cur - prev) / prev * 100 if prev else None for prev, cur in zip(expenses, expenses[1:])]
+    total = sum(account_expense.values())
+    shares = {account_id: value / total for account_id, value in account_expense.items()}
+    return expenses, moving, change, shares, burn_total / analytics.BURN_RATE_DAYS
+
+
+def measure(func):
+    """Лучшее время одного вызова из REPEATS, мс"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    if analytics.np is None:
+        print("❌ Для бенчмарка нужен numpy")
+        return
+
+    snapshot = RateSnapshot('USD', {'KZT': 470.0, 'EUR': 0.92}, 'bench', datetime.now())
+
+    print("🚀 Бенчмарк аналитики денежного потока")
+    print(f"   Период: {MONTHS} месяцев, счетов: {len(ACCOUNTS)}")
+    print("=" * 70)
+    print(f"{'Транзакций':>12} {'Загрузка, мс':>14} {'NumPy, мс':>12} {'Python, мс':>12} {'Ускорение':>12}")
+    print("-" * 70)
+
+    for count in TRANSACTION_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = seed_database(os.path.join(tmp, 'bench_analytics.db'), count)
+            # build_cash_flow берет соединение через get_db
+            analytics.get_db = lambda: conn
+
+            def vectorized():
+                return analytics.build_cash_flow(1, 'USD', snapshot, MONTHS, TODAY)
+
+            # Результаты обоих расчетов совпадают
+            result = vectorized()
+            expenses, moving, change, shares, burn_rate = python_cash_flow(conn, snapshot, 'USD')
+            assert [m['expense'] for m in result['months']] == [round(value, 2) for value in expenses]
+            assert [m['expense_ma'] for m in result['months']][-1] == round(moving[-1], 2)
+            assert all(abs(m['expense_change_pct'] - value) < 0.01
+                       for m, value in zip(result['months'][1:], change[1:]))
+            assert all(abs(row['share'] - shares[row['account_id']]) < 1e-4 for row in result['by_account'])
+            assert result['burn_rate']['daily'] == round(burn_rate, 2)
+
+            load_ms = measure(lambda: analytics.load_transactions(
+                conn, 1, date(TODAY.year, 1, 1), TODAY, [currency for currency, _ in ACCOUNTS]))
+            numpy_ms = measure(vectorized)
+            python_ms = measure(lambda: python_cash_flow(conn, snapshot, 'USD'))
+            print(f"{count:>12} {load_ms:>14.1f} {numpy_ms:>12.1f} {python_ms:>12.1f} "
+                  f"{python_ms / numpy_ms:>11.1f}x")
+            conn.close()
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
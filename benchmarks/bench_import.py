@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк импорта выписок
+
+Генерирует выписки Kaspi (CSV), Halyk (CSV) и OFX заданного размера и
+импортирует их в пустую временную БД, выводя скорость в строках в секунду.
+Затем каждая выписка импортируется повторно: все строки должны быть
+отсеяны как дубли.
+
+    python benchmarks/bench_import.py --rows 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+MERCHANTS = ['Magnum', 'Small', 'Yandex Taxi', 'Glovo', 'Kaspi Магазин', 'Sulpak',
+             'Технодом', 'Starbucks', 'Wolt', 'Beeline', 'Аптека Биосфера']
+
+
+def generate_rows(count, seed=42):
+    """Случайные операции в хронологическом порядке"""
+    rng = random.Random(seed)
+    day = date(2020, 1, 1)
+    for i in range(count):
+        if i % 40 == 0:
+            day += timedelta(days=1)
+        if rng.random() < 0.1:
+            yield day, round(rng.uniform(10000, 500000), 2), 'Пополнение', 'Перевод'
+        else:
+            yield day, -round(rng.uniform(100, 50000), 2), 'Покупка', rng.choice(MERCHANTS)
+
+
+def format_kzt(amount):
+    sign = '+' if amount > 0 else '-'
+    whole, fraction = f"{abs(amount):.2f}".split('.')
+    grouped = f"{int(whole):,}".replace(',', ' ')
+    return f"{sign} {grouped},{fraction} ₸"
+
+
+def write_kaspi(path, count):
+    # Kaspi отдает выписку от новых операций к старым
+    rows = list(generate_rows(count))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Дата;Сумма;Операция;Детали\n')
+        for day, amount, operation, details in reversed(rows):
+            f.write(f"{day:%d.%m.%y};{format_kzt(amount)};{operation};{details}\n")
+
+
+def write_halyk(path, count):
+    with open(path, 'w', encoding='cp1251') as f:
+        f.write('Дата операции,Дата обработки,Описание,Сумма,Валюта\n')
+        for day, amount, operation, details in generate_rows(count):
+            f.write(f'{day:%d.%m.%Y},{day:%d.%m.%Y},"{operation} {details}",{amount:.2f},KZT\n')
+
+
+def write_ofx(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>\n<CURDEF>KZT\n<BANKTRANLIST>\n')
+        for i, (day, amount, operation, details) in enumerate(generate_rows(count)):
+            f.write(f"<STMTTRN>\n<TRNTYPE>{'CREDIT' if amount > 0 else 'DEBIT'}\n"
+                    f"<DTPOSTED>{day:%Y%m%d}120000\n<TRNAMT>{amount:.2f}\n<FITID>{i}\n"
+                    f"<NAME>{details}\n<MEMO>{operation}\n</STMTTRN>\n")
+        f.write('</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк импорта выписок')
+    parser.add_argument('--rows', type=int, default=200000, help='Строк в каждой выписке')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_PATH'] = os.path.join(tmp, 'bench_import.db')
+
+    from init_db import init_database
+    from app.accounts.models import create_account
+    from app.auth.models import create_user
+    from app.transactions.importer import StatementImporter
+
+    init_database()
+    success, user_id = create_user('bench_import@example.com', 'benchpass123')
+    assert success, user_id
+
+    print("🚀 Бенчмарк импорта выписок")
+    print(f"   Строк в выписке: {args.rows}")
+    print("=" * 72)
+    print(f"{'Файл':<14} {'МБ':>7} {'Строк':>9} {'Секунд':>8} {'Строк/с':>10} {'Повтор, строк/с':>16}")
+    print("-" * 72)
+
+    for name, writer in [('kaspi.csv', write_kaspi), ('halyk.csv', write_halyk),
+                         ('statement.ofx', write_ofx)]:
+        path = os.path.join(tmp, name)
+        writer(path, args.rows)
+
+        success, account_id = create_account(user_id, name, 'checking', 'KZT')
+        assert success, account_id
+        importer = StatementImporter(int(account_id), user_id)
+        summary = importer.import_file(path)
+        assert summary['imported'] == args.rows, summary
+
+        again = importer.import_file(path)
+        assert again['imported'] == 0 and again['duplicates'] == args.rows, again
+        again_speed = int(again['rows_read'] / again['seconds'])
+
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{name:<14} {size_mb:>7.1f} {summary['imported']:>9} "
+              f"{summary['seconds']:>8.2f} {summary['rows_per_second']:>10} {again_speed:>16}")
+
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
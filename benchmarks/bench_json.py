@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сборки JSON-ответа списка счетов
+
+Для пользователя с ACCOUNT_COUNT счетами измеряет GET /accounts/api/accounts
+со списком объектов и с format=columns, на стандартном json и на orjson.
+Кэш счетов сбрасывается перед каждым запросом, поэтому время включает
+запрос к БД, построение строк и сериализацию; отдельно выводится время
+одной сериализации уже построенного ответа и размер тела.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from config import Config
+from app import create_app, serialization
+from app.accounts import models
+from generate_data import generate
+
+ACCOUNT_COUNT = 10000
+TRANSACTION_COUNT = 50000
+REPEATS = 10
+
+
+def create_bench_app(path, provider):
+    saved = Config.JSON_PROVIDER
+    Config.JSON_PROVIDER = provider
+    try:
+        app = create_app()
+    finally:
+        Config.JSON_PROVIDER = saved
+    app.config['DATABASE_PATH'] = path
+    return app
+
+
+def measure(app, user_id, url):
+    """Возвращает (мс на запрос, мс на сериализацию, размер тела в КБ)"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+
+    models.accounts_cache.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    size_kb = len(response.get_data()) / 1024
+
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        # Измеряется построение ответа, а не попадание в кэш счетов
+        models.accounts_cache.clear()
+        client.get(url)
+    request_ms = (time.perf_counter() - started) * 1000 / REPEATS
+
+    payload = response.json
+    with app.test_request_context():
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            app.json.response(payload)
+        encode_ms = (time.perf_counter() - started) * 1000 / REPEATS
+    return request_ms, encode_ms, size_kb
+
+
+def main():
+    providers = ['stdlib'] + (['orjson'] if serialization.orjson is not None else [])
+    print("🚀 Бенчмарк JSON-ответа списка счетов")
+    print(f"   Счетов: {ACCOUNT_COUNT}, транзакций: {TRANSACTION_COUNT}, повторов: {REPEATS}")
+    if serialization.orjson is None:
+        print("   orjson не установлен, измеряется только стандартный json")
+    print("=" * 70)
+    print(f"{'Провайдер':>10} {'Формат':>9} | {'Запрос, мс':>11} {'JSON, мс':>9} {'Размер, КБ':>11}")
+    print("-" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench_json.db')
+        generate(path, 1, ACCOUNT_COUNT, TRANSACTION_COUNT, log=lambda message: None)
+        conn = sqlite3.connect(path)
+        user_id = conn.execute('SELECT id FROM users').fetchone()[0]
+        conn.close()
+
+        for provider in providers:
+            app = create_bench_app(path, provider)
+            for layout, url in (('objects', '/accounts/api/accounts'),
+                                ('columns', '/accounts/api/accounts?format=columns')):
+                request_ms, encode_ms, size_kb = measure(app, user_id, url)
+                print(f"{provider:>10} {layout:>9} | {request_ms:>11.2f} {encode_ms:>9.2f} {size_kb:>11.1f}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
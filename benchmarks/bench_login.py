@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный бенчмарк входа: bcrypt в потоке запроса против пула хеширования
+
+Несколько потоков непрерывно вызывают /auth/api/login, параллельно другие
+потоки опрашивают дешевый /accounts/api/accounts. Для каждого режима
+выводятся p50/p99 обоих запросов и число быстрых отказов 503.
+
+    python benchmarks/bench_login.py --rounds 10 --login-threads 16 --duration 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+EMAIL = 'bench_login@example.com'
+PASSWORD = 'benchpass123'
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_mode(create_app, workers, args):
+    """Прогон нагрузки для одного режима, возвращает статистику"""
+    from config import Config
+    Config.PASSWORD_HASH_WORKERS = workers
+    Config.PASSWORD_HASH_QUEUE_DEPTH = args.queue_depth
+    app = create_app()
+
+    # Сессия для дешевых запросов
+    session_client = app.test_client()
+    response = session_client.post('/auth/api/login', json={'email': EMAIL, 'password': PASSWORD})
+    assert response.json['success'], response.json
+    cookie = session_client.get_cookie('session')
+
+    stats = {'login': [], 'accounts': [], 'rejected': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def login_worker():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/auth/api/login', json={'email': EMAIL, 'password': PASSWORD})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if response.status_code == 503:
+                    stats['rejected'] += 1
+                else:
+                    stats['login'].append(elapsed)
+
+    def accounts_worker():
+        client = app.test_client()
+        client.set_cookie('session', cookie.value)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get('/accounts/api/accounts')
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                stats['accounts'].append(elapsed)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=accounts_worker) for _ in range(args.api_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    app.extensions['password_hasher'].shutdown()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк входа под нагрузкой')
+    parser.add_argument('--rounds', type=int, default=10, help='Стоимость bcrypt')
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--api-threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2, help='Потоков в пуле хеширования')
+    parser.add_argument('--queue-depth', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='Длительность прогона, секунд')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_PATH'] = os.path.join(tmp, 'bench_login.db')
+    os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+
+    from init_db import init_database
+    from app import create_app
+    from app.auth.models import create_user
+
+    init_database()
+    success, result = create_user(EMAIL, PASSWORD)
+    assert success, result
+
+    print("🚀 Бенчмарк входа под нагрузкой")
+    print(f"   bcrypt rounds={args.rounds}, логин-потоков={args.login_threads}, "
+          f"API-потоков={args.api_threads}, {args.duration}s на режим")
+    print("=" * 78)
+    print(f"{'Режим':<22} | {'login p50':>9} {'p99':>8} {'ok':>5} {'503':>5} | "
+          f"{'accounts p50':>12} {'p99':>8}")
+    print("-" * 78)
+
+    modes = [('в потоке запроса', 0), (f'пул ({args.workers} потока)', args.workers)]
+    for title, workers in modes:
+        stats = run_mode(create_app, workers, args)
+        print(f"{title:<22} | {percentile(stats['login'], 50):>9.1f} "
+              f"{percentile(stats['login'], 99):>8.1f} {len(stats['login']):>5} "
+              f"{stats['rejected']:>5} | {percentile(stats['accounts'], 50):>12.1f} "
+              f"{percentile(stats['accounts'], 99):>8.1f}")
+
+    print("=" * 78)
+    print("Время в миллисекундах")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк записей моделей против словарей
+
+Сравнивает прежний подход (sqlite3.Row и словарь, скопированный из него
+поле за полем, суммы через from_minor) с записями Account и Transaction
+из app/records.py, которые row_factory строит прямо из кортежа строки.
+Для каждой таблицы выводит лучшее из REPEATS время построения списка и
+занятую им память (tracemalloc), пересчитанные на 1M строк. Строки
+значений (даты, описания) одинаковы в обоих подходах и входят в память.
+"""
+
+import argparse
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.accounts.models import Account, ACCOUNTS_WITH_BALANCE_QUERY
+from app.money import from_minor
+from app.transactions.models import Transaction, transaction_columns
+from generate_data import generate
+
+MILLION = 1000000
+REPEATS = 3
+
+LEGACY_ACCOUNTS_QUERY = '''
+    SELECT a.id, a.name, a.type, a.currency, a.bank_id, a.initial_balance,
+           a.archived, a.created_at,
+           a.initial_balance + COALESCE(b.balance, 0) AS current_balance
+    FROM accounts a
+    LEFT JOIN account_balances b ON b.account_id = a.id
+    ORDER BY a.created_at DESC
+'''
+
+LEGACY_TRANSACTIONS_QUERY = '''
+    SELECT id, account_id, date, amount, currency, description, type, status, created_at
+    FROM transactions
+'''
+
+
+def legacy_account(account):
+    """Прежний account_row_to_dict"""
+    currency = account['currency']
+    return {
+        'id': account['id'],
+        'name': account['name'],
+        'type': account['type'],
+        'currency': currency,
+        'bank_id': account['bank_id'],
+        'initial_balance': from_minor(account['initial_balance'], currency),
+        'current_balance': from_minor(account['current_balance'], currency),
+        'archived': bool(account['archived']),
+        'created_at': account['created_at']
+    }
+
+
+def legacy_transaction(row):
+    """Прежний transaction_row_to_dict"""
+    return {
+        'id': row['id'],
+        'account_id': row['account_id'],
+        'date': row['date'],
+        'amount': from_minor(row['amount'], row['currency']),
+        'currency': row['currency'],
+        'description': row['description'],
+        'type': row['type'],
+        'status': row['status'],
+        'created_at': row['created_at']
+    }
+
+
+def load_dicts(conn, query, convert):
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return [convert(row) for row in cursor.execute(query)]
+
+
+def load_records(conn, query, record_type):
+    cursor = conn.cursor()
+    cursor.row_factory = record_type.row_factory
+    return cursor.execute(query).fetchall()
+
+
+def measure(load):
+    """Возвращает (число строк, секунды построения, байт на строку)"""
+    # Лучшее из REPEATS: построение миллиона объектов чувствительно к шуму
+    elapsed = None
+    for _ in range(REPEATS):
+        gc.collect()
+        started = time.perf_counter()
+        rows = load()
+        duration = time.perf_counter() - started
+        elapsed = duration if elapsed is None else min(elapsed, duration)
+        count = len(rows)
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return count, elapsed, size / max(count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Записи моделей против словарей: память и время')
+    parser.add_argument('--transactions', type=int, default=MILLION, help='Транзакций в БД')
+    parser.add_argument('--accounts', type=int, default=100000, help='Счетов в БД')
+    args = parser.parse_args()
+
+    print("🚀 Бенчмарк записей моделей")
+    print(f"   Счетов: {args.accounts}, транзакций: {args.transactions}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench_records.db')
+        generate(path, max(1, args.accounts // 10), args.accounts, args.transactions,
+                 log=lambda message: None)
+        conn = sqlite3.connect(path)
+
+        cases = [
+            ('accounts', 'dict', lambda: load_dicts(conn, LEGACY_ACCOUNTS_QUERY, legacy_account)),
+            ('accounts', 'Account', lambda: load_records(
+                conn, ACCOUNTS_WITH_BALANCE_QUERY.format(where='1'), Account)),
+            ('transactions', 'dict', lambda: load_dicts(conn, LEGACY_TRANSACTIONS_QUERY, legacy_transaction)),
+            ('transactions', 'Transaction', lambda: load_records(
+                conn, f"SELECT {transaction_columns('transactions')} FROM transactions", Transaction)),
+        ]
+
+        print("=" * 70)
+        print(f"{'Таблица':>13} {'Строка':>12} | {'с на 1M':>8} {'Байт/строку':>12} {'МБ на 1M':>9}")
+        print("-" * 70)
+        for table, kind, load in cases:
+            count, elapsed, per_row = measure(load)
+            print(f"{table:>13} {kind:>12} | {elapsed * MILLION / count:>8.2f} "
+                  f"{per_row:>12.0f} {per_row * MILLION / 2 ** 20:>9.0f}")
+        print("=" * 70)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк помесячного отчета
+
+Сравнивает отчет по месячным итогам (app.reports.models.build_report) с
+прежним подходом — GROUP BY по всем транзакциям пользователя — на истории
+в несколько лет. Для каждого размера выводит время одного отчета.
+
+    python benchmarks/bench_reports.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.fx.models import RateSnapshot
+from app.reports import models
+from app.reports.rollups import ensure_rollup_schema, rebuild_rollups
+from app.accounts.ledger import ensure_ledger_schema
+
+TRANSACTION_COUNTS = [10000, 100000, 1000000]
+ACCOUNTS = [('KZT', 1), ('USD', 2), ('EUR', 3)]
+YEARS = 10
+REPEATS = 5
+
+GROUP_BY_QUERY = '''
+    SELECT substr(t.date, 1, 7) AS month, t.type, t.currency,
+           SUM(t.amount) AS total, COUNT(*) AS transaction_count
+    FROM transactions t
+    JOIN accounts a ON a.id = t.account_id
+    WHERE a.user_id = ? AND t.status = 'confirmed'
+    GROUP BY month, t.type, t.currency
+'''
+
+
+def seed_database(path, count):
+    """БД с одним пользователем и count транзакциями за YEARS лет"""
+    conn = sqlite3.connect(path)
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    ensure_ledger_schema(conn)
+
+    now = datetime.now()
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('b@example.com', 'x', ?)", (now,))
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+           VALUES (1, ?, 'checking', ?, 0, ?)''',
+        [(f'Счет {currency}', currency, now) for currency, _ in ACCOUNTS]
+    )
+
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+
+    def generate():
+        for _ in range(count):
+            currency, account_id = rng.choice(ACCOUNTS)
+            amount = rng.randint(-50000, 30000)
+            yield (account_id, (start + timedelta(days=rng.randrange(365 * YEARS))).isoformat(),
+                   amount, currency, 'income' if amount > 0 else 'expense', now)
+
+    # Триггеры реестра не нужны для заполнения: итоги считаются пересчетом
+    conn.execute("DROP TRIGGER trg_ledger_insert")
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency, type, status, created_at)
+           VALUES (?, ?, ?, ?, ?, 'confirmed', ?)''', generate()
+    )
+    conn.commit()
+    ensure_rollup_schema(conn)
+    rebuild_rollups(conn)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def measure(func):
+    """Лучшее время одного вызова из REPEATS, мс"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    snapshot = RateSnapshot('USD', {'KZT': 470.0, 'EUR': 0.92}, 'bench', datetime.now())
+
+    print("🚀 Бенчмарк помесячного отчета")
+    print(f"   История: {YEARS} лет, счетов: {len(ACCOUNTS)}")
+    print("=" * 56)
+    print(f"{'Транзакций':>12} {'Строк итогов':>14} {'Итоги, мс':>12} {'GROUP BY, мс':>14}")
+    print("-" * 56)
+
+    for count in TRANSACTION_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = seed_database(os.path.join(tmp, 'bench_reports.db'), count)
+            # build_report берет соединение через get_db
+            models.get_db = lambda: conn
+
+            report = models.build_report(1, 'month', 'USD', snapshot)
+            assert len(report['rows']) == YEARS * 12
+            rollup_rows = conn.execute('SELECT COUNT(*) FROM monthly_rollups').fetchone()[0]
+
+            rollup_ms = measure(lambda: models.build_report(1, 'month', 'USD', snapshot))
+            group_by_ms = measure(lambda: conn.execute(GROUP_BY_QUERY, (1,)).fetchall())
+            print(f"{count:>12} {rollup_rows:>14} {rollup_ms:>12.2f} {group_by_ms:>14.2f}")
+            conn.close()
+
+    print("=" * 56)
+
+
+if __name__ == '__main__':
+    main()
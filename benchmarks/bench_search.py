@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк поиска транзакций по описанию
+
+Заполняет временную БД одним пользователем с миллионом транзакций и
+сравнивает поиск через FTS5 (app.transactions.search.search_transactions)
+с LIKE '%...%' по тем же запросам: частое слово, два слова, префикс и
+редкое слово. LIKE в SQLite не различает регистр только для латиницы,
+поэтому кириллические образцы для него записаны с заглавной буквы.
+
+LIKE с ORDER BY date LIMIT на частом слове останавливается, набрав LIMIT
+строк в порядке индекса, зато на редком слове или при отсутствии
+совпадений просматривает всю историю. FTS5 находит совпадения по индексу
+и ранжирует их (bm25), поэтому его время зависит от числа совпадений, а
+не от размера истории.
+
+    python benchmarks/bench_search.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.transactions import search
+
+MERCHANTS = ['Magnum', 'Small', 'Yandex Taxi', 'Yandex Eda', 'Glovo', 'Kaspi Магазин', 'Sulpak',
+             'Технодом', 'Starbucks', 'Wolt', 'Beeline', 'Аптека Биосфера', 'Air Astana',
+             'Choco Travel', 'Метро', 'Шашлычная Дастархан']
+CITIES = ['Алматы', 'Астана', 'Шымкент', 'Караганда', 'Актобе']
+# (запрос, образец для LIKE)
+QUERIES = [('magnum', 'magnum'), ('yandex taxi', 'yandex taxi'), ('ya', 'ya'),
+           ('дастархан', 'Дастархан'), ('перевод 4242', 'Перевод%4242'),
+           ('кофейня', 'Кофейня')]
+LIMIT = 20
+REPEATS = 5
+
+LIKE_QUERY = '''
+    SELECT t.id FROM transactions t JOIN accounts a ON a.id = t.account_id
+    WHERE a.user_id = ? AND t.description LIKE ?
+    ORDER BY t.date DESC, t.id DESC
+    LIMIT ?
+'''
+
+
+def seed_database(path, rows):
+    """БД с одним пользователем, тремя счетами и rows транзакциями"""
+    conn = sqlite3.connect(path)
+    with open(os.path.join(ROOT, 'database', 'schema.sql'), 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('b@example.com', 'x', '2024')")
+    for number in range(3):
+        conn.execute(
+            '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+               VALUES (1, ?, 'checking', 'KZT', 0, '2024')''', (f'Счет {number}',)
+        )
+
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+
+    def generate():
+        for _ in range(rows):
+            if rng.random() < 0.1:
+                description = f'Перевод {rng.randrange(10000)}'
+            else:
+                description = f'Покупка: {rng.choice(MERCHANTS)} {rng.choice(CITIES)}'
+            yield (rng.randrange(1, 4), (start + timedelta(days=rng.randrange(3650))).isoformat(),
+                   -rng.randint(10000, 5000000), description)
+
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency, description, type, created_at)
+           VALUES (?, ?, ?, 'KZT', ?, 'expense', '2024')''', generate()
+    )
+    conn.commit()
+
+    # Индекс и триггеры создаются после заполнения: ensure_search_index
+    # заполняет индекс одним проходом, как для существующей БД
+    started = time.perf_counter()
+    search.ensure_search_index(conn)
+    print(f"   Построение индекса: {time.perf_counter() - started:.1f} с")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def measure(func):
+    """Лучшее время одного вызова из REPEATS, мс"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк поиска транзакций')
+    parser.add_argument('--rows', type=int, default=1000000, help='Число транзакций')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("🚀 Бенчмарк поиска транзакций")
+        print(f"   Транзакций: {args.rows}")
+        conn = seed_database(os.path.join(tmp, 'bench_search.db'), args.rows)
+        # search_transactions берет соединение через get_db
+        search.get_db = lambda: conn
+
+        print("=" * 60)
+        print(f"{'Запрос':<16} {'Найдено':>9} {'FTS5, мс':>10} {'LIKE, мс':>10} {'Ускорение':>10}")
+        print("-" * 60)
+        for text, pattern in QUERIES:
+            fts_ms, found = measure(lambda: search.search_transactions(1, text, limit=LIMIT))
+            like_ms, _ = measure(lambda: conn.execute(LIKE_QUERY, (1, f'%{pattern}%', LIMIT)).fetchall())
+            total = conn.execute('SELECT COUNT(*) FROM transactions_fts WHERE transactions_fts MATCH ?',
+                                 (search.build_match_query(text),)).fetchone()[0]
+            assert found or not total
+            print(f"{text:<16} {total:>9} {fts_ms:>10.1f} {like_ms:>10.1f} {like_ms / fts_ms:>9.2f}x")
+        print("=" * 60)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк постраничного списка транзакций
+
+Сравнивает страницу, полученную курсором (app.transactions.models.list_transactions),
+с той же страницей через LIMIT/OFFSET на разной глубине списка. Курсор
+читает диапазон составного индекса, поэтому время не зависит от номера
+страницы; OFFSET пропускает все предыдущие строки.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.transactions import models
+
+ACCOUNT_COUNT = 3
+TRANSACTIONS_PER_ACCOUNT = 300000
+PAGE_SIZE = 50
+DEPTHS = [0, 1000, 10000, 100000, 500000]
+REPEATS = 5
+
+OFFSET_QUERY = '''
+    SELECT t.id, t.account_id, t.date, t.amount, t.currency, t.description,
+           t.type, t.status, t.created_at
+    FROM transactions t JOIN accounts a ON a.id = t.account_id
+    WHERE a.user_id = ?
+    ORDER BY t.date DESC, t.id DESC
+    LIMIT ? OFFSET ?
+'''
+
+
+def seed_database(path):
+    """Создает БД с одним пользователем и ACCOUNT_COUNT счетами"""
+    conn = sqlite3.connect(path)
+    with open(os.path.join(ROOT, 'database', 'schema.sql'), 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    now = datetime.now()
+    conn.execute('INSERT INTO users (email, password_hash, created_at) VALUES (?, ?, ?)',
+                 ('bench@example.com', b'x', now))
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, archived, created_at)
+           VALUES (1, ?, 'checking', 'KZT', 0, 0, ?)''',
+        [(f'Счет {i}', now) for i in range(ACCOUNT_COUNT)]
+    )
+
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    for account_id in range(1, ACCOUNT_COUNT + 1):
+        conn.executemany(
+            '''INSERT INTO transactions (account_id, date, amount, currency, description,
+               type, status, created_at) VALUES (?, ?, ?, 'KZT', 'bench', ?, 'confirmed', ?)''',
+            ((account_id, (start + timedelta(days=rng.randrange(3650))).isoformat(),
+              amount, 'income' if amount > 0 else 'expense', now)
+             for amount in (rng.randint(-50000, 50000)
+                            for _ in range(TRANSACTIONS_PER_ACCOUNT)))
+        )
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def measure(func):
+    """Лучшее время одного вызова из REPEATS, мс"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def cursor_at(conn, depth):
+    """Курсор, указывающий на строку с номером depth"""
+    if not depth:
+        return None
+    row = conn.execute(OFFSET_QUERY, (1, 1, depth - 1)).fetchone()
+    return models.encode_cursor(row['date'], row['id'])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Заполнение: {ACCOUNT_COUNT} счета по {TRANSACTIONS_PER_ACCOUNT} транзакций...")
+        conn = seed_database(os.path.join(tmp, 'bench.db'))
+        # list_transactions берет соединение через get_db
+        models.get_db = lambda: conn
+
+        print(f"{'Глубина':>10} {'Курсор, мс':>12} {'OFFSET, мс':>12}")
+        for depth in DEPTHS:
+            cursor = cursor_at(conn, depth)
+            page, _ = models.list_transactions(1, cursor=cursor, limit=PAGE_SIZE)
+            expected = [dict(row) for row in conn.execute(OFFSET_QUERY, (1, PAGE_SIZE, depth))]
+            assert [t.id for t in page] == [t['id'] for t in expected]
+
+            keyset = measure(lambda: models.list_transactions(1, cursor=cursor, limit=PAGE_SIZE))
+            offset = measure(lambda: conn.execute(OFFSET_QUERY, (1, PAGE_SIZE, depth)).fetchall())
+            print(f"{depth:>10} {keyset:>12.2f} {offset:>12.2f}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
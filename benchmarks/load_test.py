@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный прогон всех эндпоинтов приложения с отчетом в JSON
+
+Заполняет временную БД синтетическими данными generate_data.py
+(одинаковый seed — одинаковые данные), затем проходит два
+режима:
+
+* client — каждый эндпоинт (auth, main, accounts, fx, transactions, jobs,
+  reports, статика) по --requests раз через Flask test client в одном
+  потоке: время обработки без сети;
+* http — --threads потоков с keep-alive соединениями к threaded-серверу
+  werkzeug в течение --duration секунд, каждый поток под своим
+  пользователем выполняет взвешенную смесь запросов (в основном чтение).
+
+Для каждого эндпоинта записываются число запросов, коды ответов,
+запросов в секунду, среднее и p50/p95/p99 времени ответа и число
+SQL-запросов на запрос (trace callback соединений пула). Отчет можно
+сравнить с отчетом другого коммита: --compare выводит изменения и
+помечает замедления больше --threshold процентов.
+
+    python benchmarks/load_test.py --output before.json
+    git checkout feature
+    python benchmarks/load_test.py --output after.json --compare before.json
+"""
+
+import argparse
+import http.client
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
+
+# Добавляем корневую директорию в путь
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+PASSWORD = 'loadtest123'
+SQL_HEADER = 'X-SQL-Queries'
+SEARCH_WORDS = ['magnum', 'yandex', 'зарп', 'starbucks', 'перевод']
+STATEMENT_CSV = 'date,amount,description\n2024-03-01,-1500.00,Magnum Алматы\n2024-03-02,250000,Зарплата\n'
+# 1x1 PNG для очереди распознавания чеков
+RECEIPT_PNG = bytes.fromhex('89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+                            '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+# ---------------------------------------------------------------- данные
+
+def seed_database(path, users, accounts, transactions, seed):
+    """Синтетическая БД (generate_data.py): users пользователей, в среднем по
+    accounts счетов и transactions транзакций на пользователя, и по одной
+    задаче импорта в очереди. Возвращает список пользователей
+    {'email', 'user_id', 'account_ids', 'job_id'}.
+    """
+    from generate_data import generate
+
+    generate(path, users, users * accounts, users * transactions, seed=seed, password=PASSWORD,
+             log=lambda message: None)
+    conn = sqlite3.connect(path)
+    account_ids = defaultdict(list)
+    for account_id, user_id in conn.execute('SELECT id, user_id FROM accounts ORDER BY id'):
+        account_ids[user_id].append(account_id)
+    now = datetime.now().isoformat(sep=' ')
+    seeded = []
+    for user_id, email in conn.execute('SELECT id, email FROM users ORDER BY id').fetchall():
+        job_id = conn.execute(
+            '''INSERT INTO jobs (user_id, kind, payload, run_after, created_at)
+               VALUES (?, 'import_statement', '{}', ?, ?)''', (user_id, now, now)
+        ).lastrowid
+        seeded.append({'email': email, 'user_id': user_id, 'account_ids': account_ids[user_id], 'job_id': job_id})
+    conn.commit()
+    conn.close()
+    return seeded
+
+
+# ---------------------------------------------------------------- сценарии
+
+_emails = itertools.count()
+
+
+def _request(method, path, **options):
+    return dict(options, method=method, path=path)
+
+
+def _account(user, rng):
+    return rng.choice(user['account_ids'])
+
+
+def _statement(user, rng):
+    return _request('POST', '/transactions/api/import', data={
+        'account_id': str(_account(user, rng)),
+        'file': (io.BytesIO(STATEMENT_CSV.encode('utf-8')), 'statement.csv')
+    })
+
+
+class Scenario:
+    """Запрос к одному эндпоинту.
+
+    build(user, rng) возвращает метод, путь и тело запроса; weight — доля
+    в смеси режима http (0 — только режим client: запросы с файлами и
+    выход из сессии); relogin — после запроса сессию нужно восстановить.
+    """
+
+    def __init__(self, endpoint, build, weight=0, name=None, relogin=False):
+        self.endpoint = endpoint
+        self.name = name or endpoint
+        self.build = build
+        self.weight = weight
+        self.relogin = relogin
+
+
+def build_scenarios(static_urls):
+    """Сценарии по всем эндпоинтам; static_urls — URL статики с хешем"""
+    scenarios = [
+        Scenario('auth.login_page', lambda u, r: _request('GET', '/auth/login'), 1),
+        Scenario('auth.register_page', lambda u, r: _request('GET', '/auth/register'), 1),
+        Scenario('auth.api_login', lambda u, r: _request(
+            'POST', '/auth/api/login', json={'email': u['email'], 'password': PASSWORD}), 1),
+        Scenario('auth.api_register', lambda u, r: _request('POST', '/auth/api/register', json={
+            'email': f'new{os.getpid()}_{next(_emails)}@example.com', 'password': PASSWORD})),
+        Scenario('auth.api_logout', lambda u, r: _request('POST', '/auth/api/logout'), relogin=True),
+        Scenario('main.index', lambda u, r: _request('GET', '/'), 2),
+        Scenario('main.dashboard', lambda u, r: _request('GET', '/dashboard'), 4),
+        Scenario('main.api_dashboard_summary', lambda u, r: _request(
+            'GET', '/api/dashboard/summary?currency=' + r.choice(['USD', 'KZT'])), 8),
+        Scenario('main.api_dashboard_analytics', lambda u, r: _request(
+            'GET', '/api/dashboard/analytics?currency=USD&months=12'), 4),
+        Scenario('accounts.accounts_list', lambda u, r: _request('GET', '/accounts/'), 3),
+        Scenario('accounts.create_account_page', lambda u, r: _request('GET', '/accounts/create'), 1),
+        Scenario('accounts.api_get_accounts', lambda u, r: _request('GET', '/accounts/api/accounts'), 12),
+        Scenario('accounts.api_create_account', lambda u, r: _request('POST', '/accounts/api/accounts', json={
+            'name': 'Нагрузочный', 'type': 'cash', 'currency': 'KZT', 'initial_balance': '100.50'}), 1),
+        Scenario('accounts.api_get_account', lambda u, r: _request(
+            'GET', f'/accounts/api/accounts/{_account(u, r)}'), 4),
+        Scenario('accounts.api_get_account_balances', lambda u, r: _request(
+            'GET', f'/accounts/api/accounts/{_account(u, r)}/balances'
+                   f'?from={(date.today() - timedelta(days=90)).isoformat()}'), 4),
+        Scenario('accounts.api_update_account', lambda u, r: _request(
+            'PUT', f'/accounts/api/accounts/{_account(u, r)}', json={'name': r.choice(['Основной', 'Текущий'])}), 1),
+        Scenario('accounts.api_archive_account', lambda u, r: _request(
+            'POST', f"/accounts/api/accounts/{u['account_ids'][-1]}/archive"), 1),
+        Scenario('accounts.api_restore_account', lambda u, r: _request(
+            'POST', f"/accounts/api/accounts/{u['account_ids'][-1]}/restore"), 1),
+        Scenario('accounts.api_account_batch', lambda u, r: _request(
+            'POST', '/accounts/api/accounts/batch', json={'operations': [
+                {'action': 'archive', 'id': u['account_ids'][-1]},
+                {'action': 'restore', 'id': u['account_ids'][-1]}]}), 1),
+        Scenario('accounts.api_get_banks', lambda u, r: _request('GET', '/accounts/api/data/banks'), 2),
+        Scenario('accounts.api_get_currencies', lambda u, r: _request('GET', '/accounts/api/data/currencies'), 2),
+        Scenario('fx.api_get_rates', lambda u, r: _request('GET', '/fx/api/rates'), 2),
+        Scenario('fx.api_convert_balances', lambda u, r: _request('GET', '/fx/api/balances?currency=EUR'), 3),
+        Scenario('transactions.api_get_transactions', lambda u, r: _request(
+            'GET', '/transactions/api/transactions?limit=50'), 8),
+        Scenario('transactions.api_get_transactions', lambda u, r: _request(
+            'GET', f'/transactions/api/transactions?account_id={_account(u, r)}&type=expense&limit=50'),
+            4, name='transactions.api_get_transactions[filtered]'),
+        Scenario('transactions.api_search_transactions', lambda u, r: _request(
+            'GET', '/transactions/api/search?q=' + quote(r.choice(SEARCH_WORDS))), 4),
+        Scenario('transactions.api_import_statement', _statement),
+        Scenario('transactions.api_upload_receipt', lambda u, r: _request(
+            'POST', '/transactions/api/receipts', data={'file': (io.BytesIO(RECEIPT_PNG), 'receipt.png')})),
+        Scenario('jobs.api_get_jobs', lambda u, r: _request('GET', '/jobs/api/jobs'), 2),
+        Scenario('jobs.api_get_job', lambda u, r: _request('GET', f"/jobs/api/jobs/{u['job_id']}"), 2),
+        Scenario('reports.api_monthly_report', lambda u, r: _request('GET', '/reports/api/monthly?currency=USD'), 3),
+        Scenario('reports.api_accounts_report', lambda u, r: _request('GET', '/reports/api/accounts?currency=KZT'), 2),
+        Scenario('reports.api_types_report', lambda u, r: _request('GET', '/reports/api/types?currency=USD'), 2),
+        Scenario('service_worker', lambda u, r: _request('GET', '/sw.js'), 1),
+    ]
+    for filename, url in static_urls.items():
+        scenarios.append(Scenario('static', lambda u, r, url=url: _request(
+            'GET', url, headers={'Accept-Encoding': 'gzip, br'}), 2, name=f'static[{filename}]'))
+    return scenarios
+
+
+# ---------------------------------------------------------------- приложение
+
+def create_instrumented_app(upload_folder):
+    """Приложение, отдающее число SQL-запросов запроса в заголовке X-SQL-Queries"""
+    from flask import g, has_request_context
+    from app import create_app
+    from app.db import ConnectionPool
+
+    connect = ConnectionPool.connect
+
+    def traced_connect(pool):
+        conn = connect(pool)
+
+        def count(statement):
+            if has_request_context() and not statement.startswith('--'):
+                g.sql_queries = g.get('sql_queries', 0) + 1
+
+        conn.set_trace_callback(count)
+        return conn
+
+    ConnectionPool.connect = traced_connect
+    app = create_app()
+    app.config['UPLOAD_FOLDER'] = upload_folder
+
+    @app.after_request
+    def add_query_count(response):
+        response.headers[SQL_HEADER] = str(g.get('sql_queries', 0))
+        return response
+
+    return app
+
+
+class Recorder:
+    """Времена, коды ответов и SQL-запросы по сценариям"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.queries = defaultdict(int)
+        self.errors = Counter()
+        # Время прогона сценария, если сценарии выполнялись по очереди
+        self.durations = {}
+
+    def add(self, name, elapsed_ms, status, queries):
+        self.latencies[name].append(elapsed_ms)
+        self.statuses[name][status] += 1
+        self.queries[name] += queries
+
+    def merge(self, other):
+        for name, values in other.latencies.items():
+            self.latencies[name].extend(values)
+            self.statuses[name].update(other.statuses[name])
+            self.queries[name] += other.queries[name]
+        self.errors.update(other.errors)
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for name in sorted(self.latencies):
+            values = self.latencies[name]
+            endpoints[name] = {
+                'requests': len(values),
+                'errors': sum(count for status, count in self.statuses[name].items() if status >= 500)
+                          + self.errors[name],
+                'statuses': {str(status): count for status, count in sorted(self.statuses[name].items())},
+                'rps': round(len(values) / self.durations.get(name, elapsed), 1),
+                'mean_ms': round(sum(values) / len(values), 3),
+                'p50_ms': round(percentile(values, 50), 3),
+                'p95_ms': round(percentile(values, 95), 3),
+                'p99_ms': round(percentile(values, 99), 3),
+                'sql_per_request': round(self.queries[name] / len(values), 2)
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            'duration_s': round(elapsed, 2),
+            'requests': total,
+            'rps': round(total / elapsed, 1),
+            'endpoints': endpoints
+        }
+
+
+def run_client(app, scenarios, user, requests, seed):
+    """Режим client: каждый сценарий requests раз подряд через test client"""
+    rng = random.Random(seed)
+    client = app.test_client()
+    login = {'email': user['email'], 'password': PASSWORD}
+    assert client.post('/auth/api/login', json=login).json['success']
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    for scenario in scenarios:
+        scenario_started = None
+        # Первый запрос прогревает шаблоны, справочники и кэши и не учитывается
+        for attempt in range(requests + 1):
+            if attempt == 1:
+                scenario_started = time.perf_counter()
+            options = scenario.build(user, rng)
+            request_started = time.perf_counter()
+            response = client.open(options.pop('path'), **options)
+            elapsed_ms = (time.perf_counter() - request_started) * 1000
+            if attempt:
+                recorder.add(scenario.name, elapsed_ms, response.status_code,
+                             int(response.headers.get(SQL_HEADER, 0)))
+            if scenario.relogin:
+                client.post('/auth/api/login', json=login)
+        recorder.durations[scenario.name] = time.perf_counter() - scenario_started
+    return recorder.summary(time.perf_counter() - started)
+
+
+def _encode(options, cookie):
+    """Тело и заголовки запроса для http.client (только JSON и пустые тела)"""
+    headers = dict(options.get('headers') or {}, Cookie=cookie)
+    body = None
+    if 'json' in options:
+        body = json.dumps(options['json']).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    return options['method'], options['path'], body, headers
+
+
+def _http_login(conn, user):
+    body = json.dumps({'email': user['email'], 'password': PASSWORD})
+    conn.request('POST', '/auth/api/login', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 200, response.status
+    return response.getheader('Set-Cookie').split(';')[0]
+
+
+def run_http(app, scenarios, users, threads, duration, seed):
+    """Режим http: threads потоков с keep-alive соединениями в течение duration секунд"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log(self, type, message, *args):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    mix = [scenario for scenario in scenarios if scenario.weight]
+    weights = [scenario.weight for scenario in mix]
+    recorders = [Recorder() for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        user = users[index % len(users)]
+        recorder = recorders[index]
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+        cookie = _http_login(conn, user)
+        barrier.wait()
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(mix, weights)[0]
+            method, path, body, headers = _encode(scenario.build(user, rng), cookie)
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                recorder.errors[scenario.name] += 1
+                conn.close()
+                continue
+            recorder.add(scenario.name, (time.perf_counter() - started) * 1000, response.status,
+                         int(response.getheader(SQL_HEADER) or 0))
+            if scenario.endpoint == 'auth.api_login':
+                cookie = response.getheader('Set-Cookie').split(';')[0]
+        conn.close()
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    deadline = float('inf')
+    for thread in workers:
+        thread.start()
+    # Отсчет начинается, когда все потоки вошли
+    deadline = time.perf_counter() + duration
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    total = Recorder()
+    for recorder in recorders:
+        total.merge(recorder)
+    return total.summary(elapsed)
+
+
+# ---------------------------------------------------------------- отчет
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_mode(title, result):
+    print(f"\n{title}: {result['requests']} запросов за {result['duration_s']} с, {result['rps']} req/s")
+    print(f"{'Эндпоинт':<52} {'N':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'SQL':>6} {'5xx':>4}")
+    print("-" * 106)
+    for name, stats in result['endpoints'].items():
+        print(f"{name:<52} {stats['requests']:>6} {stats['rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['sql_per_request']:>6.1f} "
+              f"{stats['errors']:>4}")
+
+
+def compare_reports(old, new, threshold):
+    """Изменение p50/p95 и SQL-запросов относительно прошлого отчета.
+    Возвращает число эндпоинтов, замедлившихся больше threshold процентов.
+    """
+    regressions = 0
+    print(f"\n📊 Сравнение с {old['meta'].get('commit')} ({old['meta'].get('date')})")
+    for mode in ('client', 'http'):
+        if mode not in old['modes'] or mode not in new['modes']:
+            continue
+        print(f"\n{mode}:")
+        print(f"{'Эндпоинт':<52} {'p50':>16} {'p95':>16} {'SQL':>12}")
+        before, after = old['modes'][mode]['endpoints'], new['modes'][mode]['endpoints']
+        for name in sorted(set(before) | set(after)):
+            if name not in before or name not in after:
+                print(f"{name:<52} {'только в ' + ('новом' if name in after else 'старом'):>16}")
+                continue
+            changes = []
+            slower = False
+            for key in ('p50_ms', 'p95_ms'):
+                delta = (after[name][key] / before[name][key] - 1) * 100 if before[name][key] else 0.0
+                slower |= key == 'p50_ms' and delta > threshold
+                changes.append(f"{after[name][key]:>7.2f} {delta:>+7.1f}%")
+            sql = after[name]['sql_per_request'] - before[name]['sql_per_request']
+            # Число запросов в смеси http зависит от попаданий в кэш: порог — целый запрос
+            slower |= sql >= 1
+            regressions += slower
+            print(f"{name:<52} {changes[0]:>16} {changes[1]:>16} {after[name]['sql_per_request']:>6.1f} "
+                  f"{sql:>+5.1f}{'  ⚠️' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный прогон всех эндпоинтов')
+    parser.add_argument('--users', type=int, default=20, help='Пользователей в БД')
+    parser.add_argument('--accounts', type=int, default=6, help='Счетов на пользователя, в среднем')
+    parser.add_argument('--transactions', type=int, default=5000, help='Транзакций на пользователя, в среднем')
+    parser.add_argument('--requests', type=int, default=50, help='Запросов на эндпоинт в режиме client')
+    parser.add_argument('--threads', type=int, default=8, help='Потоков в режиме http')
+    parser.add_argument('--duration', type=float, default=10.0, help='Длительность режима http, секунд')
+    parser.add_argument('--mode', choices=['all', 'client', 'http'], default='all')
+    parser.add_argument('--rounds', type=int, default=4, help='Стоимость bcrypt')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Файл отчета JSON')
+    parser.add_argument('--compare', help='Отчет прошлого прогона для сравнения')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Замедление p50 в процентах, считающееся регрессией')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_PATH'] = os.path.join(tmp, 'load_test.db')
+    os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+
+    print("🚀 Нагрузочный прогон")
+    print(f"   {args.users} пользователей × {args.accounts} счетов × {args.transactions} транзакций")
+    started = time.perf_counter()
+    users = seed_database(os.environ['DATABASE_PATH'], args.users, args.accounts,
+                          args.transactions, args.seed)
+    print(f"   Заполнение БД: {time.perf_counter() - started:.1f} с")
+
+    from flask import url_for
+    app = create_instrumented_app(os.path.join(tmp, 'uploads'))
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.test_request_context():
+        static_urls = {filename: url_for('static', filename=filename)
+                       for filename in ('js/accounts.js', 'css/main.css')}
+    scenarios = build_scenarios(static_urls)
+
+    covered = {scenario.endpoint for scenario in scenarios}
+    missing = sorted(rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint not in covered)
+    if missing:
+        print(f"⚠️  Эндпоинты без сценария: {', '.join(missing)}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform()
+        },
+        'dataset': {'users': args.users, 'accounts': args.accounts, 'transactions': args.transactions,
+                    'seed': args.seed, 'bcrypt_rounds': args.rounds},
+        'settings': {'requests': args.requests, 'threads': args.threads, 'duration': args.duration},
+        'modes': {}
+    }
+    if args.mode in ('all', 'client'):
+        report['modes']['client'] = run_client(app, scenarios, users[0], args.requests, args.seed)
+        print_mode('client (test client, один поток)', report['modes']['client'])
+    if args.mode in ('all', 'http'):
+        report['modes']['http'] = run_http(app, scenarios, users, args.threads, args.duration, args.seed)
+        print_mode(f'http ({args.threads} потоков, keep-alive)', report['modes']['http'])
+    app.extensions['password_hasher'].shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n💾 Отчет: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        print(f"\n{'⚠️  Регрессий: ' + str(regressions) if regressions else '✅ Регрессий нет'}")
+
+
+if __name__ == '__main__':
+    main()
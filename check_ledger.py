@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Проверка согласованности реестра балансов
+
+    python check_ledger.py            # только сверка
+    python check_ledger.py --rebuild  # сверка и пересчет при расхождениях
+
+Схему реестра создает миграция 4 (python migrate.py); на БД с
+непримененными миграциями сверка не выполняется.
+"""
+
+import argparse
+import sqlite3
+
+from config import Config
+from app.accounts.ledger import rebuild_ledger, check_ledger
+from app.migrations import pending_migrations
+
+def main():
+    parser = argparse.ArgumentParser(description='Сверка реестра балансов с транзакциями')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Путь к базе данных')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Пересчитать реестр, если найдены расхождения')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        pending = pending_migrations(conn)
+        if pending:
+            print(f"❌ Схема не в актуальной версии, ожидают миграции: "
+                  f"{', '.join(str(item.version) for item in pending)}")
+            print("💡 Сначала запустите: python migrate.py")
+            return False
+
+        print("🔍 Сверка реестра балансов...")
+        print("=" * 50)
+
+        problems = check_ledger(conn)
+        if not problems:
+            print("🎉 Реестр балансов согласован с транзакциями")
+            return True
+
+        for problem in problems[:50]:
+            where = f"счет {problem['account_id']}"
+            if problem['date']:
+                where += f", день {problem['date']}"
+            print(f"❌ {where}: в реестре {problem['stored']}, по транзакциям {problem['actual']}")
+        if len(problems) > 50:
+            print(f"... и еще {len(problems) - 50}")
+
+        print("=" * 50)
+        print(f"⚠️ Найдено расхождений: {len(problems)}")
+
+        if not args.rebuild:
+            print("💡 Для исправления запустите: python check_ledger.py --rebuild")
+            return False
+
+        account_ids = sorted({problem['account_id'] for problem in problems})
+        rebuild_ledger(conn, account_ids)
+        remaining = check_ledger(conn)
+        if remaining:
+            print(f"❌ После пересчета осталось расхождений: {len(remaining)}")
+            return False
+        print(f"✅ Пересчитано счетов: {len(account_ids)}")
+        return True
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    raise SystemExit(0 if main() else 1)
@@ -11,6 +11,53 @@ class Config:
     UPLOAD_FOLDER = 'uploads/temp'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     
+    # Статические файлы (app/assets.py)
+    ASSETS_MAX_AGE = 31536000  # Кэширование файлов с хешем в имени, секунд
+    ASSETS_COMPRESS_MIN_SIZE = 512  # Файлы меньше отдаются без сжатия, байт
+    
+    # Настройки базы данных
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'database/finance.db'
+    DB_POOL_SIZE = 8  # Максимум одновременно открытых соединений
+    DB_POOL_TIMEOUT = 10.0  # Ожидание свободного соединения, секунд
+    DB_BUSY_TIMEOUT_MS = 5000  # Ожидание снятия блокировки SQLite
+    DB_CACHED_STATEMENTS = 256  # Кэш подготовленных выражений на соединение
+    DB_CACHE_SIZE_KB = 16384  # Страничный кэш SQLite на соединение
+    
+    # Кэш вычисленных данных пользователей (app/cache.py)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'  # 'memory' или 'sqlite' (общий для процессов)
+    CACHE_PATH = 'database/cache.db'
+    CACHE_MAX_USERS = 1024  # Пользователей в каждом кэше
+    
+    # Сериализация ответов (app/serialization.py)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER') or 'auto'  # 'auto', 'orjson' или 'stdlib'
+    
+    # Инструментирование запросов (app/instrumentation.py)
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION') == '1'  # Server-Timing, /metrics, профили
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # Доля запросов под cProfile
+    PROFILE_SLOW_MS = 500  # Профиль сохраняется, если запрос дольше, мс
+    PROFILE_DIR = 'profiles'
+    
+    # Хеширование паролей
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))  # Стоимость bcrypt
+    PASSWORD_HASH_WORKERS = 2  # Потоков bcrypt; 0 — хешировать в потоке запроса
+    PASSWORD_HASH_QUEUE_DEPTH = 16  # Ожидающих задач сверх этого — ответ 503
+    PASSWORD_HASH_TIMEOUT = 10.0  # Ожидание результата, секунд
+    
+    # Курсы валют
+    FX_PROVIDER = os.environ.get('FX_PROVIDER') or 'file'  # 'file' или 'http'
+    FX_RATES_FILE = 'static/data/rates.json'
+    FX_API_URL = 'https://api.exchangerate-api.com/v4/latest/USD'
+    FX_API_TIMEOUT = 5.0
+    FX_CACHE_TTL = 3600  # Время жизни курсов в кэше, секунд
+    FX_RETRY_INTERVAL = 60  # Пауза перед новым запросом к поставщику после ошибки, секунд
+    
+    # Фоновые задачи (run_workers.py)
+    JOB_WORKERS = os.cpu_count() or 2  # Процессов-воркеров
+    JOB_MAX_ATTEMPTS = 3  # Попыток на задачу
+    JOB_RETRY_DELAY = 5.0  # Задержка перед повтором, секунд (удваивается)
+    JOB_POLL_INTERVAL = 0.5  # Опрос пустой очереди, секунд
+    JOB_LOCK_TIMEOUT = 600  # Задача в работе дольше — считается зависшей
+    
     # Настройки приложения
     APP_NAME = 'FinanceTracker'
     APP_VERSION = '1.0.0'
\ No newline at end of file
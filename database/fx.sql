@@ -0,0 +1,16 @@
+-- Снимки курсов валют
+--
+-- Каждая успешная загрузка у поставщика сохраняется целиком, поэтому
+-- процессы сервера делят один снимок, а при недоступности поставщика
+-- используется последний известный. Скрипт идемпотентен.
+
+CREATE TABLE IF NOT EXISTS exchange_rate_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    base TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    rates TEXT NOT NULL,
+    fetched_at DATETIME NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_exchange_rate_snapshots_fetched_at
+    ON exchange_rate_snapshots(fetched_at);
@@ -0,0 +1,30 @@
+-- Очередь фоновых задач (импорт выписок, распознавание чеков)
+--
+-- Задачи выбираются процессами run_workers.py; захват выполняется одним
+-- UPDATE ... RETURNING, поэтому одну задачу не возьмут два воркера.
+-- attempts служит меткой захвата: воркер обновляет locked_at и завершает
+-- задачу только пока она в работе с его попыткой. Скрипт идемпотентен и
+-- применяется миграцией 8 (app/migrations.py); колонку committed_rows в
+-- существующие БД добавляет миграция 10.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- 'queued', 'running', 'done', 'failed'
+    payload TEXT NOT NULL,                  -- JSON с параметрами задачи
+    result TEXT,                            -- JSON с результатом
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after DATETIME NOT NULL,
+    locked_at DATETIME,                     -- захват или последний сигнал воркера
+    committed_rows INTEGER NOT NULL DEFAULT 0,  -- строк, зафиксированных текущей попыткой
+    created_at DATETIME NOT NULL,
+    finished_at DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Выбор следующей задачи и поиск зависших
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_user_id ON jobs(user_id);
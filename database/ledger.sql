@@ -0,0 +1,150 @@
+-- Материализованный реестр балансов
+--
+-- account_balances хранит сумму подтвержденных транзакций по счету,
+-- account_daily_balances — оборот и остаток на конец каждого дня.
+-- Обе таблицы поддерживаются триггерами на transactions, поэтому любой
+-- путь записи (API, импорт, ручной SQL) обновляет их инкрементально.
+-- Скрипт идемпотентен и применяется миграцией 4 (app/migrations.py);
+-- триггеры пересоздаются, поэтому их новая версия выходит новой миграцией,
+-- повторно выполняющей скрипт.
+
+-- Текущий баланс счета (без initial_balance), в минимальных единицах
+CREATE TABLE IF NOT EXISTS account_balances (
+    account_id INTEGER PRIMARY KEY,
+    balance INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    FOREIGN KEY (account_id) REFERENCES accounts(id)
+);
+
+-- Дневные снимки: оборот за день и накопленный остаток на конец дня
+CREATE TABLE IF NOT EXISTS account_daily_balances (
+    account_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    net_change INTEGER NOT NULL DEFAULT 0,
+    balance INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, date),
+    FOREIGN KEY (account_id) REFERENCES accounts(id)
+) WITHOUT ROWID;
+
+-- Поиск подтвержденных транзакций счета за день при удалении снимка идет
+-- по idx_transactions_account_status_date_covering (schema.sql, для старых БД —
+-- database/transactions.sql)
+
+-- Префикс индекса выше: лишний индекс только замедлял вставку
+DROP INDEX IF EXISTS idx_transactions_account_id;
+
+-- Счета, для которых идет пакетная вставка. Строка добавляется и удаляется
+-- внутри одной пишущей транзакции импорта, которая сама обновляет реестр
+-- одним set-based проходом (см. app/accounts/ledger.py:apply_ledger_delta);
+-- другие соединения эту строку никогда не видят
+CREATE TABLE IF NOT EXISTS ledger_bulk_accounts (
+    account_id INTEGER PRIMARY KEY
+);
+
+DROP TRIGGER IF EXISTS trg_ledger_insert;
+DROP TRIGGER IF EXISTS trg_ledger_update_old;
+DROP TRIGGER IF EXISTS trg_ledger_update_new;
+DROP TRIGGER IF EXISTS trg_ledger_delete;
+
+-- Новая подтвержденная транзакция
+CREATE TRIGGER trg_ledger_insert
+AFTER INSERT ON transactions
+WHEN NEW.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO account_balances (account_id, balance, transaction_count, updated_at)
+    VALUES (NEW.account_id, NEW.amount, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT(account_id) DO UPDATE SET
+        balance = balance + excluded.balance,
+        transaction_count = transaction_count + 1,
+        updated_at = excluded.updated_at;
+
+    INSERT OR IGNORE INTO account_daily_balances (account_id, date, net_change, balance)
+    VALUES (NEW.account_id, NEW.date, 0, COALESCE(
+        (SELECT balance FROM account_daily_balances
+         WHERE account_id = NEW.account_id AND date < NEW.date
+         ORDER BY date DESC LIMIT 1), 0));
+
+    UPDATE account_daily_balances SET net_change = net_change + NEW.amount
+    WHERE account_id = NEW.account_id AND date = NEW.date;
+
+    UPDATE account_daily_balances SET balance = balance + NEW.amount
+    WHERE account_id = NEW.account_id AND date >= NEW.date;
+END;
+
+-- Изменение транзакции: сначала снимаем старое значение...
+CREATE TRIGGER trg_ledger_update_old
+AFTER UPDATE OF account_id, date, amount, status ON transactions
+WHEN OLD.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = OLD.account_id)
+BEGIN
+    UPDATE account_balances SET
+        balance = balance - OLD.amount,
+        transaction_count = transaction_count - 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE account_id = OLD.account_id;
+
+    UPDATE account_daily_balances SET net_change = net_change - OLD.amount
+    WHERE account_id = OLD.account_id AND date = OLD.date;
+
+    UPDATE account_daily_balances SET balance = balance - OLD.amount
+    WHERE account_id = OLD.account_id AND date >= OLD.date;
+
+    DELETE FROM account_daily_balances
+    WHERE account_id = OLD.account_id AND date = OLD.date
+      AND NOT EXISTS (SELECT 1 FROM transactions
+                      WHERE account_id = OLD.account_id AND date = OLD.date
+                        AND status = 'confirmed');
+END;
+
+-- ...затем применяем новое
+CREATE TRIGGER trg_ledger_update_new
+AFTER UPDATE OF account_id, date, amount, status ON transactions
+WHEN NEW.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO account_balances (account_id, balance, transaction_count, updated_at)
+    VALUES (NEW.account_id, NEW.amount, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT(account_id) DO UPDATE SET
+        balance = balance + excluded.balance,
+        transaction_count = transaction_count + 1,
+        updated_at = excluded.updated_at;
+
+    INSERT OR IGNORE INTO account_daily_balances (account_id, date, net_change, balance)
+    VALUES (NEW.account_id, NEW.date, 0, COALESCE(
+        (SELECT balance FROM account_daily_balances
+         WHERE account_id = NEW.account_id AND date < NEW.date
+         ORDER BY date DESC LIMIT 1), 0));
+
+    UPDATE account_daily_balances SET net_change = net_change + NEW.amount
+    WHERE account_id = NEW.account_id AND date = NEW.date;
+
+    UPDATE account_daily_balances SET balance = balance + NEW.amount
+    WHERE account_id = NEW.account_id AND date >= NEW.date;
+END;
+
+-- Удаление подтвержденной транзакции
+CREATE TRIGGER trg_ledger_delete
+AFTER DELETE ON transactions
+WHEN OLD.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = OLD.account_id)
+BEGIN
+    UPDATE account_balances SET
+        balance = balance - OLD.amount,
+        transaction_count = transaction_count - 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE account_id = OLD.account_id;
+
+    UPDATE account_daily_balances SET net_change = net_change - OLD.amount
+    WHERE account_id = OLD.account_id AND date = OLD.date;
+
+    UPDATE account_daily_balances SET balance = balance - OLD.amount
+    WHERE account_id = OLD.account_id AND date >= OLD.date;
+
+    DELETE FROM account_daily_balances
+    WHERE account_id = OLD.account_id AND date = OLD.date
+      AND NOT EXISTS (SELECT 1 FROM transactions
+                      WHERE account_id = OLD.account_id AND date = OLD.date
+                        AND status = 'confirmed');
+END;
@@ -0,0 +1,20 @@
+-- Учет миграций схемы
+--
+-- schema_version хранит примененные миграции из app/migrations.py.
+-- schema_backfills — позиция пакетного заполнения данных: каждая пачка
+-- фиксируется вместе с id последней обработанной строки, поэтому
+-- прерванная миграция продолжается с места остановки. Скрипт идемпотентен.
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at DATETIME NOT NULL,
+    duration_ms INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS schema_backfills (
+    version INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    last_id INTEGER NOT NULL,
+    PRIMARY KEY (version, name)
+) WITHOUT ROWID;
@@ -0,0 +1,87 @@
+-- Месячные итоги транзакций для отчетов
+--
+-- monthly_rollups хранит сумму и число подтвержденных транзакций по
+-- счету, месяцу, типу и валюте. Отчеты читают только эту таблицу, поэтому
+-- их стоимость зависит от числа месяцев, а не от длины истории. Таблица
+-- поддерживается триггерами на transactions так же, как реестр балансов
+-- (ledger.sql); при пакетном импорте счет отмечен в ledger_bulk_accounts,
+-- и итоги пачки применяет app/reports/rollups.py:apply_rollup_delta.
+-- Скрипт идемпотентен и применяется миграцией 5 (app/migrations.py), после
+-- ledger.sql (миграция 4); триггеры пересоздаются, поэтому их новая версия
+-- выходит новой миграцией, повторно выполняющей скрипт.
+
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    account_id INTEGER NOT NULL,
+    month TEXT NOT NULL,  -- 'YYYY-MM'
+    type TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, month, type, currency),
+    FOREIGN KEY (account_id) REFERENCES accounts(id)
+) WITHOUT ROWID;
+
+DROP TRIGGER IF EXISTS trg_rollups_insert;
+DROP TRIGGER IF EXISTS trg_rollups_update_old;
+DROP TRIGGER IF EXISTS trg_rollups_update_new;
+DROP TRIGGER IF EXISTS trg_rollups_delete;
+
+-- Новая подтвержденная транзакция
+CREATE TRIGGER trg_rollups_insert
+AFTER INSERT ON transactions
+WHEN NEW.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO monthly_rollups (account_id, month, type, currency, total, transaction_count)
+    VALUES (NEW.account_id, substr(NEW.date, 1, 7), NEW.type, NEW.currency, NEW.amount, 1)
+    ON CONFLICT(account_id, month, type, currency) DO UPDATE SET
+        total = total + excluded.total,
+        transaction_count = transaction_count + 1;
+END;
+
+-- Изменение транзакции: сначала снимаем старое значение...
+CREATE TRIGGER trg_rollups_update_old
+AFTER UPDATE OF account_id, date, amount, currency, type, status ON transactions
+WHEN OLD.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = OLD.account_id)
+BEGIN
+    UPDATE monthly_rollups SET
+        total = total - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id AND month = substr(OLD.date, 1, 7)
+      AND type = OLD.type AND currency = OLD.currency;
+
+    DELETE FROM monthly_rollups
+    WHERE account_id = OLD.account_id AND month = substr(OLD.date, 1, 7)
+      AND type = OLD.type AND currency = OLD.currency AND transaction_count = 0;
+END;
+
+-- ...затем применяем новое
+CREATE TRIGGER trg_rollups_update_new
+AFTER UPDATE OF account_id, date, amount, currency, type, status ON transactions
+WHEN NEW.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO monthly_rollups (account_id, month, type, currency, total, transaction_count)
+    VALUES (NEW.account_id, substr(NEW.date, 1, 7), NEW.type, NEW.currency, NEW.amount, 1)
+    ON CONFLICT(account_id, month, type, currency) DO UPDATE SET
+        total = total + excluded.total,
+        transaction_count = transaction_count + 1;
+END;
+
+-- Удаление подтвержденной транзакции
+CREATE TRIGGER trg_rollups_delete
+AFTER DELETE ON transactions
+WHEN OLD.status = 'confirmed'
+ AND NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = OLD.account_id)
+BEGIN
+    UPDATE monthly_rollups SET
+        total = total - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id AND month = substr(OLD.date, 1, 7)
+      AND type = OLD.type AND currency = OLD.currency;
+
+    DELETE FROM monthly_rollups
+    WHERE account_id = OLD.account_id AND month = substr(OLD.date, 1, 7)
+      AND type = OLD.type AND currency = OLD.currency AND transaction_count = 0;
+END;
@@ -1,4 +1,11 @@
 -- Схема базы данных для PWA сервиса учёта финансов
+--
+-- Денежные суммы хранятся целыми числами в минимальных единицах валюты
+-- (см. app/money.py); user_version отмечает, что новой базе перевод
+-- сумм из REAL (миграция 1 в app/migrations.py) не нужен. Новая база создается
+-- из этого файла и затем проходит все миграции из app/migrations.py
+
+PRAGMA user_version = 1;
 
 -- Пользователи
 CREATE TABLE users (
@@ -16,7 +23,7 @@ CREATE TABLE accounts (
     type TEXT NOT NULL,
     currency TEXT NOT NULL,
     bank_id TEXT,
-    initial_balance DECIMAL(10,2) DEFAULT 0,
+    initial_balance INTEGER DEFAULT 0,  -- В минимальных единицах валюты счета
     archived INTEGER DEFAULT 0,
     created_at DATETIME NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(id)
@@ -27,17 +34,29 @@ CREATE TABLE transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     account_id INTEGER NOT NULL,
     date DATE NOT NULL,
-    amount DECIMAL(10,2) NOT NULL,
+    amount INTEGER NOT NULL,  -- В минимальных единицах валюты транзакции
     currency TEXT NOT NULL,
     description TEXT,
     type TEXT NOT NULL,
     status TEXT DEFAULT 'confirmed',
     created_at DATETIME NOT NULL,
+    fingerprint INTEGER,  -- Хеш (дата, сумма, описание) для поиска дублей при импорте
     FOREIGN KEY (account_id) REFERENCES accounts(id)
 );
 
 -- Индексы для оптимизации
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_accounts_user_id ON accounts(user_id);
-CREATE INDEX idx_transactions_account_id ON transactions(account_id);
-CREATE INDEX idx_transactions_date ON transactions(date);
+
+-- Список транзакций счета с курсором по (date, id), триггеры реестра
+-- балансов и поиск дублей при импорте (см. database/transactions.sql)
+CREATE INDEX idx_transactions_account_date_id
+    ON transactions(account_id, date, id, fingerprint);
+CREATE INDEX idx_transactions_account_type_date_id
+    ON transactions(account_id, type, date, id);
+
+-- amount, currency и type в конце индекса статуса: суммы по
+-- подтвержденным транзакциям (сверка реестра, месячные итоги, аналитика)
+-- читаются из индекса без обращения к строкам таблицы
+CREATE INDEX idx_transactions_account_status_date_covering
+    ON transactions(account_id, status, date, id, amount, currency, type);
@@ -0,0 +1,50 @@
+-- Полнотекстовый поиск по описаниям транзакций (FTS5)
+--
+-- transactions_fts — индекс с внешним содержимым: текст хранится только в
+-- transactions, индекс ссылается на строки по rowid = transactions.id и
+-- поддерживается триггерами при любом пути записи (API, импорт, SQL).
+-- unicode61 приводит к нижнему регистру и кириллицу, а индексы префиксов
+-- длиной 2 и 3 ускоряют поиск по началу слова ("magn*", "ya*").
+-- Индексируются и строки без описания: FTS5 сверяет число документов
+-- индекса с таблицей, и на нем же основана статистика bm25.
+-- Скрипт идемпотентен и применяется после ledger.sql миграцией 6
+-- (app/migrations.py), которая и заполняет индекс для существующей БД.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    description,
+    content = 'transactions',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+DROP TRIGGER IF EXISTS trg_transactions_fts_insert;
+DROP TRIGGER IF EXISTS trg_transactions_fts_delete;
+DROP TRIGGER IF EXISTS trg_transactions_fts_update;
+
+-- При пакетном импорте (счет отмечен в ledger_bulk_accounts, см. ledger.sql)
+-- построчный триггер не срабатывает: импорт индексирует всю пачку одним
+-- INSERT ... SELECT (app/transactions/search.py:index_new_transactions),
+-- что в несколько раз быстрее
+CREATE TRIGGER trg_transactions_fts_insert
+AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+END;
+
+CREATE TRIGGER trg_transactions_fts_delete
+AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, description)
+    VALUES ('delete', OLD.id, OLD.description);
+END;
+
+-- Пересчет только при смене описания: изменение статуса или суммы индекс не трогает
+CREATE TRIGGER trg_transactions_fts_update
+AFTER UPDATE OF description ON transactions
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, description)
+    VALUES ('delete', OLD.id, OLD.description);
+    INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+END;
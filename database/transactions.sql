@@ -0,0 +1,34 @@
+-- Составные индексы транзакций
+--
+-- Список транзакций листается курсором по (date, id) внутри каждого
+-- счета, поэтому все индексы заканчиваются на (date, id): страница
+-- читается диапазоном индекса без сортировки, и ее стоимость не зависит
+-- от номера страницы. Скрипт идемпотентен и применяется к существующим
+-- базам миграцией 3 (app/migrations.py; для новых БД индексы создает schema.sql).
+
+-- Основной индекс: список транзакций счета, триггеры реестра балансов и
+-- поиск дублей при импорте (отпечатки читаются из индекса без обращения
+-- к таблице)
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date_id
+    ON transactions(account_id, date, id, fingerprint);
+
+-- Фильтры списка по типу и статусу: редкое значение (например, 'pending')
+-- не требует просмотра всей истории счета. amount в конце индекса статуса
+-- покрывает SUM(amount) по подтвержденным транзакциям счета (сверка и
+-- пересчет реестра), поэтому отдельный (account_id, status, amount) не
+-- нужен: его ключ по сумме давал вставки в случайные страницы индекса
+CREATE INDEX IF NOT EXISTS idx_transactions_account_type_date_id
+    ON transactions(account_id, type, date, id);
+-- currency и type после amount покрывают выборки по подтвержденным
+-- транзакциям за период целиком: аналитика денежного потока
+-- (app/reports/analytics.py) и пересчет месячных итогов читают только
+-- индекс, без случайных обращений к строкам таблицы
+CREATE INDEX IF NOT EXISTS idx_transactions_account_status_date_covering
+    ON transactions(account_id, status, date, id, amount, currency, type);
+
+-- Заменены индексами выше; по одной дате без счета запросов нет
+DROP INDEX IF EXISTS idx_transactions_account_date_fingerprint;
+DROP INDEX IF EXISTS idx_transactions_account_date;
+DROP INDEX IF EXISTS idx_transactions_date;
+DROP INDEX IF EXISTS idx_transactions_account_status_amount;
+DROP INDEX IF EXISTS idx_transactions_account_status_date_id;
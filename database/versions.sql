@@ -0,0 +1,71 @@
+-- Версии данных пользователей
+--
+-- version увеличивается при любой записи в счета или транзакции
+-- пользователя (API, импорт, фоновые задачи, ручной SQL), поэтому по ней
+-- API отвечает 304 Not Modified, не выполняя запросов к данным (см.
+-- app/accounts/versions.py). Строка появляется при первой записи; ее
+-- отсутствие означает версию 0. Скрипт идемпотентен и применяется
+-- миграцией 9 (app/migrations.py).
+
+CREATE TABLE IF NOT EXISTS user_data_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+DROP TRIGGER IF EXISTS trg_versions_account_insert;
+DROP TRIGGER IF EXISTS trg_versions_account_update;
+DROP TRIGGER IF EXISTS trg_versions_account_delete;
+DROP TRIGGER IF EXISTS trg_versions_transaction_insert;
+DROP TRIGGER IF EXISTS trg_versions_transaction_update;
+DROP TRIGGER IF EXISTS trg_versions_transaction_delete;
+
+CREATE TRIGGER trg_versions_account_insert
+AFTER INSERT ON accounts
+BEGIN
+    INSERT INTO user_data_versions (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_versions_account_update
+AFTER UPDATE ON accounts
+BEGIN
+    INSERT INTO user_data_versions (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_versions_account_delete
+AFTER DELETE ON accounts
+BEGIN
+    INSERT INTO user_data_versions (user_id, version) VALUES (OLD.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- При пакетном импорте (счет отмечен в ledger_bulk_accounts, см. ledger.sql)
+-- версия увеличивается один раз на пачку
+-- (app/accounts/versions.py:bump_data_version), а не на каждую строку
+CREATE TRIGGER trg_versions_transaction_insert
+AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO user_data_versions (user_id, version)
+    SELECT user_id, 1 FROM accounts WHERE id = NEW.account_id
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_versions_transaction_update
+AFTER UPDATE ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM ledger_bulk_accounts WHERE account_id = NEW.account_id)
+BEGIN
+    INSERT INTO user_data_versions (user_id, version)
+    SELECT DISTINCT user_id, 1 FROM accounts WHERE id IN (OLD.account_id, NEW.account_id)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_versions_transaction_delete
+AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO user_data_versions (user_id, version)
+    SELECT user_id, 1 FROM accounts WHERE id = OLD.account_id
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
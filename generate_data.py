@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетической БД для бенчмарков и проверки масштабирования
+
+Заполняет БД (по умолчанию database/finance.db) пользователями, счетами и
+транзакциями. Данные определяются seed: один и тот же запуск дает одну и
+ту же БД (кроме дат, отсчитываемых от --end-date, по умолчанию сегодня).
+Валюты и банки счетов берутся из static/data/*.json, суммы транзакций
+пересчитываются из долларов по static/data/rates.json с учетом
+минимальных единиц валюты.
+
+Вставка идет без журнала и без индексов и триггеров таблиц: индексы
+создаются заново после вставки, реестр остатков, помесячные итоги и
+поисковый индекс строятся одним проходом (как при миграции), затем
+триггеры возвращаются на место.
+
+    python generate_data.py --users 100000 --accounts 1000000 --transactions 100000000
+    python generate_data.py --db /tmp/bench.db --users 1000 --accounts 5000 --transactions 1000000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from config import Config
+from app.accounts.ledger import rebuild_ledger
+from app.auth.hashing import PasswordHasher
+from app.migrations import migrate
+from app.reports.rollups import rebuild_rollups
+from app.transactions.dedupe import combine_fingerprint, description_hash
+
+DEFAULT_PASSWORD = 'password123'
+DATA_DIR = 'static/data'
+# Таблицы, индексы и триггеры которых снимаются на время вставки
+BULK_TABLES = ('users', 'accounts', 'transactions')
+# Транзакций в задаче генератора и в одном executemany
+CHUNK_SIZE = 100000
+
+# Доли валют счетов; остальные валюты справочника делят REST_CURRENCY_SHARE
+CURRENCY_SHARES = {'KZT': 0.55, 'USD': 0.2, 'EUR': 0.08, 'RUB': 0.08}
+REST_CURRENCY_SHARE = 0.09
+# Тип счета: (доля счетов, относительная активность, название)
+ACCOUNT_TYPES = {
+    'checking': (0.35, 1.0, 'Текущий'),
+    'cash': (0.2, 0.6, 'Наличные'),
+    'credit': (0.15, 0.8, 'Кредитная карта'),
+    'savings': (0.15, 0.15, 'Накопительный'),
+    'deposit': (0.1, 0.05, 'Депозит'),
+    'investment': (0.05, 0.1, 'Брокерский')
+}
+# Доля счетов без банка (у наличных банка нет всегда)
+NO_BANK_SHARE = 0.2
+MERCHANTS = ['Magnum', 'Small', 'Yandex Taxi', 'Yandex Eda', 'Glovo', 'Kaspi Магазин', 'Sulpak',
+             'Технодом', 'Starbucks', 'Wolt', 'Beeline', 'Аптека Биосфера', 'Air Astana',
+             'Choco Travel', 'Метро', 'Шашлычная Дастархан', 'Кофейня Coffee Boom', 'Arbuz.kz']
+CITIES = ['Алматы', 'Астана', 'Шымкент', 'Караганда', 'Актобе']
+INCOME = ['Зарплата', 'Аванс', 'Перевод от Ивана', 'Возврат покупки', 'Проценты по депозиту', 'Кэшбэк']
+INCOME_SHARE = 0.12
+PENDING_SHARE = 0.03
+# Суммы в центах доллара: расход до EXPENSE_MAX (чаще мелкие), доход от INCOME_MIN до INCOME_MAX
+EXPENSE_MAX = 30000
+INCOME_MIN, INCOME_MAX = 5000, 300000
+
+
+def load_reference(name: str) -> List[Dict]:
+    with open(os.path.join(DATA_DIR, f'{name}.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)[name]
+
+
+def currency_weights(currencies: List[Dict]) -> Dict[str, float]:
+    """Доли валют справочника: основные по CURRENCY_SHARES, остальные поровну"""
+    rest = [item['code'] for item in currencies if item['code'] not in CURRENCY_SHARES]
+    weights = {code: share for code, share in CURRENCY_SHARES.items()
+               if any(item['code'] == code for item in currencies)}
+    for code in rest:
+        weights[code] = REST_CURRENCY_SHARE / len(rest)
+    return weights
+
+
+def split_total(rng: random.Random, total: int, weights: List[float]) -> List[int]:
+    """Разбиение total на целые части пропорционально weights (сумма ровно total)"""
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in rng.choices(range(len(weights)), weights=weights, k=total - sum(counts)):
+        counts[index] += 1
+    return counts
+
+
+def drop_bulk_objects(conn: sqlite3.Connection) -> List[tuple]:
+    """Удаление индексов и триггеров таблиц BULK_TABLES; возвращает их определения"""
+    placeholders = ', '.join('?' * len(BULK_TABLES))
+    objects = conn.execute(
+        f'''SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+            ORDER BY type''',
+        BULK_TABLES
+    ).fetchall()
+    for kind, name, _ in objects:
+        conn.execute(f'DROP {kind.upper()} {name}')
+    return objects
+
+# Параметры генерации транзакций в процессе-генераторе (см. _init_generator)
+_spec = None
+
+
+def _init_generator(spec: Dict):
+    global _spec
+    _spec = spec
+
+
+def _account_chunks(accounts: List[tuple]) -> List[List[tuple]]:
+    """Группы счетов примерно по CHUNK_SIZE транзакций — задачи для генераторов"""
+    chunks, current, size = [], [], 0
+    for account in accounts:
+        current.append(account)
+        size += account[3]
+        if size >= CHUNK_SIZE:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _transaction_chunk(accounts: List[tuple]) -> List[tuple]:
+    """Строки transactions для счетов (account_id, валюта, множитель, число транзакций).
+
+    У каждого счета свой генератор случайных чисел от (seed, account_id),
+    поэтому результат не зависит от числа процессов и порядка задач.
+    """
+    seed, created_at = _spec['seed'], _spec['created_at']
+    dates, incomes, expenses = _spec['dates'], _spec['incomes'], _spec['expenses']
+    day_count, income_count, expense_count = len(dates), len(incomes), len(expenses)
+    fingerprint = combine_fingerprint
+    rows = []
+    append = rows.append
+    for account_id, currency, scale, count in accounts:
+        rng = random.Random(seed * 100000007 + account_id)
+        # Локальные ссылки и индекс по random() вместо random.choice: тело
+        # цикла выполняется для каждой из миллионов строк
+        random_value = rng.random
+        for offset in sorted((int(random_value() * day_count) for _ in range(count)), reverse=True):
+            day, day_number = dates[offset]
+            if random_value() < INCOME_SHARE:
+                kind, (description, digest) = 'income', incomes[int(random_value() * income_count)]
+                amount = int((INCOME_MIN + random_value() * (INCOME_MAX - INCOME_MIN)) * scale) or 1
+            else:
+                kind, (description, digest) = 'expense', expenses[int(random_value() * expense_count)]
+                amount = -(int(random_value() ** 3 * EXPENSE_MAX * scale) or 1)
+            status = 'pending' if random_value() < PENDING_SHARE else 'confirmed'
+            append((account_id, day, amount, currency, description, kind, status, created_at,
+                    fingerprint(digest, amount, day_number)))
+    return rows
+
+
+def generate(path: str, users: int, accounts: int, transactions: int, seed: int = 42,
+             days: int = 730, end: date = None, password: str = DEFAULT_PASSWORD,
+             workers: int = 0, log: Callable[[str], None] = print) -> Dict[str, float]:
+    """Заполнение новой БД по пути path. Возвращает время этапов в секундах.
+
+    Каждому пользователю достается хотя бы один счет, остальные счета
+    распределяются случайно; транзакции делятся между счетами по
+    активности типа счета. Пароль всех пользователей — password,
+    email — user{N}@example.com. Транзакции генерируют workers процессов
+    (0 — в текущем процессе), вставка идет в текущем.
+    """
+    if accounts < users:
+        raise ValueError('Счетов должно быть не меньше, чем пользователей')
+
+    rng = random.Random(seed)
+    end = end or date.today()
+    currencies = load_reference('currencies')
+    banks = [bank['id'] for bank in load_reference('banks')]
+    with open(os.path.join(DATA_DIR, 'rates.json'), 'r', encoding='utf-8') as f:
+        rates = json.load(f)['rates']
+    weights = currency_weights(currencies)
+    codes = list(weights)
+    # Множитель из центов доллара в минимальные единицы валюты
+    scales = {item['code']: rates.get(item['code'], 1.0) * 10 ** item['minor_units'] / 100
+              for item in currencies}
+    created_at = end.isoformat() + ' 00:00:00'
+    timings = {}
+
+    conn = sqlite3.connect(path)
+    migrate(conn, log=lambda message: None)
+    # Восстановить БД при сбое не нужно: она создается заново
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA cache_size = -524288')
+    saved_objects = drop_bulk_objects(conn)
+
+    started = time.perf_counter()
+    password_hash = PasswordHasher(rounds=Config.BCRYPT_ROUNDS, workers=0).hash(password)
+    conn.executemany(
+        'INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)',
+        ((number, f'user{number}@example.com', password_hash, created_at) for number in range(1, users + 1))
+    )
+    timings['users'] = time.perf_counter() - started
+    log(f"   Пользователи: {users} за {timings['users']:.1f} с")
+
+    started = time.perf_counter()
+    type_names = list(ACCOUNT_TYPES)
+    type_shares = [ACCOUNT_TYPES[name][0] for name in type_names]
+    owners = list(range(1, users + 1)) + rng.choices(range(1, users + 1), k=accounts - users)
+    owners.sort()
+    account_types = rng.choices(type_names, weights=type_shares, k=accounts)
+    account_currencies = rng.choices(codes, weights=list(weights.values()), k=accounts)
+
+    def account_rows():
+        for account_id, (user_id, account_type, currency) in enumerate(
+                zip(owners, account_types, account_currencies), start=1):
+            bank_id = None
+            if account_type != 'cash' and rng.random() >= NO_BANK_SHARE:
+                bank_id = rng.choice(banks)
+            initial_balance = int(rng.randrange(0, 200000) * scales[currency])
+            yield (account_id, user_id, f'{ACCOUNT_TYPES[account_type][2]} {currency}', account_type,
+                   currency, bank_id, initial_balance, created_at)
+
+    conn.executemany(
+        '''INSERT INTO accounts (id, user_id, name, type, currency, bank_id, initial_balance, archived, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)''', account_rows()
+    )
+    conn.commit()
+    timings['accounts'] = time.perf_counter() - started
+    log(f"   Счета: {accounts} за {timings['accounts']:.1f} с")
+
+    started = time.perf_counter()
+    activity = [ACCOUNT_TYPES[account_type][1] * (0.2 + rng.random()) for account_type in account_types]
+    counts = split_total(rng, transactions, activity)
+    # Даты и описания повторяются: строки и их вклад в отпечаток считаются заранее
+    spec = {
+        'seed': seed,
+        'created_at': created_at,
+        'dates': [(day.isoformat(), int(day.strftime('%Y%m%d')))
+                  for day in (end - timedelta(days=offset) for offset in range(days))],
+        'expenses': [(text, description_hash(text))
+                     for text in (f'Покупка: {merchant} {city}' for merchant in MERCHANTS for city in CITIES)],
+        'incomes': [(text, description_hash(text)) for text in INCOME]
+    }
+    tasks = _account_chunks([(account_id, currency, scales[currency], count)
+                             for account_id, (currency, count) in enumerate(zip(account_currencies, counts), start=1)
+                             if count])
+
+    pool = None
+    if workers > 0:
+        pool = multiprocessing.Pool(workers, initializer=_init_generator, initargs=(spec,))
+        chunks = pool.imap(_transaction_chunk, tasks)
+    else:
+        _init_generator(spec)
+        chunks = map(_transaction_chunk, tasks)
+
+    inserted = reported = 0
+    try:
+        for chunk in chunks:
+            conn.executemany(
+                '''INSERT INTO transactions (account_id, date, amount, currency, description, type, status,
+                                             created_at, fingerprint)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', chunk
+            )
+            inserted += len(chunk)
+            if inserted - reported >= CHUNK_SIZE * 10 or inserted == transactions:
+                reported = inserted
+                elapsed = time.perf_counter() - started
+                log(f"   Транзакции: {inserted}/{transactions} ({inserted / elapsed:,.0f} строк/с)")
+    finally:
+        if pool is not None:
+            pool.terminate()
+    conn.commit()
+    timings['transactions'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for kind, _, sql in saved_objects:
+        if kind == 'index':
+            conn.execute(sql)
+    conn.commit()
+    timings['indexes'] = time.perf_counter() - started
+    log(f"   Индексы: {timings['indexes']:.1f} с")
+
+    started = time.perf_counter()
+    rebuild_ledger(conn)
+    rebuild_rollups(conn)
+    timings['ledger'] = time.perf_counter() - started
+    log(f"   Реестр остатков и помесячные итоги: {timings['ledger']:.1f} с")
+
+    started = time.perf_counter()
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    conn.execute('INSERT OR REPLACE INTO user_data_versions (user_id, version) SELECT id, 1 FROM users')
+    conn.commit()
+    timings['search'] = time.perf_counter() - started
+    log(f"   Поисковый индекс: {timings['search']:.1f} с")
+
+    started = time.perf_counter()
+    for kind, _, sql in saved_objects:
+        if kind == 'trigger':
+            conn.execute(sql)
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.execute('PRAGMA locking_mode = NORMAL')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.close()
+    timings['finish'] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Генерация синтетической БД')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Путь к БД')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--accounts', type=int, default=5000, help='Счетов всего')
+    parser.add_argument('--transactions', type=int, default=1000000, help='Транзакций всего')
+    parser.add_argument('--days', type=int, default=730, help='Глубина истории, дней')
+    parser.add_argument('--end-date', type=date.fromisoformat, help='Дата последних транзакций (ГГГГ-ММ-ДД)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=(os.cpu_count() or 1) - 1,
+                        help='Процессов генерации транзакций (0 — без отдельных процессов)')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Пароль всех пользователей')
+    parser.add_argument('--force', action='store_true', help='Перезаписать существующую БД')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            parser.error(f'{args.db} уже существует, для перезаписи укажите --force')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+
+    print(f"🚀 Генерация {args.db}: {args.users} пользователей, {args.accounts} счетов, "
+          f"{args.transactions} транзакций (seed={args.seed})")
+    started = time.perf_counter()
+    generate(args.db, args.users, args.accounts, args.transactions, seed=args.seed, days=args.days,
+             end=args.end_date, password=args.password, workers=args.workers)
+    size = os.path.getsize(args.db) / 1024 / 1024
+    print(f"✅ Готово за {time.perf_counter() - started:.1f} с, {size:.0f} МБ")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Импорт банковских выписок из командной строки
+
+    python import_statement.py --account 3 --user 1 kaspi.csv halyk.csv
+    python import_statement.py --account 3 --user 1 --format ofx statement.txt
+"""
+
+import argparse
+import sys
+
+from app.transactions.importer import StatementImporter, StatementError, STATEMENT_FORMATS
+from app.transactions.dedupe import DEDUPE_MODES
+
+def print_progress(imported, position, total):
+    percent = position * 100 // total if total else 100
+    sys.stdout.write(f"\r   {percent:3d}%  импортировано строк: {imported}")
+    sys.stdout.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт выписок CSV/OFX в транзакции счета')
+    parser.add_argument('files', nargs='+', help='Файлы выписок')
+    parser.add_argument('--account', type=int, required=True, help='ID счета')
+    parser.add_argument('--user', type=int, required=True, help='ID владельца счета')
+    parser.add_argument('--format', choices=STATEMENT_FORMATS,
+                        help='Формат выписки (по умолчанию определяется автоматически)')
+    parser.add_argument('--dedupe', choices=DEDUPE_MODES, default='strict',
+                        help='Поиск уже импортированных строк: точный, без учета '
+                             'регистра и пробелов или отключен')
+    args = parser.parse_args()
+
+    importer = StatementImporter(args.account, args.user, progress=print_progress,
+                                 dedupe=args.dedupe)
+    ok = True
+
+    for path in args.files:
+        print(f"📄 {path}")
+        try:
+            summary = importer.import_file(path, args.format)
+        except (StatementError, OSError) as e:
+            print(f"❌ {e}")
+            ok = False
+            continue
+
+        print()
+        print(f"✅ Формат: {summary['format']}, импортировано {summary['imported']} "
+              f"из {summary['rows_read']} строк за {summary['seconds']} с "
+              f"({summary['rows_per_second']} строк/с)")
+        if summary['imported']:
+            print(f"   Период: {summary['date_from']} — {summary['date_to']}, "
+                  f"сумма: {summary['total_amount']}")
+        if summary['duplicates']:
+            print(f"ℹ️ Пропущено дублей: {summary['duplicates']}")
+        if summary['skipped']:
+            print(f"⚠️ Пропущено строк: {summary['skipped']}")
+            for error in summary['errors']:
+                print(f"   {error}")
+
+    return ok
+
+if __name__ == '__main__':
+    raise SystemExit(0 if main() else 1)
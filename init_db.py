@@ -1,22 +1,22 @@
 import sqlite3
 import os
+from config import Config
+from app.migrations import migrate
 
 def init_database():
     # Создаём папку для БД если её нет
-    os.makedirs('database', exist_ok=True)
+    os.makedirs(os.path.dirname(Config.DATABASE_PATH) or '.', exist_ok=True)
     
     # Подключение к БД
-    conn = sqlite3.connect('database/finance.db')
+    conn = sqlite3.connect(Config.DATABASE_PATH)
     
-    # Читаем и выполняем схему
-    with open('database/schema.sql', 'r', encoding='utf-8') as f:
-        schema = f.read()
+    # Новая БД создаётся из database/schema.sql, существующая доводится до
+    # последней версии схемы миграциями из app/migrations.py (см. migrate.py)
+    migrate(conn)
     
-    conn.executescript(schema)
-    conn.commit()
     conn.close()
     
     print("✅ База данных инициализирована успешно!")
 
 if __name__ == '__main__':
-    init_database()
\ No newline at end of file
+    init_database()
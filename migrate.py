@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Миграции схемы базы данных
+
+    python migrate.py                 # применить ожидающие миграции
+    python migrate.py --status        # список миграций и их состояние
+    python migrate.py --dry-run       # показать, что будет сделано, ничего не меняя
+    python migrate.py --batch-size 2000 --pause 0.05
+                                      # мельче пачки и пауза между ними под нагрузкой
+
+Заполнение данных идет пачками с commit после каждой, поэтому миграцию
+можно запускать на работающем приложении; прерванная миграция при
+повторном запуске продолжается с последней зафиксированной пачки.
+"""
+
+import argparse
+import sqlite3
+
+from config import Config
+from app.migrations import DEFAULT_BATCH_SIZE, MIGRATIONS, applied_migrations, migrate
+
+# Сколько ждать освобождения БД писателями приложения, секунд
+BUSY_TIMEOUT = 30
+
+def print_status(conn: sqlite3.Connection) -> bool:
+    applied = applied_migrations(conn)
+    print("📋 Миграции схемы")
+    print("=" * 50)
+    for item in MIGRATIONS:
+        if item.version in applied:
+            print(f"✅ {item.version:>3}  {item.name}  ({applied[item.version]})")
+        else:
+            print(f"⏳ {item.version:>3}  {item.name}")
+    pending = sum(item.version not in applied for item in MIGRATIONS)
+    print("=" * 50)
+    print(f"Ожидают применения: {pending}" if pending else "🎉 Схема в актуальной версии")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Миграции схемы базы данных')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Путь к базе данных')
+    parser.add_argument('--status', action='store_true', help='Показать состояние миграций')
+    parser.add_argument('--dry-run', action='store_true', help='Показать план без изменений')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Строк в одной пачке заполнения (по умолчанию {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help='Пауза между пачками, секунд')
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error('--batch-size должен быть положительным')
+
+    conn = sqlite3.connect(args.db, timeout=BUSY_TIMEOUT)
+    try:
+        if args.status:
+            return print_status(conn)
+
+        applied = migrate(conn, dry_run=args.dry_run, batch_size=args.batch_size, pause=args.pause)
+        if args.dry_run:
+            print(f"🔍 Будет применено миграций: {len(applied)}")
+        elif applied:
+            print(f"✅ Применено миграций: {len(applied)}")
+        else:
+            print("🎉 Схема в актуальной версии")
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ Миграция прервана: {e}")
+        print("💡 Повторный запуск продолжит с последней зафиксированной пачки")
+        return False
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    raise SystemExit(0 if main() else 1)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Запуск воркеров фоновых задач (импорт выписок, распознавание чеков)
+
+    python run_workers.py              # пул процессов по числу ядер
+    python run_workers.py --workers 2
+    python run_workers.py --once       # выполнить готовые задачи и выйти
+"""
+
+import argparse
+import signal
+
+from config import Config
+from app.jobs.worker import WorkerPool, work_until_empty
+
+def main():
+    parser = argparse.ArgumentParser(description='Воркеры очереди фоновых задач')
+    parser.add_argument('--workers', type=int, default=Config.JOB_WORKERS,
+                        help='Число процессов-воркеров')
+    parser.add_argument('--once', action='store_true',
+                        help='Выполнить готовые задачи в текущем процессе и выйти')
+    args = parser.parse_args()
+
+    if args.once:
+        processed = work_until_empty()
+        print(f"✅ Выполнено задач: {processed}")
+        return
+
+    pool = WorkerPool(workers=args.workers)
+
+    def shutdown(signum, frame):
+        print("⏹️ Остановка воркеров после завершения текущих задач...")
+        pool.request_stop()
+
+    pool.start()
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"🚀 Запущено воркеров: {args.workers}")
+    pool.supervise()
+    pool.stop()
+    print("✅ Воркеры остановлены")
+
+if __name__ == '__main__':
+    main()
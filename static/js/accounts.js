@@ -31,6 +31,16 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Service worker отдал список из кэша, а в фоне пришли новые данные
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.addEventListener('message', function(event) {
+            if (event.data && event.data.type === 'api-updated'
+                    && new URL(event.data.url).pathname === '/accounts/api/accounts') {
+                loadAccounts();
+            }
+        });
+    }
+
     async function loadAccounts() {
         showLoading(true);
         
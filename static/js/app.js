@@ -0,0 +1,8 @@
+// Общий скрипт всех страниц: регистрация service worker
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register('/sw.js').catch(function(error) {
+            console.error('Service worker не зарегистрирован:', error);
+        });
+    });
+}
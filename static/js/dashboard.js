@@ -9,9 +9,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const currencySearch = document.getElementById('currency-search');
 
     // Данные
-    let accounts = [];
+    let summary = null;
     let currencies = [];
-    let exchangeRates = {};
     let selectedCurrency = getCurrencyFromCookie() || 'USD';
 
     // Загрузка данных при старте
@@ -59,10 +58,10 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 
     async function loadDashboardData() {
+        // Сводка по счетам и общая стоимость приходят одним запросом
         await Promise.all([
             loadCurrencies(),
-            loadExchangeRates(),
-            loadAccountsData()
+            loadSummary()
         ]);
         
         updateTotalValue();
@@ -82,65 +81,39 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    async function loadExchangeRates() {
+    async function loadSummary() {
         try {
-            // Используем бесплатный API exchangerate-api.com
-            const response = await fetch(`https://api.exchangerate-api.com/v4/latest/USD`);
+            const response = await fetch(`/api/dashboard/summary?currency=${encodeURIComponent(selectedCurrency)}`);
             const data = await response.json();
-            exchangeRates = data.rates || {};
-            exchangeRates['USD'] = 1; // USD как базовая валюта
+            summary = data.success ? data : null;
         } catch (error) {
-            console.error('Ошибка загрузки курсов валют:', error);
-            // Фоллбек - устанавливаем базовые курсы
-            exchangeRates = {
-                'USD': 1,
-                'EUR': 0.85,
-                'KZT': 450,
-                'RUB': 90,
-                'CNY': 7.2,
-                'GBP': 0.73,
-                'JPY': 150
-            };
+            console.error('Ошибка загрузки сводки:', error);
+            summary = null;
         }
     }
 
-    async function loadAccountsData() {
-        try {
-            const response = await fetch('/accounts/api/accounts');
-            const data = await response.json();
-            
-            if (data.success) {
-                accounts = data.accounts || [];
-            }
-        } catch (error) {
-            console.error('Ошибка загрузки счетов:', error);
-            accounts = [];
-        }
-    }
-
-    async function loadAccountsSummary() {
-        try {
-            if (accounts.length > 0) {
-                const banksResponse = await fetch('/static/data/banks.json');
-                const banksData = await banksResponse.json();
-                const banks = banksData.banks || [];
-                
-                renderAccountsSummary(accounts, banks);
-            } else {
-                accountsSummary.innerHTML = `
-                    <div class="no-data">
-                        <p>У вас пока нет счетов</p>
-                        <a href="/accounts/create" class="btn-primary">Создать первый счет</a>
-                    </div>
-                `;
-            }
-        } catch (error) {
+    function loadAccountsSummary() {
+        if (!summary) {
             accountsSummary.innerHTML = '<div class="loading-text">Ошибка загрузки счетов</div>';
+        } else if (summary.account_count > 0) {
+            renderAccountsSummary(summary.accounts, summary.account_count);
+        } else {
+            accountsSummary.innerHTML = `
+                <div class="no-data">
+                    <p>У вас пока нет счетов</p>
+                    <a href="/accounts/create" class="btn-primary">Создать первый счет</a>
+                </div>
+            `;
         }
     }
 
     function updateTotalValue() {
-        if (accounts.length === 0) {
+        if (!summary) {
+            totalValueAmount.innerHTML = '<div class="loading-text">Ошибка загрузки общей стоимости</div>';
+            return;
+        }
+
+        if (summary.account_count === 0) {
             totalValueAmount.innerHTML = `
                 <div class="no-data">
                     Создайте счета для отображения общей стоимости
@@ -149,28 +122,7 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        // Подсчитываем общую стоимость в USD
-        let totalInUSD = 0;
-        
-        accounts.forEach(account => {
-            if (!account.archived) {
-                const accountBalance = account.current_balance || 0;
-                const accountCurrency = account.currency;
-                
-                // Конвертируем в USD
-                if (accountCurrency === 'USD') {
-                    totalInUSD += accountBalance;
-                } else if (exchangeRates[accountCurrency]) {
-                    totalInUSD += accountBalance / exchangeRates[accountCurrency];
-                }
-            }
-        });
-
-        // Конвертируем из USD в выбранную валюту
-        let totalInSelectedCurrency = totalInUSD;
-        if (selectedCurrency !== 'USD' && exchangeRates[selectedCurrency]) {
-            totalInSelectedCurrency = totalInUSD * exchangeRates[selectedCurrency];
-        }
+        const totalInSelectedCurrency = summary.total;
 
         // Отображаем результат
         const isNegative = totalInSelectedCurrency < 0;
@@ -219,14 +171,15 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    function selectCurrency(currencyCode) {
+    async function selectCurrency(currencyCode) {
         selectedCurrency = currencyCode;
         setCurrencyToCookie(currencyCode);
         updateCurrencySymbol();
-        updateTotalValue();
         hideCurrencyDropdown();
         currencySearch.value = '';
         filterCurrencies(''); // Показать все валюты
+        await loadSummary();
+        updateTotalValue();
     }
 
     function updateCurrencySymbol() {
@@ -248,13 +201,10 @@ document.addEventListener('DOMContentLoaded', function() {
         currencyDropdown.classList.add('hidden');
     }
 
-    function renderAccountsSummary(accounts, banks) {
-        // Показываем только первые 3 счета
-        const displayAccounts = accounts.slice(0, 3);
-        
-        const html = displayAccounts.map(account => {
-            const bank = banks.find(b => b.id === account.bank_id);
-            const bankColor = bank ? bank.color : '#9E9E9E';
+    function renderAccountsSummary(accounts, accountCount) {
+        // Сервер присылает только первые 3 счета
+        const html = accounts.map(account => {
+            const bankColor = account.bank_color || '#9E9E9E';
             const isNegative = account.current_balance < 0;
             
             return `
@@ -264,7 +214,7 @@ document.addEventListener('DOMContentLoaded', function() {
                         <span class="account-name">${escapeHtml(account.name)}</span>
                     </div>
                     <div class="account-balance ${isNegative ? 'negative' : ''}">
-                        ${formatCurrency(account.current_balance, account.currency)}
+                        ${formatCurrency(account.current_balance, account.currency_symbol)}
                     </div>
                 </div>
             `;
@@ -273,19 +223,16 @@ document.addEventListener('DOMContentLoaded', function() {
         accountsSummary.innerHTML = html;
         
         // Добавляем ссылку "Показать все" если счетов больше 3
-        if (accounts.length > 3) {
+        if (accountCount > accounts.length) {
             accountsSummary.innerHTML += `
                 <div style="text-align: center; margin-top: 15px;">
-                    <a href="/accounts" class="btn-secondary">Показать все (${accounts.length})</a>
+                    <a href="/accounts" class="btn-secondary">Показать все (${accountCount})</a>
                 </div>
             `;
         }
     }
 
-    function formatCurrency(amount, currency) {
-        const currencyObj = currencies.find(c => c.code === currency);
-        const symbol = currencyObj ? currencyObj.symbol : currency;
-        
+    function formatCurrency(amount, symbol) {
         const formattedAmount = new Intl.NumberFormat('ru-RU', {
             minimumFractionDigits: 2,
             maximumFractionDigits: 2
@@ -0,0 +1,99 @@
+// Service worker приложения.
+//
+// Сервер отдает этот файл по адресу /sw.js и подставляет перед ним
+// self.__ASSETS: версию и адреса с хешем CSS и JS оболочки (app/assets.py).
+// - Оболочка кэшируется при установке и отдается из кэша: адреса с хешем
+//   неизменны, новая версия файлов приходит вместе с новым service worker.
+// - Список счетов отдается из кэша сразу и обновляется в фоне
+//   (stale-while-revalidate); страницы получают сообщение, если данные
+//   изменились.
+// - Любой изменяющий запрос (POST, PUT, DELETE) и вход или выход
+//   сбрасывают кэш API, чтобы не показывать устаревшие или чужие данные.
+
+const ASSETS = self.__ASSETS || { version: 'dev', urls: [] };
+const SHELL_CACHE = `shell-${ASSETS.version}`;
+const API_CACHE = 'api-v1';
+const STALE_WHILE_REVALIDATE = ['/accounts/api/accounts'];
+
+self.addEventListener('install', function(event) {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(ASSETS.urls))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('shell-') && key !== SHELL_CACHE)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', function(event) {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    if (request.method !== 'GET') {
+        event.waitUntil(caches.delete(API_CACHE));
+        return;
+    }
+
+    if (STALE_WHILE_REVALIDATE.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (ASSETS.urls.includes(url.pathname)) {
+        event.respondWith(cacheFirst(request));
+    }
+});
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request, { cacheName: SHELL_CACHE });
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(SHELL_CACHE);
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidate(event) {
+    const request = event.request;
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(request);
+
+    const network = fetch(request).then(async function(response) {
+        // Ответы с ошибкой (401 после выхода) не кэшируются
+        if (!response.ok) {
+            await cache.delete(request);
+            return response;
+        }
+        const body = await response.clone().text();
+        const previous = cached ? await cached.clone().text() : null;
+        await cache.put(request, response.clone());
+        if (previous !== null && previous !== body) {
+            notifyClients(request.url);
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    return network;
+}
+
+async function notifyClients(url) {
+    const clients = await self.clients.matchAll({ type: 'window' });
+    clients.forEach(client => client.postMessage({ type: 'api-updated', url: url }));
+}
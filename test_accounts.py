@@ -35,6 +35,41 @@ def test_json_files():
     else:
         print("❌ currencies.json не найден")
 
+def test_reference_data():
+    print("🧪 Тестируем кэш справочников...")
+    
+    import tempfile
+    from app.accounts.reference import ReferenceData
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'banks.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'banks': [{'id': 'kaspi', 'name': 'Kaspi Bank'}]}, f)
+        
+        reference = ReferenceData(path, 'banks', 'id', check_interval=0)
+        assert reference.codes == frozenset(['kaspi'])
+        payload, etag = reference.serialized()
+        assert json.loads(payload) == {'banks': [{'id': 'kaspi', 'name': 'Kaspi Bank'}]}
+        
+        # Файл меняется — справочник перечитывается
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'banks': [{'id': 'kaspi'}, {'id': 'halyk'}]}, f)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        assert 'halyk' in reference.codes
+        assert reference.get('halyk') == {'id': 'halyk'}
+        assert reference.serialized()[1] != etag
+    print("✅ Справочник перечитывается при изменении файла")
+    
+    from app import create_app
+    client = create_app().test_client()
+    response = client.get('/accounts/api/data/currencies')
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    response = client.get('/accounts/api/data/currencies',
+                          headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    print("✅ API справочников отвечает 304 при совпадении ETag")
+
 def test_accounts_models():
     print("🧪 Тестируем модели счетов...")
     
@@ -80,7 +115,7 @@ def test_accounts_models():
             account_type="checking",
             currency="KZT",
             bank_id="kaspi",
-            initial_balance=100000.0
+            initial_balance=10000000
         )
         
         if success:
@@ -95,8 +130,8 @@ def test_accounts_models():
                 # Получаем конкретный счет
                 account = get_account_by_id(account_id, user_id)
                 if account:
-                    print(f"✅ Счет найден: {account['name']}")
-                    print(f"   Баланс: {account['current_balance']} {account['currency']}")
+                    print(f"✅ Счет найден: {account.name}")
+                    print(f"   Баланс: {account.current_balance} {account.currency}")
                     
                     # Обновляем счет
                     success, update_result = update_account(
@@ -134,6 +169,127 @@ def test_accounts_models():
         import traceback
         traceback.print_exc()
 
+def test_conditional_get():
+    print("🧪 Тестируем условные запросы к API счетов...")
+    
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+    
+    from app import create_app
+    from app.db import get_db
+    
+    app = create_app()
+    client = app.test_client()
+    credentials = {'email': 'etag_accounts@example.com', 'password': 'testpass123'}
+    if not client.post('/auth/api/register', json=credentials).json['success']:
+        assert client.post('/auth/api/login', json=credentials).json['success']
+    
+    account_id = client.post('/accounts/api/accounts', json={
+        'name': 'ETag', 'type': 'cash', 'currency': 'KZT'
+    }).json['account_id']
+    
+    first = client.get('/accounts/api/accounts')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith('W/')
+    again = client.get('/accounts/api/accounts', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b'' and again.headers['ETag'] == etag
+    single = client.get(f'/accounts/api/accounts/{account_id}')
+    assert client.get(f'/accounts/api/accounts/{account_id}',
+                      headers={'If-None-Match': single.headers['ETag']}).status_code == 304
+    print("✅ Без изменений данных список и счет отвечают 304 без тела")
+    
+    # Запись транзакции любым путем (здесь — прямой SQL) меняет версию
+    with app.app_context():
+        conn = get_db()
+        conn.execute(
+            '''INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+               VALUES (?, '2024-01-01', 500, 'KZT', 'income', '2024-01-01')''',
+            (account_id,)
+        )
+        conn.commit()
+    changed = client.get('/accounts/api/accounts', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    client.post(f'/accounts/api/accounts/{account_id}/archive')
+    assert client.get('/accounts/api/accounts',
+                      headers={'If-None-Match': changed.headers['ETag']}).status_code == 200
+    print("✅ Запись счета или транзакции меняет ETag")
+
+def test_batch_operations():
+    print("🧪 Тестируем пакетные операции со счетами...")
+    
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+    
+    from app import create_app
+    
+    client = create_app().test_client()
+    credentials = {'email': 'batch_accounts@example.com', 'password': 'testpass123'}
+    if not client.post('/auth/api/register', json=credentials).json['success']:
+        assert client.post('/auth/api/login', json=credentials).json['success']
+    
+    response = client.post('/accounts/api/accounts/batch', json={'operations': [
+        {'action': 'create', 'name': 'Пакет 1', 'type': 'cash', 'currency': 'KZT', 'initial_balance': '12.34'},
+        {'action': 'create', 'name': 'Пакет 2', 'type': 'savings', 'currency': 'USD', 'bank_id': None},
+        {'action': 'create', 'name': 'Без валюты', 'type': 'cash'},
+        {'action': 'archive', 'id': 999999999},
+        {'action': 'explode'}
+    ]}).json
+    assert response['success'] and response['applied'] == 2
+    results = response['results']
+    assert [item['success'] for item in results] == [True, True, False, False, False]
+    assert results[2]['error'] == 'Валюта обязательна' and results[3]['error'] == 'Счет не найден'
+    first, second = results[0]['account_id'], results[1]['account_id']
+    print("✅ Создание в пакете с результатом по каждой операции")
+    
+    for balance in ('1e999999', '1e20'):
+        response = client.post('/accounts/api/accounts', json={
+            'name': 'Огромный', 'type': 'cash', 'currency': 'KZT', 'initial_balance': balance
+        })
+        assert response.json['error'] == 'Неверный формат начального баланса'
+    print("✅ Начальный баланс вне диапазона INTEGER отклоняется проверкой")
+    
+    response = client.post('/accounts/api/accounts/batch', json={'operations': [
+        {'action': 'archive', 'id': first},
+        {'action': 'update', 'id': second, 'name': 'Пакет 2 (USD)'},
+        {'action': 'archive', 'id': second},
+        {'action': 'restore', 'id': second}
+    ]}).json
+    assert response['success'] and response['applied'] == 4
+    accounts = {a['id']: a for a in client.get('/accounts/api/accounts?include_archived=true').json['accounts']}
+    assert accounts[first]['archived'] and accounts[first]['initial_balance'] == 12.34
+    assert not accounts[second]['archived'] and accounts[second]['name'] == 'Пакет 2 (USD)'
+    print("✅ Операции применяются по порядку одной транзакцией")
+    
+    # Валюту меняет только счет без сумм: начальный баланс хранится в ее минимальных единицах
+    response = client.post('/accounts/api/accounts/batch', json={'operations': [
+        {'action': 'update', 'id': first, 'currency': 'JPY'},
+        {'action': 'update', 'id': second, 'currency': 'EUR'}
+    ]}).json
+    assert [item['success'] for item in response['results']] == [False, True]
+    assert 'валюту' in response['results'][0]['error']
+    response = client.put(f'/accounts/api/accounts/{first}', json={'currency': 'JPY'}).json
+    assert not response['success'] and 'валюту' in response['error']
+    assert client.put(f'/accounts/api/accounts/{first}', json={'currency': 'KZT'}).json['success']
+    account = client.get(f'/accounts/api/accounts/{first}').json['account']
+    assert (account['currency'], account['initial_balance']) == ('KZT', 12.34)
+    assert client.get(f'/accounts/api/accounts/{second}').json['account']['currency'] == 'EUR'
+    print("✅ Смена валюты счета с суммами запрещена")
+    
+    response = client.post('/accounts/api/accounts/batch', json={'atomic': True, 'operations': [
+        {'action': 'restore', 'id': first},
+        {'action': 'update', 'id': second, 'currency': 'XXX'}
+    ]}).json
+    assert not response['success'] and response['results'][0]['error'] == 'Пакет отменен'
+    assert client.get(f'/accounts/api/accounts/{first}').json['account']['archived']
+    print("✅ С atomic ошибка в одной операции отменяет весь пакет")
+    
+    assert not client.post('/accounts/api/accounts/batch', json={'operations': []}).json['success']
+    too_many = [{'action': 'archive', 'id': first}] * 101
+    assert not client.post('/accounts/api/accounts/batch', json={'operations': too_many}).json['success']
+    print("✅ Пустой и слишком большой пакет отклоняются")
+
 def test_file_structure():
     print("🧪 Проверяем структуру файлов...")
     
@@ -167,11 +323,14 @@ def main():
         os.makedirs('app/accounts', exist_ok=True)
         
         test_json_files()
+        test_reference_data()
         print()
         
         if test_file_structure():
             print()
             test_accounts_models()
+            test_conditional_get()
+            test_batch_operations()
         
         print("=" * 50)
         print("🎉 Тесты модуля счетов завершены!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Тест отдачи статических файлов: имена с хешем, сжатие, ETag, service worker
+"""
+
+import sys
+import os
+import gzip
+import json
+import re
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def create_client():
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    return app, app.test_client()
+
+def test_hashed_assets():
+    print("🧪 Тестируем файлы с хешем в имени...")
+    app, client = create_client()
+    with app.test_request_context():
+        from flask import url_for
+        url = url_for('static', filename='js/accounts.js')
+    assert re.fullmatch(r'/static/js/accounts\.[0-9a-f]{12}\.js', url), url
+
+    with open('static/js/accounts.js', 'rb') as f:
+        source = f.read()
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert gzip.decompress(response.data) == source and len(response.data) < len(source) / 2
+    print("✅ Неизменный адрес, gzip и кэширование на год")
+
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert plain.data == source and 'Content-Encoding' not in plain.headers
+    assert plain.headers['ETag'] != response.headers['ETag']
+    print("✅ Без Accept-Encoding файл отдается несжатым со своим ETag")
+
+def test_revalidation():
+    print("🧪 Тестируем повторный визит...")
+    app, client = create_client()
+    page = client.get('/auth/login').get_data(as_text=True)
+    urls = re.findall(r'(?:href|src)="(/static/[^"]+)"', page)
+    assert urls and all(re.search(r'\.[0-9a-f]{12}\.', url) for url in urls)
+
+    first = {url: client.get(url, headers={'Accept-Encoding': 'gzip'}) for url in urls}
+    # Повторный визит: файлы с хешем браузер берет из кэша без запроса, а
+    # файлы по исходному имени (fetch данных) проверяются по ETag
+    data = client.get('/static/data/currencies.json', headers={'Accept-Encoding': 'gzip'})
+    assert data.headers['Cache-Control'] == 'no-cache'
+    again = client.get('/static/data/currencies.json',
+                       headers={'Accept-Encoding': 'gzip', 'If-None-Match': data.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+    first_bytes = sum(len(response.data) for response in first.values()) + len(data.data)
+    print(f"✅ Первый визит {first_bytes} байт, повторный: 0 байт тела (304 для данных)")
+
+    assert client.get('/static/../config.py').status_code == 404
+    assert client.get('/static/js/missing.js').status_code == 404
+    print("✅ Выход за пределы static/ и отсутствующие файлы — 404")
+
+def test_service_worker():
+    print("🧪 Тестируем service worker...")
+    app, client = create_client()
+    response = client.get('/sw.js')
+    assert response.status_code == 200 and response.headers['Cache-Control'] == 'no-cache'
+    body = response.get_data(as_text=True)
+    prelude = json.loads(re.match(r'self\.__ASSETS = (.*);\n', body).group(1))
+    assert '/static/js/accounts.js' not in prelude['urls']
+    assert any(re.fullmatch(r'/static/js/accounts\.[0-9a-f]{12}\.js', url) for url in prelude['urls'])
+    assert not any('/sw.' in url for url in prelude['urls'])
+    for url in prelude['urls']:
+        assert client.get(url).status_code == 200
+    assert "'/accounts/api/accounts'" in body
+    print(f"✅ Версия {prelude['version']}, предзагрузка {len(prelude['urls'])} файлов оболочки")
+
+def main():
+    print("🚀 Запуск тестов статических файлов")
+    print("=" * 40)
+
+    try:
+        test_hashed_assets()
+        test_revalidation()
+        test_service_worker()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
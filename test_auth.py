@@ -78,6 +78,94 @@ def test_auth_flow():
         print("❌ Неверный пароль принят!")
         return
 
+def test_password_hasher():
+    print("🧪 Тестируем пул хеширования паролей...")
+    
+    import threading
+    from app.auth.hashing import PasswordHasher, HashingBusy
+    
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=0)
+    password_hash = hasher.hash("password123")
+    assert hasher.verify("password123", password_hash)
+    assert not hasher.verify("wrongpass1", password_hash)
+    assert not hasher.needs_rehash(password_hash)
+    assert PasswordHasher(rounds=5, workers=0).needs_rehash(password_hash)
+    print("✅ Хеширование в пуле и определение устаревшей стоимости работают")
+    
+    # Единственный слот занят вызовом, который ждет события, — следующий отклоняется сразу
+    started, release = threading.Event(), threading.Event()
+    
+    def occupy():
+        started.set()
+        return release.wait(5)
+    
+    slow = PasswordHasher(rounds=4, workers=1, max_pending=0)
+    worker = threading.Thread(target=slow._run, args=(occupy,))
+    worker.start()
+    assert started.wait(5)
+    try:
+        slow.hash("password123")
+        assert False, "Переполненный пул принял задачу"
+    except HashingBusy:
+        print("✅ Переполненная очередь отклоняет запрос")
+    finally:
+        release.set()
+        worker.join()
+    
+    # Поток пула занят напрямую, вызов ждет в очереди дольше timeout —
+    # это перегрузка, а не неверный пароль
+    release = threading.Event()
+    queued = PasswordHasher(rounds=4, workers=1, max_pending=1, timeout=0.01)
+    queued._executor.submit(release.wait, 5)
+    try:
+        queued.verify("password123", password_hash)
+        assert False, "Ожидание пула не ограничено timeout"
+    except HashingBusy:
+        print("✅ Истекшее ожидание пула завершается HashingBusy")
+    
+    from app import create_app
+    app = create_app()
+    app.extensions['password_hasher'] = queued
+    response = app.test_client().post('/auth/api/register', json={
+        'email': 'timeout@example.com', 'password': 'testpass123'
+    })
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    print("✅ Маршруты auth отвечают на перегрузку 503 с Retry-After")
+    release.set()
+    hasher.shutdown()
+    slow.shutdown()
+    queued.shutdown()
+
+def test_rehash_on_login():
+    print("🧪 Тестируем пересчет хеша при входе...")
+    
+    import bcrypt
+    from app.db import get_db
+    from app.auth.hashing import get_hasher
+    
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+    
+    test_email = "rehash@example.com"
+    test_password = "testpass123"
+    success, result = create_user(test_email, test_password)
+    assert success or "уже зарегистрирован" in result
+    
+    # Имитируем хеш, созданный со старой стоимостью
+    conn = get_db()
+    old_hash = bcrypt.hashpw(test_password.encode('utf-8'), bcrypt.gensalt(4))
+    conn.execute('UPDATE users SET password_hash = ? WHERE email = ?', (old_hash, test_email))
+    conn.commit()
+    
+    success, result = verify_user(test_email, test_password)
+    assert success
+    new_hash = conn.execute('SELECT password_hash FROM users WHERE email = ?', (test_email,)).fetchone()[0]
+    assert new_hash != old_hash
+    assert not get_hasher().needs_rehash(new_hash)
+    print("✅ Хеш пересчитан с текущей стоимостью")
+
 def main():
     print("🚀 Запуск тестов аутентификации")
     print("=" * 40)
@@ -85,6 +173,8 @@ def main():
     try:
         test_validators()
         test_auth_flow()
+        test_password_hasher()
+        test_rehash_on_login()
         print("=" * 40)
         print("🎉 Все тесты прошли успешно!")
     except Exception as e:
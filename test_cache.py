@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Тест кэша данных пользователей: LRU, общее хранилище SQLite, кэш счетов
+"""
+
+import sys
+import os
+import tempfile
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache import UserCache, MemoryBackend, SQLiteBackend, cache_stats
+
+def test_memory_lru():
+    print("🧪 Тестируем LRU в памяти...")
+    cache = UserCache('test_memory', backend=MemoryBackend(max_users=2))
+    cache.set(1, 'a', 'one')
+    cache.set(2, 'a', 'two')
+    assert cache.get(1, 'a') == 'one'
+    cache.set(3, 'a', 'three')
+    assert cache.get(2, 'a') is None and cache.get(1, 'a') == 'one'
+    cache.invalidate(1)
+    assert cache.get(1, 'a') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['invalidations']) == (2, 2, 1, 1)
+    assert stats['size'] == 1 and stats['hit_ratio'] == 0.5 and stats['backend'] == 'memory'
+    print("✅ Вытесняется давно не читавшийся пользователь, метрики считаются")
+
+def test_sqlite_backend():
+    print("🧪 Тестируем общее хранилище SQLite...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.db')
+        # Два процесса: у каждого свой объект хранилища над одним файлом
+        first = UserCache('test_shared', backend=SQLiteBackend(path, 'test_shared'))
+        second = UserCache('test_shared', backend=SQLiteBackend(path, 'test_shared'))
+        other = UserCache('test_other', backend=SQLiteBackend(path, 'test_other'))
+
+        value = {'accounts': [{'id': 1, 'balance': 10.5}]}
+        first.set(7, (True, 'USD'), value)
+        other.set(7, (True, 'USD'), 'чужой кэш')
+        assert second.get(7, (True, 'USD')) == value
+        assert second.get(7, (True, 'USD')) is not value
+        second.invalidate(7)
+        assert first.get(7, (True, 'USD')) is None and other.get(7, (True, 'USD')) == 'чужой кэш'
+        print("✅ Значение и сброс видны всем процессам, кэши не пересекаются")
+
+        # Значения хранятся в JSON: типы кэшей приложения восстанавливаются без pickle
+        from datetime import date, datetime
+        from app.accounts.models import Account
+        account = Account(3, 'Карта', 'card', 'KZT', None, 1500.5, 2000.0, 0, '2024-01-01 10:00:00')
+        value = ((datetime(2024, 3, 1, 12, 30), date(2024, 3, 1), 5), [account], {1: 'ключ-число'})
+        first.set(8, 'typed', value)
+        assert second.get(8, 'typed') == value
+        conn = first.backend._connect()
+        stored = conn.execute("SELECT value FROM cache_entries WHERE user_id = 8").fetchone()[0]
+        assert isinstance(stored, str) and '"$record": "Account"' in stored
+        conn.execute("UPDATE cache_entries SET value = ? WHERE user_id = 8", (b'\x80\x05N.',))
+        assert second.get(8, 'typed') is None
+        print("✅ Кортежи, даты и записи хранятся в JSON, запись в прежнем формате — промах")
+
+        bounded = UserCache('test_bounded', backend=SQLiteBackend(path, 'test_bounded', max_entries=50))
+        for user_id in range(200):
+            bounded.set(user_id, 'key', user_id)
+        assert bounded.stats()['size'] <= 50 + 64 and bounded.stats()['evictions'] > 0
+        assert bounded.get(199, 'key') == 199
+        print(f"✅ Размер ограничен: {bounded.stats()['size']} записей после 200 вставок")
+
+def test_accounts_cache():
+    print("🧪 Тестируем кэш счетов...")
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    from app import create_app
+    from app.db import get_db
+    from app.accounts.models import accounts_cache, get_user_accounts, create_account, archive_account
+
+    app = create_app()
+    client = app.test_client()
+    # Метрики кэшей — данные оператора: отдельного маршрута для пользователей нет
+    assert client.get('/api/cache/stats').status_code == 404
+    credentials = {'email': 'cache_accounts@example.com', 'password': 'testpass123'}
+    if not client.post('/auth/api/register', json=credentials).json['success']:
+        assert client.post('/auth/api/login', json=credentials).json['success']
+
+    with app.app_context():
+        user_id = get_db().execute('SELECT id FROM users WHERE email = ?', (credentials['email'],)).fetchone()[0]
+        account_id = int(create_account(user_id, 'Кэш', 'cash', 'USD')[1])
+
+        hits = accounts_cache.hits
+        first = get_user_accounts(user_id)
+        assert get_user_accounts(user_id) is first and accounts_cache.hits == hits + 1
+        assert get_user_accounts(user_id, include_archived=True) is not first
+        print("✅ Повторное чтение — из кэша, флаги — отдельные ключи")
+
+        # Запись транзакции мимо моделей (как воркер импорта в другом процессе)
+        conn = get_db()
+        conn.execute(
+            '''INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+               VALUES (?, '2024-01-01', 1250, 'USD', 'income', '2024-01-01')''',
+            (account_id,)
+        )
+        conn.commit()
+        balance = next(a.current_balance for a in get_user_accounts(user_id) if a.id == account_id)
+        assert balance == 12.5
+        print("✅ Запись из другого процесса меняет версию данных, кэш не отдает старый баланс")
+
+        archive_account(account_id, user_id)
+        assert account_id not in [a.id for a in get_user_accounts(user_id)]
+        print("✅ Архивирование сбрасывает кэш")
+
+    stats = {item['name']: item for item in cache_stats()}
+    assert stats['user_accounts']['hits'] >= 1 and stats['user_accounts']['invalidations'] >= 1
+    print(f"✅ Метрики: {stats['user_accounts']}")
+
+def main():
+    print("🚀 Запуск тестов кэша")
+    print("=" * 40)
+
+    try:
+        test_memory_lru()
+        test_sqlite_backend()
+        test_accounts_cache()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Тест пула соединений с БД
+"""
+
+import sys
+import os
+import tempfile
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import ConnectionPool, PoolTimeout
+
+def test_pool_settings():
+    print("🧪 Тестируем настройки соединений...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(os.path.join(tmp, 'pool.db'), max_size=2)
+        conn = pool.acquire()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+        pool.release(conn)
+        pool.close_all()
+        print("✅ WAL, synchronous=NORMAL и busy_timeout включены")
+
+def test_pool_reuse_and_limit():
+    print("🧪 Тестируем переиспользование и ограничение пула...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(os.path.join(tmp, 'pool.db'), max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.execute('INSERT INTO t VALUES (1)')
+
+        try:
+            pool.acquire()
+            assert False, "Пул выдал больше соединений, чем max_size"
+        except PoolTimeout:
+            print("✅ Пул ограничен max_size")
+
+        # Незакоммиченная запись откатывается при возврате в пул
+        pool.release(conn)
+        again = pool.acquire()
+        assert again is conn
+        assert again.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        pool.release(again)
+        pool.close_all()
+        print("✅ Соединение переиспользуется, незавершенная транзакция откатывается")
+
+def test_request_scoped_connection():
+    print("🧪 Тестируем соединение на время запроса...")
+
+    from app import create_app
+    from app.db import get_db
+
+    app = create_app()
+    with app.app_context():
+        assert get_db() is get_db()
+    print("✅ В пределах запроса используется одно соединение")
+
+def main():
+    print("🚀 Запуск тестов пула соединений")
+    print("=" * 40)
+
+    try:
+        test_pool_settings()
+        test_pool_reuse_and_limit()
+        test_request_scoped_connection()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Тест сервиса курсов валют
+"""
+
+import sys
+import os
+import sqlite3
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.fx.models import RateService, convert_balances
+from app.fx.providers import FileRateProvider, RateProviderError
+
+class FailingProvider:
+    name = 'failing'
+
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        raise RateProviderError("поставщик недоступен")
+
+def test_rate_service():
+    print("🧪 Тестируем кэш курсов...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    service = RateService(FileRateProvider('static/data/rates.json'), ttl=0)
+    snapshot = service.get_rates()
+    assert snapshot.base == 'USD'
+    assert snapshot.rates['USD'] == 1.0
+    assert snapshot.convert(100, 'USD', 'USD') == 100
+    assert abs(snapshot.convert(snapshot.rates['KZT'], 'KZT', 'USD') - 1.0) < 1e-9
+    assert snapshot.convert(1, 'XXX', 'USD') is None
+    print("✅ Курсы загружены из файла и сохранены")
+
+    # Поставщик недоступен — используется последний снимок из БД
+    fallback = RateService(FailingProvider(), ttl=0).get_rates()
+    assert fallback.rates == snapshot.rates
+    print("✅ При недоступности поставщика используется последний снимок")
+
+    provider = FailingProvider()
+    service = RateService(provider, ttl=0, retry_interval=60)
+    for _ in range(5):
+        assert service.get_rates().rates == snapshot.rates
+    assert provider.calls == 1
+    print("✅ После ошибки поставщик не опрашивается до конца паузы")
+
+    empty = RateService(FailingProvider(), ttl=0, retry_interval=60)
+    from app.fx import models as fx_models
+    original_load = fx_models.load_latest_snapshot
+    fx_models.load_latest_snapshot = lambda conn: None
+    try:
+        for _ in range(3):
+            try:
+                empty.get_rates()
+                assert False, 'курсы без снимка'
+            except RateProviderError:
+                pass
+    finally:
+        fx_models.load_latest_snapshot = original_load
+    assert empty.provider.calls == 1
+    print("✅ Без снимка ошибка отдается сразу, без повторных запросов")
+
+    cached = RateService(FileRateProvider('static/data/rates.json'), ttl=3600)
+    assert cached.get_rates() is cached.get_rates()
+    print("✅ Снимок кэшируется в памяти")
+
+def test_convert_balances():
+    print("🧪 Тестируем пакетный пересчет балансов...")
+
+    from datetime import datetime
+    from app.accounts.models import Account
+    from app.fx.models import RateSnapshot
+
+    snapshot = RateSnapshot('USD', {'KZT': 500, 'EUR': 0.5}, 'test', datetime.now())
+    accounts = [
+        Account(1, 'Карта', 'card', 'KZT', None, 0, 1000, False, None),
+        Account(2, 'Евро', 'checking', 'EUR', None, 0, 10, False, None),
+        Account(3, 'Прочее', 'cash', 'XXX', None, 0, 5, False, None),
+    ]
+    result = convert_balances(accounts, 'USD', snapshot)
+    assert result['total'] == 22
+    assert result['missing_rates'] == ['XXX']
+    assert result['accounts'][2]['converted'] is None
+    print("✅ Итог считается на сервере, неизвестные валюты отмечены")
+
+def test_dashboard_summary():
+    print("🧪 Тестируем сводку дашборда...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    from app import create_app
+    from app.fx.models import get_rate_service
+    from app.money import to_minor
+
+    app = create_app()
+    client = app.test_client()
+    credentials = {'email': 'summary@example.com', 'password': 'testpass123'}
+    if not client.post('/auth/api/register', json=credentials).json['success']:
+        assert client.post('/auth/api/login', json=credentials).json['success']
+
+    with app.app_context():
+        rates = get_rate_service().get_rates().rates
+
+    before = client.get('/api/dashboard/summary?currency=USD').json
+    assert before['success']
+
+    response = client.post('/accounts/api/accounts', json={
+        'name': 'Тенге', 'type': 'cash', 'currency': 'KZT', 'initial_balance': rates['KZT'] * 10
+    })
+    assert response.json['success']
+
+    # Создание счета сбрасывает кэш сводки
+    after = client.get('/api/dashboard/summary?currency=USD').json
+    assert after['account_count'] == before['account_count'] + 1
+    assert abs(after['total'] - before['total'] - 10) < 1e-6
+    kzt = [g for g in after['by_currency'] if g['currency'] == 'KZT'][0]
+    assert kzt['account_count'] >= 1
+    assert len(after['accounts']) <= 3
+    print("✅ Сводка считается на сервере и обновляется после записи")
+
+    # Запись из другого процесса видна по версии данных пользователя
+    conn = sqlite3.connect(app.config['DATABASE_PATH'])
+    conn.execute(
+        """INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+           VALUES (?, '2024-01-01', ?, 'KZT', 'income', '2024-01-01')""",
+        (int(response.json['account_id']), to_minor(rates['KZT'] * 50, 'KZT'))
+    )
+    conn.commit()
+    conn.close()
+    external = client.get('/api/dashboard/summary?currency=USD').json
+    assert abs(external['total'] - after['total'] - 50) < 1e-2
+    print("✅ Запись через другое соединение сбрасывает кэш сводки")
+
+def main():
+    print("🚀 Запуск тестов курсов валют")
+    print("=" * 40)
+
+    try:
+        test_rate_service()
+        test_convert_balances()
+        test_dashboard_summary()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Тест генератора синтетической БД: воспроизводимость и согласованность
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import date
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import generate
+from app.accounts.ledger import check_ledger
+from app.reports.rollups import check_rollups
+from app.transactions.dedupe import transaction_fingerprint
+
+def snapshot(path):
+    conn = sqlite3.connect(path)
+    try:
+        return (conn.execute('SELECT * FROM accounts ORDER BY id').fetchall(),
+                conn.execute('SELECT * FROM transactions ORDER BY id').fetchall())
+    finally:
+        conn.close()
+
+def test_generate():
+    print("🧪 Тестируем генерацию БД...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'generated.db')
+        end = date(2024, 6, 30)
+        generate(path, 20, 60, 3000, seed=7, days=90, end=end, log=lambda message: None)
+
+        conn = sqlite3.connect(path)
+        assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 20
+        assert conn.execute('SELECT COUNT(*) FROM accounts').fetchone()[0] == 60
+        assert conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == 3000
+        assert conn.execute('SELECT COUNT(DISTINCT user_id) FROM accounts').fetchone()[0] == 20
+        first, last = conn.execute('SELECT MIN(date), MAX(date) FROM transactions').fetchone()
+        assert '2024-04-02' <= first and last <= '2024-06-30'
+        date_, amount, description, fingerprint = conn.execute(
+            'SELECT date, amount, description, fingerprint FROM transactions LIMIT 1').fetchone()
+        assert fingerprint == transaction_fingerprint(date_, amount, description)
+        print("✅ Заданное число строк, у каждого пользователя есть счет, отпечатки совпадают с импортом")
+
+        assert check_ledger(conn) == [] and check_rollups(conn) == []
+        matches = conn.execute("SELECT COUNT(*) FROM transactions_fts WHERE transactions_fts MATCH 'magnum'").fetchone()[0]
+        assert matches > 0
+        print(f"✅ Реестр остатков и итоги согласованы, поиск находит {matches} строк")
+
+        # Триггеры возвращены: новая транзакция сразу меняет реестр
+        account_id, before = conn.execute('SELECT account_id, balance FROM account_balances LIMIT 1').fetchone()
+        conn.execute(
+            '''INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+               SELECT id, '2024-07-01', 100, currency, 'income', '2024-07-01' FROM accounts WHERE id = ?''',
+            (account_id,)
+        )
+        assert conn.execute('SELECT balance FROM account_balances WHERE account_id = ?',
+                            (account_id,)).fetchone()[0] == before + 100
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        conn.close()
+        print("✅ Индексы, триггеры и режим WAL восстановлены")
+
+        again = os.path.join(directory, 'again.db')
+        generate(again, 20, 60, 3000, seed=7, days=90, end=end, workers=2, log=lambda message: None)
+        assert snapshot(again) == snapshot(path)
+        print("✅ Тот же seed дает ту же БД и при генерации в нескольких процессах")
+
+def main():
+    print("🚀 Запуск тестов генератора данных")
+    print("=" * 40)
+
+    try:
+        test_generate()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Тест импорта банковских выписок
+"""
+
+import sys
+import os
+import io
+from decimal import Decimal
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.transactions import importer
+from app.transactions.importer import parse_amount, iter_csv_rows, iter_ofx_rows, StatementError
+
+KASPI_CSV = '''Дата;Сумма;Операция;Детали
+05.01.24;- 5 000,50 ₸;Покупка;Magnum
+03.01.24;+ 100 000,00 ₸;Пополнение;Перевод
+бред;- 1,00 ₸;Покупка;Small
+'''
+
+OFX = '''OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>USD
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240110120000
+<TRNAMT>-12.50
+<NAME>Starbucks
+<MEMO>Кофе
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>1,000.00<NAME>Salary</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+'''
+
+def test_parsers():
+    print("🧪 Тестируем разбор выписок...")
+
+    assert parse_amount('- 5 000,50 ₸') == Decimal('-5000.50')
+    assert parse_amount('+1234.5') == Decimal('1234.5')
+    assert parse_amount('-1,234.56') == Decimal('-1234.56')
+    print("✅ Суммы в форматах банков распознаются")
+
+    rows = list(iter_csv_rows(io.StringIO(KASPI_CSV), 'kaspi', 'KZT'))
+    assert rows[0] == (2, ('2024-01-05', -5000.5, 'KZT', 'Покупка: Magnum'), None)
+    assert rows[1][1][1] == 100000
+    assert rows[2][0] == 4 and rows[2][1] is None and rows[2][2]
+    print("✅ CSV Kaspi разобран, ошибочная строка отмечена номером")
+
+    try:
+        list(iter_csv_rows(io.StringIO(KASPI_CSV), 'halyk', 'KZT'))
+        assert False, "чужой формат принят"
+    except StatementError as e:
+        assert 'halyk' in str(e) and 'Дата операции' in str(e)
+    print("✅ Явно заданный формат, не подходящий к заголовку, отклоняется")
+
+    # Маленький блок чтения проверяет перенос транзакций через границу блоков
+    original = importer.OFX_CHUNK_SIZE
+    try:
+        for chunk_size in (7, 64, original):
+            importer.OFX_CHUNK_SIZE = chunk_size
+            rows = [parsed for _, parsed, _ in iter_ofx_rows(io.StringIO(OFX), 'KZT')]
+            assert rows == [
+                ('2024-01-10', -12.5, 'USD', 'Starbucks: Кофе'),
+                ('2024-01-11', 1000.0, 'USD', 'Salary'),
+            ], rows
+    finally:
+        importer.OFX_CHUNK_SIZE = original
+    print("✅ OFX (SGML) разобран потоково")
+
+def test_import_endpoint():
+    print("🧪 Тестируем импорт выписки через API...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    credentials = {'email': 'import@example.com', 'password': 'testpass123'}
+    if not client.post('/auth/api/register', json=credentials).json['success']:
+        assert client.post('/auth/api/login', json=credentials).json['success']
+
+    response = client.post('/accounts/api/accounts', json={
+        'name': 'Kaspi Gold', 'type': 'checking', 'currency': 'KZT', 'initial_balance': 1000
+    })
+    account_id = response.json['account_id']
+
+    response = client.post('/transactions/api/import', data={
+        'account_id': str(account_id),
+        'file': (io.BytesIO(KASPI_CSV.encode('utf-8')), 'kaspi.csv')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    print("✅ Загрузка сразу возвращает ID задачи")
+
+    from app.jobs.worker import work_until_empty
+    assert work_until_empty() >= 1
+
+    job = client.get(f'/jobs/api/jobs/{job_id}').json['job']
+    assert job['status'] == 'done', job
+    summary = job['result']
+    assert summary['file'] == 'kaspi.csv' and summary['format'] == 'kaspi'
+    assert summary['imported'] == 2 and summary['skipped'] == 1
+    assert (summary['date_from'], summary['date_to']) == ('2024-01-03', '2024-01-05')
+    print("✅ Воркер импортировал выписку, сводка доступна в статусе задачи")
+
+    account = client.get(f'/accounts/api/accounts/{account_id}').json['account']
+    assert account['current_balance'] == 1000 + 100000 - 5000.5
+    days = client.get(f'/accounts/api/accounts/{account_id}/balances').json['balances']
+    assert [d['balance'] for d in days] == [101000, 95999.5]
+    print("✅ Баланс и дневные остатки обновлены после импорта")
+
+    response = client.post('/transactions/api/import', data={
+        'account_id': '999999',
+        'file': (io.BytesIO(b'date,amount,description\n'), 'x.csv')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 404
+    print("✅ Импорт в чужой счет запрещен")
+
+    response = client.post('/transactions/api/import', data={
+        'account_id': str(account_id),
+        'format': 'sberbank',
+        'file': (io.BytesIO(KASPI_CSV.encode('utf-8')), 'kaspi.csv')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    print("✅ Неизвестный формат отклоняется до постановки в очередь")
+
+def test_duplicates():
+    print("🧪 Тестируем поиск дублей при импорте...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    import tempfile
+    from app.auth.models import create_user, verify_user
+    from app.accounts.models import create_account, get_account_by_id
+    from app.transactions.importer import StatementImporter
+    from app.transactions.dedupe import transaction_fingerprint
+
+    assert transaction_fingerprint('2024-01-05', -1000, ' Magnum  Almaty') == \
+        transaction_fingerprint('2024-01-05', -1000, 'magnum almaty')
+    assert transaction_fingerprint('2024-01-05', -1000, 'Magnum') != \
+        transaction_fingerprint('2024-01-06', -1000, 'Magnum')
+    print("✅ Отпечаток не зависит от регистра и пробелов")
+
+    success, user_id = create_user('dedupe@example.com', 'testpass123')
+    if not success:
+        success, user_id = verify_user('dedupe@example.com', 'testpass123')
+    success, account_id = create_account(user_id, 'Дубли', 'checking', 'KZT')
+    account_id = int(account_id)
+
+    def write(text):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    # Две одинаковые покупки за день — не дубли
+    first = write('date,amount,description\n2024-02-01,-500,Coffee\n2024-02-01,-500,Coffee\n'
+                  '2024-02-02,-100,Bus\n')
+    # Пересекающаяся выписка: повтор 2 февраля, одна новая покупка кофе и новый день
+    second = write('date,amount,description\n2024-02-01,-500,Coffee\n2024-02-01,-500,Coffee\n'
+                   '2024-02-01,-500,Coffee\n2024-02-02,-100,Bus\n2024-02-03,-50,Bread\n')
+    # Та же строка, что и в первой выписке, но с другим регистром и пробелами
+    third = write('date,amount,description\n2024-02-02,-100,  BUS \n')
+    # Сумма вне диапазона INTEGER — ошибка строки, а не всего импорта
+    huge = write('date,amount,description\n2024-02-04,-100000000000000000000,Yacht\n')
+    try:
+        statement_importer = StatementImporter(account_id, user_id)
+        assert statement_importer.import_file(first)['imported'] == 3
+        again = statement_importer.import_file(second)
+        assert (again['imported'], again['duplicates']) == (2, 3), again
+        print("✅ Пересекающаяся выписка добавляет только новые строки")
+
+        assert StatementImporter(account_id, user_id).import_file(third)['imported'] == 1
+        fuzzy = StatementImporter(account_id, user_id, dedupe='fuzzy').import_file(third)
+        assert (fuzzy['imported'], fuzzy['duplicates']) == (0, 1), fuzzy
+        print("✅ Режим fuzzy находит дубли с другим регистром и пробелами")
+
+        assert StatementImporter(account_id, user_id, dedupe='off').import_file(first)['imported'] == 3
+
+        skipped = StatementImporter(account_id, user_id).import_file(huge)
+        assert (skipped['imported'], skipped['skipped']) == (0, 1) and 'Строка 2' in skipped['errors'][0]
+    finally:
+        for path in (first, second, third, huge):
+            os.remove(path)
+
+    account = get_account_by_id(account_id, user_id)
+    assert account.current_balance == -(500 * 3 + 100 + 50 + 100) - (500 * 2 + 100)
+    print("✅ Режим off импортирует все строки")
+
+    # Выписка в долларах не попадает на тенговый счет
+    fd, path = tempfile.mkstemp(suffix='.ofx')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(OFX)
+    try:
+        foreign = StatementImporter(account_id, user_id).import_file(path, 'ofx')
+    finally:
+        os.remove(path)
+    assert (foreign['imported'], foreign['skipped']) == (0, 2), foreign
+    assert 'валюта USD не совпадает с валютой счета KZT' in foreign['errors'][0]
+    assert get_account_by_id(account_id, user_id).current_balance == account.current_balance
+    print("✅ Строки в валюте, отличной от валюты счета, отклоняются")
+
+def main():
+    print("🚀 Запуск тестов импорта выписок")
+    print("=" * 40)
+
+    try:
+        test_parsers()
+        test_import_endpoint()
+        test_duplicates()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
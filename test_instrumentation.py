@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Тест инструментирования запросов: Server-Timing, /metrics, профили cProfile
+"""
+
+import sys
+import os
+import pstats
+import re
+import sqlite3
+import tempfile
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+def create_instrumented_app(directory, **settings):
+    """Приложение с инструментированием над отдельной БД в directory"""
+    from app import create_app
+    from app.migrations import migrate
+
+    path = os.path.join(directory, 'instrumented.db')
+    conn = sqlite3.connect(path)
+    migrate(conn, log=lambda message: None)
+    conn.close()
+
+    overrides = dict(settings, INSTRUMENTATION_ENABLED=True)
+    saved = {name: getattr(Config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    try:
+        app = create_app()
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+    app.config['DATABASE_PATH'] = path
+    return app
+
+def timings(response):
+    """Server-Timing как {метрика: (мс, описание)}"""
+    result = {}
+    for part in response.headers['Server-Timing'].split(', '):
+        match = re.fullmatch(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', part)
+        assert match, part
+        result[match[1]] = (float(match[2]), match[3])
+    return result
+
+def test_server_timing():
+    print("🧪 Тестируем Server-Timing...")
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_instrumented_app(directory)
+        client = app.test_client()
+        credentials = {'email': 'timing@example.com', 'password': 'testpass123'}
+        assert client.post('/auth/api/register', json=credentials).json['success']
+
+        login = timings(client.post('/auth/api/login', json=credentials))
+        assert login['bcrypt'][0] > 0 and login['app'][0] >= login['bcrypt'][0]
+        print(f"✅ Вход: bcrypt {login['bcrypt'][0]} мс из {login['app'][0]} мс")
+
+        client.post('/accounts/api/accounts', json={'name': 'Счет', 'type': 'cash', 'currency': 'USD'})
+        accounts = timings(client.get('/accounts/api/accounts'))
+        statements = int(accounts['sql'][1].split()[0])
+        assert statements >= 2 and accounts['json'][0] > 0 and 'bcrypt' not in accounts
+        print(f"✅ Список счетов: {statements} выражений SQL за {accounts['sql'][0]} мс, JSON {accounts['json'][0]} мс")
+
+        # Без сессии запросов к БД нет
+        anonymous = app.test_client().get('/accounts/api/accounts')
+        assert anonymous.status_code == 401 and 'sql' not in timings(anonymous)
+        print("✅ Учитываются только операции самого запроса")
+
+def test_shared_database():
+    print("🧪 Тестируем пулы приложений над одной БД...")
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_instrumented_app(directory)
+        from app import create_app
+        plain = create_app()
+        plain.config['DATABASE_PATH'] = app.config['DATABASE_PATH']
+
+        # Первым пул для файла создает приложение без инструментирования
+        credentials = {'email': 'shared@example.com', 'password': 'testpass123'}
+        assert plain.test_client().post('/auth/api/register', json=credentials).json['success']
+
+        client = app.test_client()
+        assert client.post('/auth/api/login', json=credentials).json['success']
+        accounts = timings(client.get('/accounts/api/accounts'))
+        assert int(accounts['sql'][1].split()[0]) >= 1
+        print("✅ Приложение с инструментированием учитывает SQL и после пула без него")
+
+def test_metrics():
+    print("🧪 Тестируем /metrics...")
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_instrumented_app(directory)
+        client = app.test_client()
+        credentials = {'email': 'metrics@example.com', 'password': 'testpass123'}
+        client.post('/auth/api/register', json=credentials)
+        for _ in range(3):
+            client.get('/accounts/api/accounts')
+
+        response = client.get('/metrics')
+        assert response.status_code == 200 and response.mimetype == 'text/plain'
+        text = response.get_data(as_text=True)
+        assert ('moneyapp_http_requests_total{endpoint="accounts.api_get_accounts",'
+                'method="GET",status="200"} 3') in text
+        assert 'moneyapp_http_request_duration_seconds_count{endpoint="accounts.api_get_accounts"} 3' in text
+        assert 'moneyapp_http_request_duration_seconds_bucket{endpoint="accounts.api_get_accounts",le="+Inf"} 3' in text
+        assert re.search(r'moneyapp_sql_operations_total\{endpoint="auth.api_register"\} [1-9]', text)
+        assert re.search(r'moneyapp_bcrypt_duration_seconds_total\{endpoint="auth.api_register"\} 0\.\d*[1-9]', text)
+        assert 'moneyapp_cache_hits_total{cache="user_accounts",backend="memory"}' in text
+        print("✅ Счетчики запросов, гистограмма времени, SQL, bcrypt и кэши в формате Prometheus")
+
+    from app import create_app
+    plain = create_app().test_client()
+    assert plain.get('/metrics').status_code == 404
+    assert 'Server-Timing' not in plain.get('/auth/login').headers
+    print("✅ Без INSTRUMENTATION_ENABLED инструментирование выключено")
+
+def test_profiles():
+    print("🧪 Тестируем профили медленных запросов...")
+    with tempfile.TemporaryDirectory() as directory:
+        profiles = os.path.join(directory, 'profiles')
+        app = create_instrumented_app(directory, PROFILE_SAMPLE_RATE=1.0, PROFILE_SLOW_MS=0,
+                                      PROFILE_DIR=profiles)
+        client = app.test_client()
+        client.post('/auth/api/register', json={'email': 'profile@example.com', 'password': 'testpass123'})
+        client.get('/accounts/api/accounts')
+
+        files = sorted(os.listdir(profiles))
+        assert len(files) == 2 and files[0].endswith('ms.prof'), files
+        assert any('accounts.api_get_accounts' in name for name in files)
+        stats = pstats.Stats(os.path.join(profiles, files[0]))
+        assert any(function[2] == 'api_register' for function in stats.stats)
+        assert 'moneyapp_profiles_saved_total 2' in client.get('/metrics').get_data(as_text=True)
+        print(f"✅ Сохранены профили: {', '.join(files)}")
+
+        fast = create_instrumented_app(directory, PROFILE_SAMPLE_RATE=1.0, PROFILE_SLOW_MS=10 ** 6,
+                                       PROFILE_DIR=profiles)
+        # Профиль самого запроса /metrics сохраняется после ответа
+        assert len(os.listdir(profiles)) == 3
+        fast.test_client().get('/auth/login')
+        assert len(os.listdir(profiles)) == 3
+        print("✅ Быстрые запросы не сохраняются")
+
+def main():
+    print("🚀 Запуск тестов инструментирования")
+    print("=" * 40)
+
+    try:
+        test_server_timing()
+        test_shared_database()
+        test_metrics()
+        test_profiles()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
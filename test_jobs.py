@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Тест очереди фоновых задач
+"""
+
+import sys
+import os
+import time
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import get_db
+from app.jobs import worker
+from app.jobs.models import enqueue_job, claim_job, complete_job, heartbeat_job, requeue_stale_jobs
+from app.jobs.worker import PermanentJobError, WorkerPool, run_job, work_until_empty
+from app.ocr_processor import parse_receipt
+
+def setup_user():
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    from app.auth.models import create_user, verify_user
+    success, user_id = create_user('jobs@example.com', 'testpass123')
+    if not success:
+        success, user_id = verify_user('jobs@example.com', 'testpass123')
+    return user_id
+
+def job_status(job_id):
+    row = get_db().execute('SELECT status, attempts, run_after, error FROM jobs WHERE id = ?',
+                           (job_id,)).fetchone()
+    return dict(row)
+
+def test_retries():
+    print("🧪 Тестируем повторы задач...")
+    user_id = setup_user()
+    conn = get_db()
+    work_until_empty()
+
+    calls = []
+
+    def flaky(job):
+        calls.append(job['attempts'])
+        if len(calls) < 2:
+            raise RuntimeError("временная ошибка")
+        return {'attempts': job['attempts']}
+
+    def broken(job):
+        raise PermanentJobError("плохой файл")
+
+    worker.JOB_HANDLERS['test_flaky'] = flaky
+    worker.JOB_HANDLERS['test_broken'] = broken
+    try:
+        flaky_id = enqueue_job(user_id, 'test_flaky', {})
+        broken_id = enqueue_job(user_id, 'test_broken', {})
+
+        assert run_job(conn, claim_job(conn), retry_delay=0) == 'queued'
+        assert run_job(conn, claim_job(conn), retry_delay=0) == 'failed'
+        assert job_status(broken_id)['attempts'] == 1
+        print("✅ Постоянная ошибка не повторяется")
+
+        assert work_until_empty(retry_delay=0) == 1
+        assert job_status(flaky_id)['status'] == 'done'
+        assert calls == [1, 2]
+        print("✅ Временная ошибка повторяется")
+
+        # Задержка повтора растет экспоненциально
+        calls.clear()
+        delayed_id = enqueue_job(user_id, 'test_flaky', {})
+        run_job(conn, claim_job(conn), retry_delay=60)
+        assert job_status(delayed_id)['status'] == 'queued'
+        assert claim_job(conn) is None
+        print("✅ Повтор откладывается")
+        conn.execute("UPDATE jobs SET status = 'failed' WHERE id = ?", (delayed_id,))
+        conn.commit()
+    finally:
+        del worker.JOB_HANDLERS['test_flaky']
+        del worker.JOB_HANDLERS['test_broken']
+
+def test_stale_jobs():
+    print("🧪 Тестируем возврат зависших задач...")
+    user_id = setup_user()
+    conn = get_db()
+    work_until_empty()
+
+    job_id = enqueue_job(user_id, 'test_missing', {})
+    claim_job(conn)
+    assert requeue_stale_jobs(conn, lock_timeout=3600) == 0
+    assert requeue_stale_jobs(conn, lock_timeout=-1) == 1
+    assert job_status(job_id)['status'] == 'queued'
+    print("✅ Задача упавшего воркера возвращена в очередь")
+
+    run_job(conn, claim_job(conn))
+    assert job_status(job_id)['status'] == 'failed'
+    print("✅ Неизвестный тип задачи не повторяется")
+
+def test_job_ownership():
+    print("🧪 Тестируем владение задачей...")
+    user_id = setup_user()
+    conn = get_db()
+    work_until_empty()
+
+    worker.JOB_HANDLERS['test_done'] = lambda job: {'ok': True}
+    try:
+        job_id = enqueue_job(user_id, 'test_done', {})
+        first = claim_job(conn)
+        assert heartbeat_job(conn, job_id, first['attempts'])
+        requeue_stale_jobs(conn, lock_timeout=-1)
+        second = claim_job(conn)
+        assert second['attempts'] == first['attempts'] + 1
+        assert not heartbeat_job(conn, job_id, first['attempts'])
+        assert not complete_job(conn, job_id, first['attempts'], {'ok': False})
+        assert run_job(conn, first) == 'lost'
+        assert job_status(job_id)['status'] == 'running'
+        print("✅ Прежний воркер не завершает задачу, забранную другим")
+
+        assert run_job(conn, second) == 'done'
+        assert job_status(job_id)['status'] == 'done'
+        print("✅ Текущий владелец завершает задачу")
+    finally:
+        del worker.JOB_HANDLERS['test_done']
+
+    # Импорт, убитый после зафиксированной пачки, не повторяется
+    path = 'uploads/temp/test_jobs_stale.csv'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('date,amount,description\n2024-03-01,-10.00,Кофе\n')
+    job_id = enqueue_job(user_id, 'import_statement', {'path': path, 'account_id': 0})
+    job = claim_job(conn)
+    assert heartbeat_job(conn, job_id, job['attempts'], committed_rows=1)
+    assert requeue_stale_jobs(conn, lock_timeout=-1) == 1
+    status = job_status(job_id)
+    assert status['status'] == 'failed' and '1 зафиксированных строк' in status['error']
+    assert not os.path.exists(path)
+    print("✅ Зависший импорт с зафиксированными строками завершается отказом, файл удален")
+
+def test_worker_pool():
+    print("🧪 Тестируем пул процессов-воркеров...")
+    user_id = setup_user()
+    work_until_empty()
+
+    from app.accounts.models import create_account, get_account_by_id, get_user_accounts
+    success, account_id = create_account(user_id, 'Фоновый импорт', 'checking', 'KZT')
+    assert success
+    # Список счетов попадает в кэш до импорта в других процессах
+    assert get_user_accounts(user_id)
+
+    job_ids = []
+    for number in range(4):
+        path = f'uploads/temp/test_jobs_{number}.csv'
+        with open(path, 'w', encoding='utf-8') as f:
+            # Разные даты, чтобы повторные строки не отсеялись как дубли
+            f.write(f'date,amount,description\n2024-03-0{number + 1},-10.00,Кофе\n'
+                    f'2024-04-0{number + 1},-5.00,Хлеб\n')
+        job_ids.append(enqueue_job(user_id, 'import_statement',
+                                   {'path': path, 'account_id': int(account_id)}))
+
+    pool = WorkerPool(workers=2, poll_interval=0.05)
+    pool.start()
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            if all(job_status(job_id)['status'] == 'done' for job_id in job_ids):
+                break
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    assert all(job_status(job_id)['status'] == 'done' for job_id in job_ids)
+    assert get_account_by_id(int(account_id), user_id).current_balance == -60
+    cached = next(a for a in get_user_accounts(user_id) if a.id == int(account_id))
+    assert cached.current_balance == -60
+    assert not any(os.path.exists(f'uploads/temp/test_jobs_{number}.csv') for number in range(4))
+    print("✅ Воркеры выполнили задачи и удалили загруженные файлы, кэш счетов видит импорт")
+
+def test_parse_receipt():
+    print("🧪 Тестируем разбор текста чека...")
+    receipt = parse_receipt("ТОО Magnum\n12.03.2024 18:45\nМолоко 450,00\nИТОГО: 1 250,50\n")
+    assert receipt['total'] == 1250.5
+    assert receipt['date'] == '2024-03-12'
+    print("✅ Сумма и дата найдены")
+
+def main():
+    print("🚀 Запуск тестов очереди задач")
+    print("=" * 40)
+
+    try:
+        test_retries()
+        test_stale_jobs()
+        test_job_ownership()
+        test_worker_pool()
+        test_parse_receipt()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Тест реестра балансов: инкрементальное обновление триггерами и пересчет
+"""
+
+import sys
+import os
+import sqlite3
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.accounts.ledger import (
+    ensure_ledger_schema, rebuild_ledger, check_ledger, get_daily_balances,
+    suspend_ledger, resume_ledger, apply_ledger_delta
+)
+
+def create_test_db():
+    conn = sqlite3.connect(':memory:')
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    ensure_ledger_schema(conn)
+
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('l@example.com', 'x', '2024-01-01')")
+    for name in ('Первый', 'Второй'):
+        conn.execute(
+            '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+               VALUES (1, ?, 'checking', 'KZT', 0, '2024-01-01')''',
+            (name,)
+        )
+    conn.commit()
+    return conn
+
+def add_transaction(conn, account_id, date, amount, status='confirmed'):
+    cursor = conn.execute(
+        '''INSERT INTO transactions (account_id, date, amount, currency, type, status, created_at)
+           VALUES (?, ?, ?, 'KZT', 'expense', ?, '2024-01-01')''',
+        (account_id, date, amount, status)
+    )
+    return cursor.lastrowid
+
+def balance(conn, account_id):
+    row = conn.execute('SELECT balance FROM account_balances WHERE account_id = ?', (account_id,)).fetchone()
+    return row[0] if row else 0
+
+def test_incremental_updates():
+    print("🧪 Тестируем инкрементальное обновление реестра...")
+    conn = create_test_db()
+
+    add_transaction(conn, 1, '2024-01-02', 100)
+    add_transaction(conn, 1, '2024-01-05', -30)
+    pending_id = add_transaction(conn, 1, '2024-01-03', 50, status='pending')
+    assert balance(conn, 1) == 70
+    print("✅ Вставка учитывает только подтвержденные транзакции")
+
+    # Подтверждение задним числом сдвигает остатки последующих дней
+    conn.execute("UPDATE transactions SET status = 'confirmed' WHERE id = ?", (pending_id,))
+    assert balance(conn, 1) == 120
+    days = get_daily_balances(conn, 1)
+    assert [(d['date'], d['balance']) for d in days] == [
+        ('2024-01-02', 100), ('2024-01-03', 150), ('2024-01-05', 120)
+    ]
+    print("✅ Подтверждение обновляет баланс и дневные снимки")
+
+    # Перенос транзакции на другой счет и другую дату
+    conn.execute("UPDATE transactions SET account_id = 2, date = '2024-02-01', amount = 40 WHERE id = ?", (pending_id,))
+    assert balance(conn, 1) == 70
+    assert balance(conn, 2) == 40
+    assert '2024-01-03' not in [d['date'] for d in get_daily_balances(conn, 1)]
+    print("✅ Редактирование переносит сумму между счетами и днями")
+
+    conn.execute('DELETE FROM transactions WHERE id = ?', (pending_id,))
+    assert balance(conn, 2) == 0
+    assert get_daily_balances(conn, 2) == []
+    assert check_ledger(conn) == []
+    print("✅ Удаление снимает сумму, реестр согласован")
+
+def test_check_and_rebuild():
+    print("🧪 Тестируем сверку и пересчет реестра...")
+    conn = create_test_db()
+
+    add_transaction(conn, 1, '2024-01-02', 100)
+    add_transaction(conn, 2, '2024-01-03', 25)
+    conn.execute('UPDATE account_balances SET balance = 999 WHERE account_id = 1')
+    conn.execute("DELETE FROM account_daily_balances WHERE account_id = 2")
+    conn.commit()
+
+    problems = check_ledger(conn)
+    assert {p['account_id'] for p in problems} == {1, 2}
+    print("✅ Расхождения обнаружены")
+
+    rebuild_ledger(conn, [1, 2])
+    assert check_ledger(conn) == []
+    assert balance(conn, 1) == 100
+    print("✅ Пересчет восстановил реестр")
+
+def test_bulk_delta():
+    print("🧪 Тестируем пакетное обновление реестра...")
+    conn = create_test_db()
+
+    add_transaction(conn, 1, '2024-01-02', 100)
+    add_transaction(conn, 1, '2024-01-10', -20)
+
+    # Пачка задним числом: триггеры отключены, остатки пересчитываются один раз
+    batch = [('2024-01-05', -10), ('2024-01-01', 5), ('2024-01-05', -15), ('2024-01-10', 1)]
+    day_totals = {}
+    suspend_ledger(conn, 1)
+    for date, amount in batch:
+        add_transaction(conn, 1, date, amount)
+        total = day_totals.setdefault(date, [0, 0])
+        total[0] += amount
+        total[1] += 1
+    resume_ledger(conn, 1)
+    apply_ledger_delta(conn, 1, day_totals)
+    conn.commit()
+
+    assert balance(conn, 1) == 61
+    assert [(d['date'], d['balance']) for d in get_daily_balances(conn, 1)] == [
+        ('2024-01-01', 5), ('2024-01-02', 105), ('2024-01-05', 80), ('2024-01-10', 61)
+    ]
+    assert check_ledger(conn) == []
+
+    # После снятия отметки триггеры снова работают
+    add_transaction(conn, 1, '2024-01-03', 9)
+    assert balance(conn, 1) == 70
+    assert check_ledger(conn) == []
+    print("✅ Пакетная вставка согласована с построчными триггерами")
+
+def main():
+    print("🚀 Запуск тестов реестра балансов")
+    print("=" * 40)
+
+    try:
+        test_incremental_updates()
+        test_check_and_rebuild()
+        test_bulk_delta()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Тест миграций схемы: новая БД, старая БД с REAL-суммами, продолжение после сбоя
+"""
+
+import sys
+import os
+import sqlite3
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.migrations import MIGRATIONS, Migration, migrate, pending_migrations
+from app.accounts.ledger import check_ledger
+from app.reports.rollups import check_rollups
+from app.transactions.dedupe import transaction_fingerprint
+
+# Схема до перевода сумм в минимальные единицы и до отпечатков транзакций
+LEGACY_SCHEMA = '''
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    password_hash BLOB NOT NULL,
+    created_at DATETIME NOT NULL
+);
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    bank_id TEXT,
+    initial_balance DECIMAL(10,2) DEFAULT 0,
+    archived INTEGER DEFAULT 0,
+    created_at DATETIME NOT NULL
+);
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    currency TEXT NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL,
+    status TEXT DEFAULT 'confirmed',
+    created_at DATETIME NOT NULL
+);
+'''
+
+def quiet(message):
+    pass
+
+def create_legacy_db():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('m@example.com', 'x', '2024-01-01')")
+    for currency, initial in (('USD', 10.5), ('JPY', 1000.0)):
+        conn.execute(
+            '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+               VALUES (1, ?, 'checking', ?, ?, '2024-01-01')''',
+            (currency, currency, initial)
+        )
+    rows = [(1, f'2024-0{i % 3 + 1}-1{i % 10}', (0.1, 0.2, -0.35)[i % 3], 'USD', 'Кофе') for i in range(150)]
+    rows += [(2, '2024-02-01', -250.0, 'JPY', 'Рамен')] * 100
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency, description, type, created_at)
+           VALUES (?, ?, ?, ?, ?, 'expense', '2024-01-01')''',
+        rows
+    )
+    conn.commit()
+    return conn
+
+def test_new_database():
+    print("🧪 Тестируем создание новой БД...")
+    conn = sqlite3.connect(':memory:')
+    applied = migrate(conn, log=quiet)
+    assert [item.version for item in applied] == [item.version for item in MIGRATIONS]
+    versions = [row[0] for row in conn.execute('SELECT version FROM schema_version ORDER BY version')]
+    assert versions == [item.version for item in MIGRATIONS]
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+    assert pending_migrations(conn) == [] and migrate(conn, log=quiet) == []
+    print("✅ Схема создана, все миграции отмечены, повторный запуск ничего не делает")
+
+def test_legacy_database():
+    print("🧪 Тестируем обновление старой БД...")
+    conn = create_legacy_db()
+
+    planned = migrate(conn, dry_run=True, log=quiet)
+    assert len(planned) == len(MIGRATIONS)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'users', 'accounts', 'transactions', 'sqlite_sequence'}
+    assert conn.execute('SELECT amount FROM transactions WHERE id = 1').fetchone()[0] == 0.1
+    print("✅ Режим dry-run не меняет БД")
+
+    # Мелкие пачки: каждое заполнение проходит несколько commit
+    migrate(conn, batch_size=40, log=quiet)
+    assert conn.execute("SELECT COUNT(*) FROM transactions WHERE typeof(amount) != 'integer'").fetchone()[0] == 0
+    assert [row[0] for row in conn.execute('SELECT initial_balance FROM accounts ORDER BY id')] == [1050, 1000]
+    assert [row[0] for row in conn.execute('SELECT balance FROM account_balances ORDER BY account_id')] == \
+        [50 * (10 + 20 - 35), -25000]
+    assert check_ledger(conn) == [] and check_rollups(conn) == []
+    assert conn.execute('SELECT COUNT(*) FROM transactions WHERE fingerprint IS NULL').fetchone()[0] == 0
+    assert conn.execute('SELECT fingerprint FROM transactions WHERE account_id = 2').fetchone()[0] == \
+        transaction_fingerprint('2024-02-01', -250, 'Рамен')
+    found = conn.execute("SELECT COUNT(*) FROM transactions_fts WHERE transactions_fts MATCH 'рамен'").fetchone()[0]
+    assert found == 100
+    assert conn.execute('SELECT COUNT(*) FROM schema_backfills').fetchone()[0] == 0
+    assert migrate(conn, log=quiet) == []
+    print("✅ Суммы переведены, реестр, итоги, отпечатки и поиск согласованы")
+
+def test_resume_after_failure():
+    print("🧪 Тестируем продолжение прерванной миграции...")
+    conn = sqlite3.connect(':memory:')
+    migrate(conn, log=quiet)
+    conn.execute('CREATE TABLE visits (id INTEGER PRIMARY KEY, counter INTEGER NOT NULL DEFAULT 0)')
+    conn.executemany('INSERT INTO visits (id) VALUES (?)', [(i,) for i in range(1, 101)])
+    conn.commit()
+
+    batches = []
+
+    def touch(conn, rows):
+        if len(batches) == 3:
+            raise RuntimeError('сбой посреди заполнения')
+        batches.append(len(rows))
+        conn.executemany('UPDATE visits SET counter = counter + 1 WHERE id = ?', [(row[0],) for row in rows])
+
+    def apply(ctx):
+        ctx.backfill('счетчик посещений', 'visits', 'id', '1 = 1', touch)
+
+    extra = [Migration(100, 'Счетчик посещений', apply)]
+    try:
+        migrate(conn, batch_size=15, migrations=extra, log=quiet)
+        raise AssertionError("сбой не дошел до вызывающего кода")
+    except RuntimeError:
+        pass
+    assert conn.execute('SELECT last_id FROM schema_backfills WHERE version = 100').fetchone()[0] == 45
+    assert conn.execute('SELECT COUNT(*) FROM schema_version WHERE version = 100').fetchone()[0] == 0
+    assert not conn.in_transaction
+
+    batches.append(0)
+    migrate(conn, batch_size=15, migrations=extra, log=quiet)
+    assert conn.execute('SELECT MIN(counter), MAX(counter) FROM visits').fetchone() == (1, 1)
+    assert conn.execute('SELECT COUNT(*) FROM schema_backfills').fetchone()[0] == 0
+    assert migrate(conn, migrations=extra, log=quiet) == []
+    print("✅ Повторный запуск продолжает с последней пачки, каждая строка обработана один раз")
+
+def main():
+    print("🚀 Запуск тестов миграций")
+    print("=" * 40)
+
+    try:
+        test_new_database()
+        test_legacy_database()
+        test_resume_after_failure()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Тест денежных сумм в минимальных единицах: перевод, точность сумм, миграция
+"""
+
+import sys
+import os
+import random
+import sqlite3
+from decimal import Decimal
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.money import to_minor, from_minor, minor_units
+from app.migrations import MIGRATIONS, migrate
+from app.accounts.ledger import ensure_ledger_schema, rebuild_ledger, check_ledger
+from app.reports.rollups import ensure_rollup_schema, rebuild_rollups, check_rollups
+from app.transactions.dedupe import transaction_fingerprint
+
+# Число строк в проверке точности сумм
+EXACT_SUM_ROWS = 1000000
+
+def decimal_text(amount: int, currency: str) -> str:
+    """Десятичная запись суммы в минимальных единицах без float"""
+    return str(Decimal(amount).scaleb(-minor_units(currency)))
+
+def test_conversions():
+    print("🧪 Тестируем перевод сумм в минимальные единицы...")
+
+    assert [minor_units(code) for code in ('USD', 'KZT', 'JPY', 'TND', 'XXX')] == [2, 2, 0, 3, 2]
+    assert to_minor('12.34', 'USD') == 1234 and to_minor(12, 'USD') == 1200
+    assert to_minor(0.29, 'USD') == 29 and to_minor('1500', 'JPY') == 1500
+    assert to_minor('1.2345', 'TND') == 1235 and to_minor('-0.005', 'USD') == -1
+    assert from_minor(1234, 'USD') == 12.34 and from_minor(1235, 'TND') == 1.235
+    for bad in ('abc', '', 'nan', 'inf', True, None, [1], '1e999999', '1e20', 10 ** 17):
+        try:
+            to_minor(bad, 'USD')
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} принят как сумма")
+    print("✅ Точный перевод, округление и отказ для неверных значений и сумм вне INTEGER")
+
+    # Свойство: перевод туда и обратно не меняет сумму при любом числе знаков
+    rng = random.Random(15)
+    for currency in ('USD', 'JPY', 'TND'):
+        for _ in range(20000):
+            amount = rng.randint(-10 ** 13, 10 ** 13)
+            assert to_minor(decimal_text(amount, currency), currency) == amount
+            assert to_minor(from_minor(amount, currency), currency) == amount
+    print("✅ Перевод туда и обратно обратим для сумм до 10^11 в единицах валюты")
+
+def test_exact_sums():
+    print(f"🧪 Тестируем точность сумм на {EXACT_SUM_ROWS} транзакциях...")
+    conn = sqlite3.connect(':memory:')
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('m@example.com', 'x', '2024-01-01')")
+    accounts = {1: 'USD', 2: 'KZT', 3: 'JPY', 4: 'TND'}
+    conn.executemany(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+           VALUES (1, ?, 'checking', ?, 0, '2024-01-01')''',
+        [(f'Счет {currency}', currency) for currency in accounts.values()]
+    )
+
+    rng = random.Random(42)
+    days = [f'2024-{month:02d}-{day:02d}' for month in range(1, 13) for day in range(1, 29)]
+    expected = {}
+    float_sums = {}
+    for account_id, currency in accounts.items():
+        count = EXACT_SUM_ROWS // len(accounts)
+        scale = 10 ** minor_units(currency)
+        # Суммы вида 0.10, 0.20, 1234.56 — именно они дают ошибку в REAL
+        amounts = [rng.randrange(800000) - 500000 for _ in range(count)]
+        expected[account_id] = Decimal(sum(amounts)) / scale
+        float_sums[account_id] = sum(amount / scale for amount in amounts)
+        conn.executemany(
+            '''INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+               VALUES (?, ?, ?, ?, 'expense', '2024-01-01')''',
+            sorted((account_id, rng.choice(days), amount, currency) for amount in amounts)
+        )
+    conn.commit()
+    # Реестр и итоги строятся пересчетом по истории, как для существующей БД
+    ensure_ledger_schema(conn)
+    rebuild_ledger(conn)
+    ensure_rollup_schema(conn)
+    rebuild_rollups(conn)
+
+    drifted = 0
+    for account_id, currency in accounts.items():
+        exact = to_minor(expected[account_id], currency)
+        stored = conn.execute('SELECT balance FROM account_balances WHERE account_id = ?',
+                              (account_id,)).fetchone()[0]
+        summed = conn.execute('SELECT SUM(amount) FROM transactions WHERE account_id = ?',
+                              (account_id,)).fetchone()[0]
+        rolled = conn.execute('SELECT SUM(total) FROM monthly_rollups WHERE account_id = ?',
+                              (account_id,)).fetchone()[0]
+        last_day = conn.execute(
+            'SELECT balance FROM account_daily_balances WHERE account_id = ? ORDER BY date DESC LIMIT 1',
+            (account_id,)).fetchone()[0]
+        assert stored == summed == rolled == last_day == exact, (currency, stored, summed, rolled, exact)
+        assert Decimal(repr(from_minor(exact, currency))) == expected[account_id]
+        drifted += Decimal(repr(float_sums[account_id])) != expected[account_id]
+    assert check_ledger(conn) == [] and check_rollups(conn) == []
+    print("✅ Реестр, дневные остатки, итоги и SUM совпадают с точной суммой Decimal")
+    print(f"ℹ️ Сумма тех же значений в float разошлась для {drifted} из {len(accounts)} счетов")
+
+def test_migration():
+    print("🧪 Тестируем перевод существующей БД...")
+    conn = sqlite3.connect(':memory:')
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    ensure_ledger_schema(conn)
+    ensure_rollup_schema(conn)
+
+    # Старая БД: суммы в REAL, реестр посчитан триггерами
+    conn.execute('PRAGMA user_version = 0')
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('o@example.com', 'x', '2024-01-01')")
+    for currency, initial in (('USD', 100.1), ('JPY', 1500.0), ('TND', 1.234)):
+        conn.execute(
+            '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+               VALUES (1, ?, 'checking', ?, ?, '2024-01-01')''',
+            (currency, currency, initial)
+        )
+    rows = [(1, '2024-01-05', amount, 'USD', 'Кофе') for amount in (0.1, 0.2, -0.3) * 100]
+    rows += [(2, '2024-01-06', -1500.0, 'JPY', 'Рамен'), (3, '2024-01-07', 1.234, 'TND', 'Кускус')]
+    conn.executemany(
+        '''INSERT INTO transactions (account_id, date, amount, currency, description, type,
+           created_at, fingerprint) VALUES (?, ?, ?, ?, ?, 'expense', '2024-01-01', 0)''',
+        rows
+    )
+    conn.commit()
+    assert conn.execute('SELECT balance FROM account_balances WHERE account_id = 1').fetchone()[0] != 0
+
+    # БД без schema_version проходит все миграции; реестр и итоги пересчитываются
+    assert len(migrate(conn, batch_size=100, log=lambda message: None)) == len(MIGRATIONS)
+
+    assert conn.execute("SELECT COUNT(*) FROM transactions WHERE typeof(amount) != 'integer'").fetchone()[0] == 0
+    assert [row[0] for row in conn.execute('SELECT initial_balance FROM accounts ORDER BY id')] == [10010, 1500, 1234]
+    assert [row[0] for row in conn.execute('SELECT balance FROM account_balances ORDER BY account_id')] == [0, -1500, 1234]
+    assert conn.execute('SELECT fingerprint FROM transactions WHERE account_id = 2').fetchone()[0] == \
+        transaction_fingerprint('2024-01-06', -1500, 'Рамен')
+    assert check_ledger(conn) == [] and check_rollups(conn) == []
+    assert migrate(conn, log=lambda message: None) == []
+    print("✅ Суммы и начальные балансы переведены, реестр точен, повтор ничего не меняет")
+
+def main():
+    print("🚀 Запуск тестов денежных сумм")
+    print("=" * 40)
+
+    try:
+        test_conversions()
+        test_exact_sums()
+        test_migration()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Тест месячных итогов и отчетов
+"""
+
+import sys
+import os
+import sqlite3
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.accounts.ledger import ensure_ledger_schema, suspend_ledger, resume_ledger
+from app.reports.rollups import (
+    ensure_rollup_schema, rebuild_rollups, apply_rollup_delta, check_rollups
+)
+
+def create_test_db():
+    conn = sqlite3.connect(':memory:')
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    ensure_ledger_schema(conn)
+    ensure_rollup_schema(conn)
+
+    conn.execute("INSERT INTO users (email, password_hash, created_at) VALUES ('r@example.com', 'x', '2024-01-01')")
+    conn.execute(
+        '''INSERT INTO accounts (user_id, name, type, currency, initial_balance, created_at)
+           VALUES (1, 'Счет', 'checking', 'KZT', 0, '2024-01-01')'''
+    )
+    conn.commit()
+    return conn
+
+def add_transaction(conn, date, amount, transaction_type='expense', status='confirmed'):
+    cursor = conn.execute(
+        '''INSERT INTO transactions (account_id, date, amount, currency, type, status, created_at)
+           VALUES (1, ?, ?, 'KZT', ?, ?, '2024-01-01')''',
+        (date, amount, transaction_type, status)
+    )
+    return cursor.lastrowid
+
+def rollups(conn):
+    return {(row[0], row[1]): (row[2], row[3]) for row in conn.execute(
+        'SELECT month, type, total, transaction_count FROM monthly_rollups ORDER BY month, type')}
+
+def test_rollup_triggers():
+    print("🧪 Тестируем обновление месячных итогов...")
+    conn = create_test_db()
+
+    add_transaction(conn, '2024-01-05', -100)
+    add_transaction(conn, '2024-01-20', -50)
+    salary_id = add_transaction(conn, '2024-01-25', 1000, 'income')
+    pending_id = add_transaction(conn, '2024-02-01', -30, status='pending')
+    conn.commit()
+    assert rollups(conn) == {('2024-01', 'expense'): (-150, 2), ('2024-01', 'income'): (1000, 1)}
+    print("✅ Вставка учитывается, неподтвержденные транзакции пропускаются")
+
+    conn.execute("UPDATE transactions SET status = 'confirmed' WHERE id = ?", (pending_id,))
+    conn.execute("UPDATE transactions SET date = '2024-02-25' WHERE id = ?", (salary_id,))
+    conn.execute("DELETE FROM transactions WHERE date = '2024-01-20'")
+    conn.commit()
+    assert rollups(conn) == {('2024-01', 'expense'): (-100, 1), ('2024-02', 'expense'): (-30, 1),
+                             ('2024-02', 'income'): (1000, 1)}
+    assert check_rollups(conn) == []
+    print("✅ Изменение и удаление переносят суммы, пустые месяцы удаляются")
+
+    conn.execute("UPDATE monthly_rollups SET total = 0")
+    conn.commit()
+    assert len(check_rollups(conn)) == 3
+    assert rebuild_rollups(conn) == 3
+    assert check_rollups(conn) == []
+    print("✅ Сверка находит расхождения, пересчет их исправляет")
+
+    # Пакетная вставка: триггеры отключены, итоги применяются одним шагом
+    suspend_ledger(conn, 1)
+    add_transaction(conn, '2024-02-10', -20)
+    add_transaction(conn, '2024-03-10', -5)
+    resume_ledger(conn, 1)
+    apply_rollup_delta(conn, 1, {('2024-02', 'expense', 'KZT'): [-20, 1],
+                                 ('2024-03', 'expense', 'KZT'): [-5, 1]})
+    conn.commit()
+    assert rollups(conn)[('2024-02', 'expense')] == (-50, 2)
+    assert check_rollups(conn) == []
+    print("✅ Пакетная вставка применяет итоги без построчных триггеров")
+
+def test_reports_api():
+    print("🧪 Тестируем отчеты...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    import secrets
+    from app import create_app
+    from app.db import get_db
+    from app.fx.models import get_rate_service
+
+    app = create_app()
+    client = app.test_client()
+    # Отдельный пользователь на каждый запуск: суммы не зависят от прошлых прогонов
+    credentials = {'email': f'reports-{secrets.token_hex(4)}@example.com', 'password': 'testpass123'}
+    assert client.post('/auth/api/register', json=credentials).json['success']
+
+    account_ids = []
+    for name, currency in (('Тенге', 'KZT'), ('Доллары', 'USD')):
+        response = client.post('/accounts/api/accounts', json={
+            'name': name, 'type': 'checking', 'currency': currency
+        })
+        account_ids.append(int(response.json['account_id']))
+
+    with app.app_context():
+        kzt_rate = get_rate_service().get_rates().rates['KZT']
+        conn = get_db()
+        # Суммы в минимальных единицах: 10 долларов в тенге и 5 долларов
+        for account_id, currency, amount in ((account_ids[0], 'KZT', round(kzt_rate * 1000)),
+                                             (account_ids[1], 'USD', 500)):
+            for date, sign, transaction_type in (('2031-01-10', 1, 'income'), ('2031-01-15', -1, 'expense'),
+                                                 ('2031-02-01', -1, 'expense')):
+                conn.execute(
+                    '''INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+                       VALUES (?, ?, ?, ?, ?, '2031-01-01')''',
+                    (account_id, date, sign * amount, currency, transaction_type)
+                )
+        conn.commit()
+
+    def report(path, **params):
+        response = client.get(f'/reports/api/{path}', query_string=dict(params, currency='USD'))
+        assert response.status_code == 200 and response.json['success'], response.json
+        return response.json['rows']
+
+    months = report('monthly', **{'from': '2031-01', 'to': '2031-12'})
+    assert [m['month'] for m in months] == ['2031-01', '2031-02']
+    assert abs(months[0]['income'] - 15) < 1e-4 and abs(months[0]['expense'] + 15) < 1e-4
+    assert abs(months[1]['net'] + 15) < 1e-4 and months[1]['transaction_count'] == 2
+    print("✅ Помесячный отчет в целевой валюте")
+
+    by_account = {row['account_id']: row for row in report('accounts', **{'from': '2031-02'})}
+    assert abs(by_account[account_ids[1]]['net'] + 5) < 1e-4
+    assert by_account[account_ids[0]]['name'] == 'Тенге'
+    by_type = {row['type']: row for row in report('types', account_id=account_ids[0])}
+    assert by_type['expense']['transaction_count'] == 2 and abs(by_type['income']['total'] - 10) < 1e-4
+    print("✅ Отчеты по счетам и типам")
+
+    assert client.get('/reports/api/monthly?from=2031-13').status_code == 400
+    assert client.get('/reports/api/monthly?account_id=999999').status_code == 404
+    print("✅ Неверный месяц и чужой счет отклоняются")
+
+def test_cash_flow_analytics():
+    print("🧪 Тестируем аналитику денежного потока...")
+
+    from app.reports import analytics
+    if analytics.np is None:
+        print("⚠️ NumPy не установлен, тест пропущен")
+        return
+
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    import secrets
+    from datetime import date, datetime
+    from app import create_app
+    from app.db import get_db
+    from app.fx.models import RateSnapshot
+
+    app = create_app()
+    client = app.test_client()
+    # Отдельный пользователь на каждый запуск: суммы не зависят от прошлых прогонов
+    credentials = {'email': f'analytics-{secrets.token_hex(4)}@example.com', 'password': 'testpass123'}
+    assert client.post('/auth/api/register', json=credentials).json['success']
+
+    account_ids = {}
+    for name, currency in (('Тенге', 'KZT'), ('Доллары', 'USD')):
+        response = client.post('/accounts/api/accounts', json={
+            'name': name, 'type': 'checking', 'currency': currency
+        })
+        account_ids[currency] = int(response.json['account_id'])
+
+    with app.app_context():
+        conn = get_db()
+        for date_, amount, currency, status in (
+                ('2030-12-20', -30, 'USD', 'confirmed'), ('2031-01-10', 1000, 'USD', 'confirmed'),
+                ('2031-01-15', -100, 'USD', 'confirmed'), ('2031-02-05', -100000, 'KZT', 'confirmed'),
+                ('2031-03-01', -50, 'USD', 'confirmed'), ('2031-03-02', -500, 'USD', 'pending'),
+                ('2031-03-10', -25000, 'KZT', 'confirmed'), ('2031-03-20', -999, 'USD', 'confirmed')):
+            conn.execute(
+                '''INSERT INTO transactions (account_id, date, amount, currency, type, status, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, '2031-01-01')''',
+                (account_ids[currency], date_, amount * 100, currency, 'income' if amount > 0 else 'expense', status)
+            )
+        conn.commit()
+
+        user_id = conn.execute('SELECT id FROM users WHERE email = ?', (credentials['email'],)).fetchone()[0]
+        snapshot = RateSnapshot('USD', {'KZT': 500.0}, 'test', datetime.now())
+        result = analytics.build_cash_flow(user_id, 'USD', snapshot, months=3, today=date(2031, 3, 15))
+
+    months = result['months']
+    assert [m['month'] for m in months] == ['2031-01', '2031-02', '2031-03']
+    assert [m['expense'] for m in months] == [100, 200, 100] and months[0]['income'] == 1000
+    assert [m['transaction_count'] for m in months] == [2, 1, 2]
+    assert [m['expense_ma'] for m in months] == [None, None, 133.33]
+    assert [m['expense_change_pct'] for m in months] == [None, 100.0, -50.0]
+    print("✅ Месячные суммы, скользящее среднее и изменение к прошлому месяцу")
+
+    assert result['by_account'] == [
+        {'account_id': account_ids['KZT'], 'expense': 250, 'share': 0.625},
+        {'account_id': account_ids['USD'], 'expense': 150, 'share': 0.375}
+    ]
+    daily = result['daily']
+    assert daily['start'] == '2030-12-16' and len(daily['expense']) == 90
+    assert daily['expense'][30] == 100 and daily['expense_ma'][-1] == 3.33
+    burn = result['burn_rate']
+    assert burn['daily'] == 4.78 and burn['month_to_date'] == 100 and burn['projected_month'] == 176.44
+    assert result['missing_rates'] == []
+    print("✅ Доли по счетам, дневной ряд и темп расходов")
+
+    response = client.get('/api/dashboard/analytics?currency=USD&months=1000')
+    assert response.status_code == 200 and response.json['success'], response.json
+    assert len(response.json['months']) == analytics.MAX_MONTHS
+
+    # Запись из другого процесса видна по версии данных пользователя
+    before = client.get('/api/dashboard/analytics?currency=USD&months=1').json['months'][-1]
+    other = sqlite3.connect(app.config['DATABASE_PATH'])
+    other.execute(
+        """INSERT INTO transactions (account_id, date, amount, currency, type, created_at)
+           VALUES (?, ?, -700, 'USD', 'expense', ?)""",
+        (account_ids['USD'], date.today().isoformat(), date.today().isoformat())
+    )
+    other.commit()
+    other.close()
+    after = client.get('/api/dashboard/analytics?currency=USD&months=1').json['months'][-1]
+    assert after['transaction_count'] == before['transaction_count'] + 1
+    assert abs(after['expense'] - before['expense'] - 7) < 1e-6
+    assert app.test_client().get('/api/dashboard/analytics').status_code == 401
+    print("✅ Эндпоинт дашборда ограничивает период, требует авторизации и видит чужие записи")
+
+def main():
+    print("🚀 Запуск тестов отчетов")
+    print("=" * 40)
+
+    try:
+        test_rollup_triggers()
+        test_reports_api()
+        test_cash_flow_analytics()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Тест записей моделей, JSON-провайдеров и колоночного формата списков
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from app import serialization
+
+def create_app_with(directory, provider):
+    """Приложение с JSON_PROVIDER = provider над отдельной БД в directory"""
+    from app import create_app
+    from app.migrations import migrate
+
+    path = os.path.join(directory, f'{provider}.db')
+    conn = sqlite3.connect(path)
+    migrate(conn, log=lambda message: None)
+    conn.close()
+
+    saved = Config.JSON_PROVIDER
+    Config.JSON_PROVIDER = provider
+    try:
+        app = create_app()
+    finally:
+        Config.JSON_PROVIDER = saved
+    app.config['DATABASE_PATH'] = path
+    return app
+
+def test_providers():
+    print("🧪 Тестируем выбор JSON-провайдера...")
+    with tempfile.TemporaryDirectory() as directory:
+        stdlib = create_app_with(directory, 'stdlib')
+        assert type(stdlib.json) is not serialization.OrjsonProvider
+        if serialization.orjson is None:
+            print("⚠️ orjson не установлен, проверяется только стандартный json")
+            return
+
+        fast = create_app_with(directory, 'orjson')
+        assert isinstance(fast.json, serialization.OrjsonProvider)
+        assert isinstance(create_app_with(directory, 'auto').json, serialization.OrjsonProvider)
+        print("✅ 'auto' выбирает orjson, 'stdlib' — стандартный json")
+
+        payload = {'b': [1, 2.5, None, True], 'a': 'Пополнение ₸', 'by_id': {3: (1, 'x'), 1: []},
+                   'day': date(2024, 1, 31), 'at': datetime(2024, 1, 31, 12, 30), 'sum': Decimal('10.50')}
+        with stdlib.test_request_context(), fast.test_request_context():
+            expected = stdlib.json.response(payload).get_data()
+            actual = fast.json.response(payload).get_data()
+        assert json.loads(actual) == json.loads(expected)
+        assert list(json.loads(actual)) == list(json.loads(expected))
+        assert fast.json.loads(fast.json.dumps(payload)) == json.loads(expected)
+        print("✅ Ответы orjson и стандартного json совпадают: порядок ключей, даты, Decimal")
+
+        try:
+            create_app_with(directory, 'simplejson')
+            assert False, 'неизвестный провайдер принят'
+        except ValueError:
+            print("✅ Неизвестный провайдер отклоняется")
+
+def test_records():
+    print("🧪 Тестируем записи моделей...")
+    import pickle
+    from app.accounts.models import Account
+    from app.transactions.models import Transaction
+
+    account = Account(7, 'Карта', 'card', 'KZT', 'kaspi', 1500.5, 2000.0, 0, '2024-01-01 10:00:00')
+    assert account.archived is False and not hasattr(account, '__dict__')
+    assert account.to_tuple() == (7, 'Карта', 'card', 'KZT', 'kaspi', 1500.5, 2000.0, False,
+                                  '2024-01-01 10:00:00')
+    assert list(account.to_dict()) == list(Account.fields())
+    assert pickle.loads(pickle.dumps(account)) == account
+    print("✅ Account: поля в порядке колонок, без __dict__, переживает pickle")
+
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = Transaction.row_factory
+    transaction = conn.execute(
+        "SELECT 1, 2, '2024-03-01', 12.5, 'USD', 'Кофе', 'expense', 'confirmed', '2024-03-01'"
+    ).fetchone()
+    conn.close()
+    assert isinstance(transaction, Transaction) and transaction.amount == 12.5
+    print("✅ Transaction строится row_factory прямо из строки курсора")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for provider in ('stdlib', 'orjson') if serialization.orjson is not None else ('stdlib',):
+            app = create_app_with(directory, provider)
+            with app.test_request_context():
+                body = app.json.response({'account': account, 'transactions': [transaction]}).get_data()
+            assert json.loads(body) == {'account': account.to_dict(), 'transactions': [transaction.to_dict()]}
+        print("✅ Записи сериализуются объектами в обоих провайдерах")
+
+def test_columns_format():
+    print("🧪 Тестируем колоночный формат...")
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app_with(directory, 'auto')
+        client = app.test_client()
+        client.post('/auth/api/register', json={'email': 'columns@example.com', 'password': 'testpass123'})
+        for name, currency, balance in (('Карта', 'KZT', 1500.5), ('Наличные', 'USD', 20.25),
+                                        ('Старый', 'JPY', 300)):
+            client.post('/accounts/api/accounts', json={'name': name, 'type': 'cash', 'currency': currency,
+                                                        'initial_balance': balance})
+        accounts = client.get('/accounts/api/accounts').json['accounts']
+        client.post(f"/accounts/api/accounts/{accounts[-1]['id']}/archive")
+
+        for query in ('', '&include_archived=true'):
+            objects = client.get(f'/accounts/api/accounts?{query}').json['accounts']
+            response = client.get(f'/accounts/api/accounts?format=columns{query}')
+            assert response.status_code == 200 and 'ETag' in response.headers
+            columns = response.json
+            assert [dict(zip(columns['columns'], row)) for row in columns['rows']] == objects
+        print(f"✅ Счета: {len(columns['rows'])} строк по колонкам {', '.join(columns['columns'])}")
+
+        conn = sqlite3.connect(app.config['DATABASE_PATH'])
+        conn.executemany(
+            """INSERT INTO transactions (account_id, date, amount, currency, description, type, created_at)
+               VALUES (?, '2024-03-01', ?, ?, 'Магазин', ?, '2024-03-01')""",
+            [(accounts[0]['id'], amount, accounts[0]['currency'], 'income' if amount > 0 else 'expense')
+             for amount in (10000, -2550, 700)]
+        )
+        conn.commit()
+        conn.close()
+        objects = client.get('/transactions/api/transactions?limit=2').json
+        columns = client.get('/transactions/api/transactions?limit=2&format=columns').json
+        assert len(columns['rows']) == 2 and columns['next_cursor']
+        assert [dict(zip(columns['columns'], row)) for row in columns['rows']] == objects['transactions']
+        assert columns['next_cursor'] == objects['next_cursor']
+        print("✅ Транзакции: та же страница и курсор в колоночном формате")
+
+def main():
+    print("🚀 Запуск тестов сериализации")
+    print("=" * 40)
+
+    try:
+        test_providers()
+        test_records()
+        test_columns_format()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
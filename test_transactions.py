@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Тест списка транзакций с пагинацией курсором
+"""
+
+import sys
+import os
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import get_db
+
+def test_transactions_api():
+    print("🧪 Тестируем список транзакций...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    import secrets
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    # Отдельный пользователь на каждый запуск: в списке только счета этого теста
+    credentials = {'email': f'list-{secrets.token_hex(4)}@example.com', 'password': 'testpass123'}
+    assert client.post('/auth/api/register', json=credentials).json['success']
+
+    account_ids = []
+    for name in ('Основной', 'Кредитка'):
+        response = client.post('/accounts/api/accounts', json={
+            'name': name, 'type': 'checking', 'currency': 'KZT'
+        })
+        account_ids.append(response.json['account_id'])
+
+    # Одинаковые даты на разных счетах проверяют порядок по id при слиянии
+    with app.app_context():
+        conn = get_db()
+        for day in range(1, 11):
+            for number, account_id in enumerate(account_ids):
+                conn.execute(
+                    '''INSERT INTO transactions (account_id, date, amount, currency, description,
+                       type, status, created_at) VALUES (?, ?, ?, 'KZT', 'list', ?, ?, '2024-01-01')''',
+                    (account_id, f'2024-05-{day:02d}', (day * 10 + number) * 100,
+                     'income' if day % 5 == 0 else 'expense',
+                     'pending' if (day, number) == (3, 1) else 'confirmed')
+                )
+        conn.commit()
+
+    def walk(**params):
+        items, cursor, pages = [], None, 0
+        while True:
+            query = dict(params, limit=3, **({'cursor': cursor} if cursor else {}))
+            response = client.get('/transactions/api/transactions', query_string=query)
+            assert response.status_code == 200, response.json
+            items += response.json['transactions']
+            cursor = response.json['next_cursor']
+            pages += 1
+            if not cursor:
+                return items, pages
+
+    items, pages = walk()
+    assert len(items) == 20 and pages == 7
+    keys = [(t['date'], t['id']) for t in items]
+    assert keys == sorted(keys, reverse=True) and len(set(keys)) == 20
+    print("✅ Страницы по двум счетам идут без пропусков и повторов")
+
+    items, _ = walk(account_id=account_ids[1], **{'from': '2024-05-03', 'to': '2024-05-06'})
+    assert [t['amount'] for t in items] == [61, 51, 41, 31]
+    items, _ = walk(type='income')
+    assert [t['amount'] for t in items] == [101, 100, 51, 50]
+    assert [t['amount'] for t in walk(status='pending')[0]] == [31]
+    print("✅ Фильтры по счету, датам, типу и статусу работают")
+
+    response = client.get('/transactions/api/transactions', query_string={'cursor': 'мусор'})
+    assert response.status_code == 400
+    response = client.get('/transactions/api/transactions', query_string={'account_id': 999999})
+    assert response.status_code == 404
+    print("✅ Неверный курсор и чужой счет отклоняются")
+
+def test_query_plans():
+    print("🧪 Тестируем планы запросов страницы...")
+    import sqlite3
+
+    conn = sqlite3.connect(':memory:')
+    with open('database/schema.sql', 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    base = '''EXPLAIN QUERY PLAN SELECT * FROM transactions
+              WHERE account_id = 1 {extra} AND (date, id) < ('2024-01-01', 10)
+              ORDER BY date DESC, id DESC LIMIT 51'''
+    for extra in ('', "AND type = 'income'", "AND status = 'pending'"):
+        plan = ' '.join(row[3] for row in conn.execute(base.format(extra=extra)))
+        assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, plan
+    print("✅ Страница читается диапазоном индекса без сортировки")
+
+def test_search():
+    print("🧪 Тестируем поиск по описанию...")
+
+    # Инициализируем БД если нужно
+    if not os.path.exists('database/finance.db'):
+        from init_db import init_database
+        init_database()
+
+    import secrets
+    import tempfile
+    from app import create_app
+    from app.transactions.importer import StatementImporter
+    from app.transactions.search import build_match_query
+
+    assert build_match_query('Yandex  taxi!') == '"Yandex"* "taxi"*'
+    assert build_match_query('OR NEAR(') == '"OR"* "NEAR"*'
+    assert build_match_query(' *** ') is None
+
+    app = create_app()
+    client = app.test_client()
+    # Отдельные пользователи на каждый запуск: в выдаче только транзакции этого теста
+    run = secrets.token_hex(4)
+    credentials = {'email': f'search-{run}@example.com', 'password': 'testpass123'}
+    assert client.post('/auth/api/register', json=credentials).json['success']
+    response = client.post('/accounts/api/accounts', json={
+        'name': 'Поиск', 'type': 'checking', 'currency': 'KZT'
+    })
+    account_id = response.json['account_id']
+
+    with app.app_context():
+        conn = get_db()
+        owner = conn.execute('SELECT user_id FROM accounts WHERE id = ?', (account_id,)).fetchone()[0]
+
+        # Строка через триггер и пачка через импорт
+        cursor = conn.execute(
+            '''INSERT INTO transactions (account_id, date, amount, currency, description,
+               type, created_at) VALUES (?, '2024-06-01', -900, 'KZT', 'Покупка: Шашлычная Дастархан',
+               'expense', '2024-06-01')''', (account_id,)
+        )
+        manual_id = cursor.lastrowid
+        conn.commit()
+
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('date,amount,description\n2024-06-02,-1500,Yandex Taxi Алматы\n'
+                    '2024-06-03,-700,Magnum Cash&Carry\n2024-06-04,-300,Yandex Eda\n')
+        try:
+            assert StatementImporter(account_id, owner).import_file(path)['imported'] == 3
+        finally:
+            os.remove(path)
+
+    def search(q, **params):
+        response = client.get('/transactions/api/search', query_string=dict(params, q=q))
+        assert response.status_code == 200, response.json
+        return [t['description'] for t in response.json['transactions']]
+
+    assert search('дастарх') == ['Покупка: Шашлычная Дастархан']
+    assert search('yandex taxi') == ['Yandex Taxi Алматы']
+    assert sorted(search('yan')) == ['Yandex Eda', 'Yandex Taxi Алматы']
+    assert search('magnum OR') == [] and search('') == []
+    print("✅ Поиск по началу слова без учета регистра, операторы FTS5 экранированы")
+
+    with app.app_context():
+        conn = get_db()
+        conn.execute("UPDATE transactions SET description = 'Кафе Дастархан' WHERE id = ?", (manual_id,))
+        conn.execute("DELETE FROM transactions WHERE description = 'Yandex Eda' AND account_id = ?",
+                     (account_id,))
+        conn.commit()
+        conn.execute("INSERT INTO transactions_fts (transactions_fts, rank) VALUES ('integrity-check', 1)")
+    assert search('кафе') == ['Кафе Дастархан'] and search('покупка') == []
+    assert search('yan') == ['Yandex Taxi Алматы']
+    print("✅ Индекс следует за изменением и удалением транзакций")
+
+    other = app.test_client()
+    other_credentials = {'email': f'search2-{run}@example.com', 'password': 'testpass123'}
+    assert other.post('/auth/api/register', json=other_credentials).json['success']
+    assert other.get('/transactions/api/search', query_string={'q': 'yandex'}).json['transactions'] == []
+    print("✅ Поиск не видит чужие транзакции")
+
+def main():
+    print("🚀 Запуск тестов списка транзакций")
+    print("=" * 40)
+
+    try:
+        test_transactions_api()
+        test_query_plans()
+        test_search()
+        print("=" * 40)
+        print("🎉 Все тесты прошли успешно!")
+    except Exception as e:
+        print(f"❌ Ошибка в тестах: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()